@@ -7,8 +7,10 @@ from fastapi import APIRouter, BackgroundTasks, Request
 from pydantic import BaseModel
 
 from app.pipelines.document_processor import DocumentProcessor
+from app.pipelines.parse_pool import ParsePool
 from app.tools.embedding_client import EmbeddingClient
 from app.tools.minio_client import MinioClient
+from app.tools.vector_cache import ProjectVectorCache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,6 +21,8 @@ class ProcessDocumentRequest(BaseModel):
     s3Key: str
     mimeType: str
     projectId: str
+    # Re-ingestion: only embed chunks that changed since the last run
+    incremental: bool = False
 
 
 class ProcessDocumentResponse(BaseModel):
@@ -30,6 +34,12 @@ class ProcessDocumentTextRequest(BaseModel):
     documentId: str
     projectId: str
     text: str
+    incremental: bool = False
+
+
+class RemoveDocumentRequest(BaseModel):
+    documentId: str
+    projectId: str
 
 
 async def _run_processing(
@@ -37,6 +47,8 @@ async def _run_processing(
     api_client,
     minio_client: MinioClient,
     embedding_client: EmbeddingClient,
+    vector_cache: Optional[ProjectVectorCache] = None,
+    parse_pool: Optional[ParsePool] = None,
 ):
     try:
         if embedding_client is None:
@@ -45,12 +57,15 @@ async def _run_processing(
             minio_client=minio_client,
             embedding_client=embedding_client,
             api_client=api_client,
+            vector_cache=vector_cache,
+            parse_pool=parse_pool,
         )
         await processor.process(
             document_id=request.documentId,
             s3_key=request.s3Key,
             mime_type=request.mimeType,
             project_id=request.projectId,
+            incremental=request.incremental,
         )
     except Exception as exc:
         logger.exception('Document processing failed before completion: %s', exc)
@@ -70,6 +85,7 @@ async def _run_text_processing(
     request: ProcessDocumentTextRequest,
     api_client,
     embedding_client: EmbeddingClient,
+    vector_cache: Optional[ProjectVectorCache] = None,
 ):
     try:
         if embedding_client is None:
@@ -78,11 +94,13 @@ async def _run_text_processing(
             minio_client=None,
             embedding_client=embedding_client,
             api_client=api_client,
+            vector_cache=vector_cache,
         )
         await processor.process_text(
             document_id=request.documentId,
             project_id=request.projectId,
             text=request.text,
+            incremental=request.incremental,
         )
     except Exception as exc:
         logger.exception('Document text processing failed before completion: %s', exc)
@@ -114,6 +132,8 @@ async def process_document(
         services.app_api_client,
         minio_client,
         embedding_client,
+        request.app.state.vector_cache,
+        request.app.state.parse_pool,
     )
 
     return ProcessDocumentResponse(
@@ -136,9 +156,30 @@ async def process_document_text(
         payload,
         services.app_api_client,
         embedding_client,
+        request.app.state.vector_cache,
     )
 
     return ProcessDocumentResponse(
         status='processing',
         documentId=payload.documentId,
     )
+
+
+@router.post('/agent/remove-document', response_model=ProcessDocumentResponse)
+async def remove_document(
+    payload: RemoveDocumentRequest,
+    request: Request,
+) -> ProcessDocumentResponse:
+    # Chunks are already gone from Postgres; stop serving them from memory too
+    vector_cache = request.app.state.vector_cache
+    if vector_cache:
+        try:
+            await vector_cache.remove_document(payload.projectId, payload.documentId)
+        except Exception as exc:
+            logger.warning('Vector cache removal failed for %s: %s', payload.documentId, exc)
+            vector_cache.invalidate(payload.projectId)
+
+    return ProcessDocumentResponse(
+        status='removed',
+        documentId=payload.documentId,
+    )
@@ -17,6 +17,8 @@ class ProcessMeetingRequest(BaseModel):
     rawTranscript: str
     meetingDate: Optional[str] = None
     source: Optional[str] = None
+    # Document that holds the transcript chunks (sourceType 'meeting')
+    documentId: Optional[str] = None
 
 
 class ProcessMeetingResponse(BaseModel):
@@ -29,11 +31,13 @@ async def _run_processing(
     api_client,
     llm_client,
     embedding_client,
+    vector_cache=None,
 ):
     processor = MeetingProcessor(
         llm_client=llm_client,
         api_client=api_client,
         embedding_client=embedding_client,
+        vector_cache=vector_cache,
     )
     await processor.process(
         meeting_id=request.meetingId,
@@ -42,6 +46,7 @@ async def _run_processing(
         raw_transcript=request.rawTranscript,
         meeting_date=request.meetingDate,
         source=request.source,
+        document_id=request.documentId,
     )
 
 
@@ -60,6 +65,7 @@ async def process_meeting(
         services.app_api_client,
         services.llm_client,
         embedding_client,
+        request.app.state.vector_cache,
     )
 
     return ProcessMeetingResponse(
@@ -4,7 +4,8 @@ from typing import Any, Dict
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Request
 
-from app.graph import GraphServices, build_graph
+from app.graph import GraphRegistry, GraphServices
+from app.graph.budget import ToolBudget
 from app.schemas import RunRequest, RunResponse
 
 router = APIRouter()
@@ -14,8 +15,12 @@ async def get_services(request: Request) -> GraphServices:
     return request.app.state.graph_services
 
 
-async def execute_run(run_id: str, state: Dict[str, Any], services: GraphServices):
-    graph = build_graph(services)
+async def get_graph_registry(request: Request) -> GraphRegistry:
+    return request.app.state.graph_registry
+
+
+async def execute_run(run_id: str, state: Dict[str, Any], services: GraphServices, registry: GraphRegistry):
+    graph = registry.for_state(state)
     final_state = await graph.ainvoke(state)
     try:
         auth_token = final_state.get('authToken')
@@ -47,6 +52,7 @@ def build_initial_state(payload: RunRequest) -> Dict[str, Any]:
             'generateTitle': False,
         },
         'toolCallCount': 0,
+        'toolBudget': ToolBudget.from_run_config(run_config),
         'warnings': [],
     }
 
@@ -57,16 +63,20 @@ async def run_agent(
     background_tasks: BackgroundTasks,
     request: Request,
     services: GraphServices = Depends(get_services),
+    registry: GraphRegistry = Depends(get_graph_registry),
 ) -> RunResponse:
     initial_state = build_initial_state(payload)
     if request:
         initial_state['authToken'] = request.headers.get('authorization', '')
 
     await services.event_bus.emit(payload.run_id, 'started')
-    try:
-        await services.app_api_client.create_event(payload.run_id, 'started', {}, initial_state.get('authToken'))
-    except Exception:
-        pass
+    if services.telemetry:
+        services.telemetry.record_event(payload.run_id, 'started', {}, initial_state.get('authToken'))
+    else:
+        try:
+            await services.app_api_client.create_event(payload.run_id, 'started', {}, initial_state.get('authToken'))
+        except Exception:
+            pass
 
-    background_tasks.add_task(execute_run, payload.run_id, initial_state, services)
+    background_tasks.add_task(execute_run, payload.run_id, initial_state, services, registry)
     return RunResponse(run_id=payload.run_id)
@@ -1,20 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
-from fastapi.encoders import jsonable_encoder
 
-from app.observability import RunEventBus
-from app.graph import GraphServices, build_graph
+from app.config import get_settings
+from app.observability import EventBus, SubscriberLagged
+from app.graph import GraphRegistry, GraphServices
+from app.graph.budget import ToolBudget
 
 from uuid import uuid4
 
 router = APIRouter()
 
 
-async def get_event_bus(request: Request) -> RunEventBus:
+async def get_event_bus(request: Request) -> EventBus:
     return request.app.state.event_bus
 
 
+async def forward_run_events(websocket: WebSocket, event_bus: EventBus, run_id: str) -> None:
+    """Send a run's events to one socket until the run completes.
+
+    Messages arrive pre-encoded and shared with every other subscriber of the
+    run. A socket that stalls past the send timeout or falls out of the replay
+    buffer is dropped rather than allowed to hold up anyone else.
+    """
+    send_timeout = get_settings().stream_send_timeout_seconds
+    try:
+        async for message in event_bus.subscribe(run_id):
+            await asyncio.wait_for(websocket.send_text(message.encoded), send_timeout)
+    except (asyncio.TimeoutError, SubscriberLagged) as exc:
+        print(f"[WARN] Dropping slow subscriber of run {run_id}: {exc!r}")
+
+
 def build_initial_state(payload: dict, auth_token: str) -> dict:
     return {
         'runId': payload.get('runId') or str(uuid4()),
@@ -30,6 +48,7 @@ def build_initial_state(payload: dict, auth_token: str) -> dict:
             'skipRunPersistence': False,
         },
         'toolCallCount': 0,
+        'toolBudget': ToolBudget.from_run_config(payload.get('runConfig')),
         'warnings': [],
         'authToken': auth_token,
     }
@@ -44,19 +63,14 @@ async def stream_agent(websocket: WebSocket) -> None:
         await websocket.close()
         return
 
-    event_bus: RunEventBus = websocket.app.state.event_bus
-    queue = event_bus.get_queue(run_id)
+    event_bus: EventBus = websocket.app.state.event_bus
 
+    # Replays events emitted before this socket connected, then follows live ones
     try:
-        while True:
-            event = await queue.get()
-            await websocket.send_json(jsonable_encoder(event.model_dump(by_alias=True)))
-            if event.event == 'completed':
-                break
+        await forward_run_events(websocket, event_bus, run_id)
     except WebSocketDisconnect:
         return
     finally:
-        event_bus.close(run_id)
         await websocket.close()
 
 
@@ -65,7 +79,8 @@ async def chat_agent(websocket: WebSocket) -> None:
     await websocket.accept()
 
     services: GraphServices = websocket.app.state.graph_services
-    event_bus: RunEventBus = websocket.app.state.event_bus
+    registry: GraphRegistry = websocket.app.state.graph_registry
+    event_bus: EventBus = websocket.app.state.event_bus
 
     try:
         payload = await websocket.receive_json()
@@ -91,11 +106,10 @@ async def chat_agent(websocket: WebSocket) -> None:
                 print(f"[ERROR] Failed to load conversation messages for {conversation_id}: {exc}")
 
     run_id = initial_state['runId']
-    queue = event_bus.get_queue(run_id)
 
     async def _run_graph() -> None:
         try:
-            graph = build_graph(services)
+            graph = registry.for_state(initial_state)
             await graph.ainvoke(initial_state)
         except Exception as exc:
             import traceback
@@ -106,18 +120,12 @@ async def chat_agent(websocket: WebSocket) -> None:
                 'error': str(exc),
             })
     await event_bus.emit(run_id, 'started')
-    import asyncio
     task = asyncio.create_task(_run_graph())
 
     try:
-        while True:
-            event = await queue.get()
-            await websocket.send_json(jsonable_encoder(event.model_dump(by_alias=True)))
-            if event.event == 'completed':
-                break
+        await forward_run_events(websocket, event_bus, run_id)
     except WebSocketDisconnect:
         return
     finally:
         task.cancel()
-        event_bus.close(run_id)
         await websocket.close()
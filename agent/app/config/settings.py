@@ -24,12 +24,31 @@ class AppSettings(BaseSettings):
     log_level: str = 'info'
 
     # LLM settings
-    llm_provider: str = 'groq'  # groq | openai
+    llm_provider: str = 'groq'  # groq | openai | fake
     groq_api_key: str = ''
     groq_model: str = 'openai/gpt-oss-120b'
     openai_api_key: str = ''
     openai_model: str = 'gpt-4o'
 
+    # Run event bus: backend, bounded replay buffer per run, idle eviction and global cap
+    event_bus_backend: str = 'memory'  # memory | redis
+    redis_url: str = 'redis://localhost:6379/0'
+    event_bus_redis_prefix: str = 'agentpm:events'
+    event_bus_max_events_per_run: int = 1000
+    event_bus_idle_ttl_seconds: float = 300.0
+    event_bus_max_buffered_events: int = 100000
+    event_bus_slow_subscriber_policy: str = 'skip'  # skip | drop
+    stream_send_timeout_seconds: float = 10.0
+
+    # Streaming: tokens are coalesced into frames every N ms or M bytes
+    stream_frame_interval_ms: float = 50.0
+    stream_frame_max_bytes: int = 1024
+
+    # Run telemetry write-behind (events / tool calls batched per run)
+    telemetry_batch_size: int = 50
+    telemetry_flush_interval_seconds: float = 0.5
+    telemetry_max_pending: int = 10000
+
     # API service
     app_api_base_url: str = 'http://localhost:3000/api'
     app_api_timeout_seconds: float = 10.0
@@ -42,10 +61,100 @@ class AppSettings(BaseSettings):
     pg_user: str = 'postgres'
     pg_password: str = 'postgres'
     pg_db: str = 'pm_agent'
+    pg_pool_min_size: int = 2
+    pg_pool_max_size: int = 10
+    pg_statement_timeout_ms: int = 5000
+    pg_connect_timeout_seconds: int = 5
+    pg_pool_health_check_interval_seconds: float = 30.0
+
+    # mem0 runs on a bounded thread pool off the event loop
+    memory_max_workers: int = 4
+    memory_search_timeout_seconds: float = 5.0
+    memory_add_timeout_seconds: float = 30.0
+
+    # Durable background queue for mem0 writes, drained per-user in order
+    memory_queue_path: str = '.agent_data/memory_queue.db'
+    memory_queue_workers: int = 2
+    memory_queue_batch_turns: int = 8
+    memory_queue_batch_window_seconds: float = 2.0
+    memory_queue_max_attempts: int = 8
+    memory_queue_retry_base_seconds: float = 5.0
+    memory_queue_retry_max_seconds: float = 600.0
+    # Lease on claimed turns; must exceed memory_add_timeout_seconds
+    memory_queue_claim_ttl_seconds: float = 300.0
+
+    # Event loop lag monitor (sampled sleep overshoot)
+    loop_lag_interval_seconds: float = 0.25
+    loop_lag_warn_threshold_ms: float = 100.0
+
+    # ANN index on document_chunk embeddings (built by the agent at startup)
+    vector_index_type: str = 'hnsw'  # hnsw | ivfflat | none
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 64
+    hnsw_ef_search: int = 40
+    ivfflat_lists: int = 100
+    ivfflat_probes: int = 10
+    # Keep scanning the index until filtered queries have enough rows (pgvector >= 0.8;
+    # older versions fall back to an exact scan when a filtered ANN query comes up short)
+    vector_iterative_scan: str = 'relaxed_order'  # '' | relaxed_order | strict_order
+
+    # RAG retrieval: similarity floor and context token budget (adaptive top_k)
+    rag_score_threshold: float = 0.3
+    rag_token_budget: int = 1500
+    rag_max_chunks: int = 40
+    # Hybrid retrieval: full-text + vector, fused with reciprocal rank fusion
+    rag_hybrid: bool = True
+    rag_hybrid_candidates: int = 50
+    rag_rrf_k: int = 60
+    # MMR re-ranking: collapse adjacent chunks, trade relevance for diversity
+    rag_mmr_enabled: bool = True
+    rag_mmr_candidates: int = 20
+    rag_mmr_lambda: float = 0.7
+    # In-process per-project vector cache for hot projects (optional)
+    rag_cache_enabled: bool = False
+    rag_cache_max_bytes: int = 512 * 1024 * 1024
+    rag_cache_min_hits: int = 3
+    rag_cache_hnsw_threshold: int = 20000
+    # Longest a cached project is served without re-checking its document version
+    rag_cache_revalidate_seconds: float = 5.0
 
     ollama_base_url: str = 'http://localhost:11434'
     ollama_embed_model: str = 'nomic-embed-text'
     ollama_embed_dims: int = 768
+    ollama_keep_alive: str = '30m'
+
+    # Startup warm-up of LLM / embedding backends; /ready reports when done
+    warmup_enabled: bool = True
+    warmup_timeout_seconds: float = 30.0
+    warmup_retry_interval_seconds: float = 10.0
+    ollama_keep_alive_interval_seconds: float = 240.0
+
+    # Embedding batch pipeline: extra endpoints (comma-separated), concurrency, adaptive size
+    ollama_embed_endpoints: str = ''
+    embed_max_inflight_per_endpoint: int = 2
+    embed_batch_size: int = 16
+    embed_min_batch_size: int = 1
+    embed_max_batch_size: int = 128
+    embed_max_batch_chars: int = 48000
+    embed_target_batch_seconds: float = 2.0
+    # Content-hash embedding cache (in-process LRU over a Postgres table)
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 20000
+    # Rows in the embedding_cache table expire after a TTL and are capped in number
+    embedding_cache_ttl_seconds: int = 30 * 24 * 3600
+    embedding_cache_max_rows: int = 1_000_000
+
+    # Document ingestion: split text in windows of N chars, embed/persist N chunks at a time
+    ingest_split_window_chars: int = 60000
+    ingest_chunk_window_size: int = 64
+    # Embedded chunk pages buffered ahead of upload; retries per page POST
+    ingest_upload_queue_size: int = 2
+    ingest_upload_retries: int = 3
+    # PDF/DOCX parsing process pool
+    parse_pool_workers: int = 2
+    parse_max_file_mb: int = 100
+    parse_timeout_seconds: float = 300.0
+    parse_pdf_pages_per_task: int = 8
 
     # MinIO / S3 file storage
     minio_endpoint: str = 'localhost'
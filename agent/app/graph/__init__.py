@@ -1,4 +1,5 @@
 from .builder import build_graph
+from .registry import GraphRegistry
 from .services import GraphServices
 
-__all__ = ['GraphServices', 'build_graph']
+__all__ = ['GraphRegistry', 'GraphServices', 'build_graph']
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class ToolBudget:
+    """Run-scoped tool-call counter, carried in AgentState as ``toolBudget``.
+
+    Every branch of a run shares the same instance, and the check-and-increment
+    in ``try_acquire`` contains no await, so it is atomic on the event loop.
+    Unrelated runs never share state and never wait on each other.
+    """
+
+    max_calls: Optional[int] = None
+    used: int = 0
+
+    @classmethod
+    def from_run_config(cls, run_config: Dict[str, Any] | None) -> 'ToolBudget':
+        return cls(max_calls=(run_config or {}).get('maxToolCalls'))
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.max_calls is None:
+            return None
+        return max(self.max_calls - self.used, 0)
+
+    def try_acquire(self) -> bool:
+        if self.max_calls is not None and self.used >= self.max_calls:
+            return False
+        self.used += 1
+        return True
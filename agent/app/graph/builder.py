@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
 
 from app.graph.state import AgentState
 from app.graph.nodes.load_user import load_user_node
 from app.graph.nodes.parse_intent import parse_intent_node
 from app.graph.nodes.retrieve_docs import retrieve_docs_node
+from app.graph.nodes.fetch_activity import fetch_activity_node
 from app.graph.nodes.fetch_context import fetch_context_node
 from app.graph.nodes.generate_answer import generate_answer_node
 from app.graph.nodes.persist import persist_node
@@ -13,22 +14,19 @@ from app.graph.nodes.search_memories import search_memories_node
 from app.graph.nodes.store_memories import store_memories_node
 from app.graph.services import GraphServices
 
+FULL_VARIANT = 'full'
+FAST_VARIANT = 'fast'
+GRAPH_VARIANTS = (FULL_VARIANT, FAST_VARIANT)
 
-def _route_after_intent(state: AgentState) -> str:
-    """Route to retrieve_docs for document/knowledge queries, else straight to fetch_context."""
-    intent_type = state.get('intentType', 'general_chat')
-    if intent_type in ('document_qa', 'knowledge_query'):
-        return 'retrieve_docs'
-    return 'fetch_context'
 
-
-def build_graph(services: GraphServices):
+def _build_full_graph(services: GraphServices) -> StateGraph:
     graph = StateGraph(AgentState)
 
     # --- Nodes ---
     graph.add_node('load_user', load_user_node(services))
     graph.add_node('search_memories', search_memories_node(services))
     graph.add_node('parse_intent', parse_intent_node(services))
+    graph.add_node('fetch_activity', fetch_activity_node(services))
     graph.add_node('retrieve_docs', retrieve_docs_node(services))
     graph.add_node('fetch_context', fetch_context_node(services))
     graph.add_node('generate_answer', generate_answer_node(services))
@@ -36,20 +34,59 @@ def build_graph(services: GraphServices):
     graph.add_node('persist', persist_node(services))
 
     # --- Edges ---
-    graph.set_entry_point('load_user')
-    graph.add_edge('load_user', 'search_memories')
-    graph.add_edge('search_memories', 'parse_intent')
-
-    # Conditional routing: document/knowledge queries go through RAG retrieval
-    graph.add_conditional_edges('parse_intent', _route_after_intent, {
-        'retrieve_docs': 'retrieve_docs',
-        'fetch_context': 'fetch_context',
-    })
-
-    graph.add_edge('retrieve_docs', 'fetch_context')
-    graph.add_edge('fetch_context', 'generate_answer')
+    # Fan out: user context, memory search, intent parsing and the activity
+    # stream do not depend on each other, so they run in the same step.
+    for node in ('load_user', 'search_memories', 'parse_intent', 'fetch_activity'):
+        graph.add_edge(START, node)
+
+    # Intent-dependent branches; retrieve_docs is a no-op for non-document intents
+    graph.add_edge('parse_intent', 'retrieve_docs')
+    graph.add_edge('parse_intent', 'fetch_context')
+
+    # Fan in: answer once every branch has written its state update
+    graph.add_edge(
+        ['load_user', 'search_memories', 'fetch_activity', 'retrieve_docs', 'fetch_context'],
+        'generate_answer',
+    )
+    # Memory writes are only queued here and consolidated in the background,
+    # so persisting (and the 'completed' event) never waits on them.
     graph.add_edge('generate_answer', 'store_memories')
-    graph.add_edge('store_memories', 'persist')
+    graph.add_edge('generate_answer', 'persist')
+    graph.add_edge('store_memories', END)
+    graph.add_edge('persist', END)
+
+    return graph
+
+
+def _build_fast_graph(services: GraphServices) -> StateGraph:
+    """Lean pipeline without semantic memory or RAG, for quick chat turns."""
+    graph = StateGraph(AgentState)
+
+    graph.add_node('load_user', load_user_node(services))
+    graph.add_node('parse_intent', parse_intent_node(services))
+    graph.add_node('fetch_activity', fetch_activity_node(services))
+    graph.add_node('fetch_context', fetch_context_node(services))
+    graph.add_node('generate_answer', generate_answer_node(services))
+    graph.add_node('persist', persist_node(services))
+
+    for node in ('load_user', 'parse_intent', 'fetch_activity'):
+        graph.add_edge(START, node)
+    graph.add_edge('parse_intent', 'fetch_context')
+    graph.add_edge(['load_user', 'fetch_activity', 'fetch_context'], 'generate_answer')
+    graph.add_edge('generate_answer', 'persist')
     graph.add_edge('persist', END)
 
-    return graph.compile()
+    return graph
+
+
+def build_graph(services: GraphServices, variant: str = FULL_VARIANT):
+    """Build and compile the agent graph for the given variant.
+
+    Compilation is comparatively expensive; callers serving requests should
+    go through GraphRegistry instead of calling this per run.
+    """
+    if variant == FULL_VARIANT:
+        return _build_full_graph(services).compile()
+    if variant == FAST_VARIANT:
+        return _build_fast_graph(services).compile()
+    raise ValueError(f'Unknown graph variant: {variant}')
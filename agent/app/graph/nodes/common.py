@@ -4,16 +4,22 @@ from typing import Any, Awaitable, Callable, Dict
 
 import time
 
+from app.graph.budget import ToolBudget
 from app.graph.services import GraphServices
 from app.graph.state import AgentState
 
 
+# Events delivered only over the live event bus. Token frames are never
+# persisted one by one; the final answer is recorded with 'completed'.
+EPHEMERAL_EVENTS = frozenset({'text_token'})
+
+
 def get_run_config(state: AgentState) -> Dict[str, Any]:
     return state.get('metadata', {}).get('runConfig', {}) or {}
 
 
 def can_call_tool(state: AgentState) -> bool:
-    """DEPRECATED: Use acquire_tool_call() for thread-safe budget tracking."""
+    """DEPRECATED: Use get_tool_budget(state).try_acquire() for budget tracking."""
     config = get_run_config(state)
     max_calls = config.get('maxToolCalls')
     if max_calls is None:
@@ -22,30 +28,30 @@ def can_call_tool(state: AgentState) -> bool:
 
 
 def increment_tool_calls(state: AgentState) -> None:
-    """DEPRECATED: Use acquire_tool_call() for thread-safe budget tracking."""
+    """DEPRECATED: Use get_tool_budget(state).try_acquire() for budget tracking."""
     state['toolCallCount'] = state.get('toolCallCount', 0) + 1
 
 
-async def acquire_tool_call(services: 'GraphServices', state: AgentState) -> bool:
-    """Atomically check and increment tool call budget. Returns True if allowed.
+def get_tool_budget(state: AgentState) -> ToolBudget:
+    """Return the run's ToolBudget, shared by every parallel branch of the run.
 
-    Uses an asyncio.Lock to prevent race conditions when parallel tasks
-    (via asyncio.gather) check and increment the budget concurrently.
+    The initial-state builders create it; a budget created here would only be
+    seen by the branch that created it, so a missing one is an error.
     """
-    async with services.tool_budget_lock:
-        config = get_run_config(state)
-        max_calls = config.get('maxToolCalls')
-        if max_calls is not None and state.get('toolCallCount', 0) >= max_calls:
-            return False
-        state['toolCallCount'] = state.get('toolCallCount', 0) + 1
-        return True
+    budget = state.get('toolBudget')
+    if budget is None:
+        raise RuntimeError(f"Run {state.get('runId')} has no toolBudget; build its state with build_initial_state")
+    return budget
 
 
 async def emit_event(services: GraphServices, state: AgentState, event: str, payload: Dict[str, Any] | None = None):
     run_id = state['runId']
     auth_token = state.get('authToken')
     await services.event_bus.emit(run_id, event, payload)
-    if state.get('metadata', {}).get('skipRunPersistence'):
+    if event in EPHEMERAL_EVENTS or state.get('metadata', {}).get('skipRunPersistence'):
+        return
+    if services.telemetry:
+        services.telemetry.record_event(run_id, event, payload or {}, auth_token)
         return
     try:
         await services.app_api_client.create_event(run_id, event, payload or {}, auth_token)
@@ -66,7 +72,17 @@ async def trace_tool_call(
     start = time.perf_counter()
     response = await call()
     latency_ms = (time.perf_counter() - start) * 1000
-    if not state.get('metadata', {}).get('skipRunPersistence'):
+    skip_persistence = state.get('metadata', {}).get('skipRunPersistence')
+    if not skip_persistence and services.telemetry:
+        services.telemetry.record_tool_call(
+            run_id=run_id,
+            tool_name=tool_name,
+            request_json=request_payload,
+            response_json=response,
+            latency_ms=latency_ms,
+            auth_token=auth_token,
+        )
+    elif not skip_persistence:
         try:
             await services.app_api_client.create_tool_call(
                 run_id=run_id,
@@ -78,7 +94,7 @@ async def trace_tool_call(
             )
         except Exception:
             return response
-    
+
     await services.event_bus.emit(run_id, 'tool_result', {
         'tool': tool_name,
         'request': request_payload,
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from app.graph.services import GraphServices
+from app.graph.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_activity_node(services: GraphServices):
+    """Fetch the recent activity stream; independent of intent, so it runs in parallel."""
+
+    async def _node(state: AgentState) -> Dict[str, Any]:
+        if not services.integration_client:
+            logger.debug('Integration client not available, skipping activity fetch')
+            return {}
+
+        project_id = state.get('projectId')
+        if not project_id:
+            logger.debug('No projectId in state, skipping activity fetch')
+            return {}
+
+        try:
+            events = await services.integration_client.get_activity_stream(
+                project_id=project_id,
+                limit=15,
+                auth_token=state.get('authToken'),
+            )
+            logger.info(f'Fetched {len(events)} activity events for context')
+            return {'activityContext': events}
+        except Exception as exc:
+            logger.warning(f'Failed to fetch activity context: {exc}')
+            return {'activityContext': []}
+
+    return _node
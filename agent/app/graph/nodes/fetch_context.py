@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 
 def fetch_context_node(services: GraphServices):
-    """Fetch recent activity events and meeting context to give the agent awareness."""
+    """Fetch intent-specific context (meetings, risks, summaries) once the intent is known."""
 
     async def _node(state: AgentState) -> Dict[str, Any]:
         if not services.integration_client:
@@ -26,19 +26,6 @@ def fetch_context_node(services: GraphServices):
 
         result: Dict[str, Any] = {}
 
-        # Always fetch activity stream
-        try:
-            events = await services.integration_client.get_activity_stream(
-                project_id=project_id,
-                limit=15,
-                auth_token=auth_token,
-            )
-            logger.info(f'Fetched {len(events)} activity events for context')
-            result['activityContext'] = events
-        except Exception as exc:
-            logger.warning(f'Failed to fetch activity context: {exc}')
-            result['activityContext'] = []
-
         # Fetch meeting context for meeting-related queries
         intent_type = state.get('intentType', 'general_chat')
         if intent_type == 'meeting_query':
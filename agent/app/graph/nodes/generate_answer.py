@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from app.config import get_settings
 from app.graph.services import GraphServices
+from app.observability import TokenCoalescer
 from app.graph.state import AgentState
 from app.graph.nodes.common import emit_event
 
@@ -148,15 +150,47 @@ def generate_answer_node(services: GraphServices):
 
         user_message += f"user: {question}"
 
-        response = await services.llm_client.chat(
-            system=SYSTEM_PROMPT,
-            user=user_message,
-            temperature=0.7,
+        run_id = state['runId']
+        settings = get_settings()
+
+        async def _emit_frame(frame: str) -> None:
+            await services.event_bus.emit(run_id, 'text_token', {'token': frame, 'done': False})
+
+        coalescer = TokenCoalescer(
+            _emit_frame,
+            interval_ms=settings.stream_frame_interval_ms,
+            max_bytes=settings.stream_frame_max_bytes,
         )
+        tokens: list[str] = []
+        try:
+            async for token in services.llm_client.stream_chat(
+                system=SYSTEM_PROMPT,
+                user=user_message,
+                temperature=0.7,
+            ):
+                tokens.append(token)
+                await coalescer.push(token)
+        except Exception:
+            if tokens:
+                await coalescer.aclose()
+                raise
+            # Streaming failed before any output; fall back to a buffered completion.
+            response = await services.llm_client.chat(
+                system=SYSTEM_PROMPT,
+                user=user_message,
+                temperature=0.7,
+            )
+            tokens = [response.get('content') or '']
+            await coalescer.push(tokens[0])
 
-        answer = response.get('content', 'I am sorry, I cannot answer that right now.')
+        answer = ''.join(tokens)
+        if not answer:
+            # Nothing was streamed; the client only sees what goes through the coalescer
+            answer = 'I am sorry, I cannot answer that right now.'
+            await coalescer.push(answer)
+        await coalescer.aclose()
 
-        await emit_event(services, state, 'text_token', {'token': answer, 'done': True})
+        await emit_event(services, state, 'text_token', {'token': '', 'done': True})
 
         return {
             'finalAnswer': answer,
@@ -16,6 +16,9 @@ def persist_node(services: GraphServices):
         }
 
         await emit_event(services, state, 'completed', payload)
+        if services.telemetry:
+            # Make the run's event log complete before the run is marked done.
+            await services.telemetry.flush(state['runId'])
         return {}
 
     return _node
@@ -3,27 +3,58 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict
 
+from app.config import get_settings
+from app.graph.nodes.common import get_run_config
 from app.graph.services import GraphServices
 from app.graph.state import AgentState
+from app.tools.doc_retriever import RetrievalFilters
+from app.tools.reranker import mmr_rerank
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_INTENTS = ('document_qa', 'knowledge_query')
+
 
 def retrieve_docs_node(services: GraphServices):
+    settings = get_settings()
+
     async def _node(state: AgentState) -> Dict[str, Any]:
         project_id = state.get('projectId')
         question = state.get('question', '')
 
+        if state.get('intentType', 'general_chat') not in RETRIEVAL_INTENTS:
+            return {}
+
         if not project_id or not services.doc_retriever:
             logger.info('[%s] Skipping doc retrieval: no projectId or retriever', state.get('runId', '?'))
             return {'retrievedDocuments': []}
 
         try:
-            results = await services.doc_retriever.retrieve(
-                query=question,
-                project_id=project_id,
-                top_k=5,
-            )
+            filters = RetrievalFilters.from_run_config(get_run_config(state))
+            if settings.rag_mmr_enabled:
+                # Over-fetch, then keep a diverse, de-duplicated subset within the budget
+                candidates = await services.doc_retriever.retrieve(
+                    query=question,
+                    project_id=project_id,
+                    top_k=settings.rag_mmr_candidates,
+                    score_threshold=settings.rag_score_threshold,
+                    filters=filters,
+                    include_embeddings=True,
+                )
+                results = mmr_rerank(
+                    candidates,
+                    token_budget=settings.rag_token_budget,
+                    lambda_=settings.rag_mmr_lambda,
+                )
+            else:
+                results = await services.doc_retriever.retrieve(
+                    query=question,
+                    project_id=project_id,
+                    top_k=5,
+                    score_threshold=settings.rag_score_threshold,
+                    filters=filters,
+                    token_budget=settings.rag_token_budget,
+                )
             logger.info(
                 '[%s] Retrieved %d document chunks (project=%s)',
                 state.get('runId', '?'),
@@ -35,7 +66,7 @@ def retrieve_docs_node(services: GraphServices):
             logger.error('[%s] Doc retrieval failed: %s', state.get('runId', '?'), exc)
             return {
                 'retrievedDocuments': [],
-                'warnings': (state.get('warnings') or []) + [f'Document retrieval failed: {exc}'],
+                'warnings': [f'Document retrieval failed: {exc}'],
             }
 
     return _node
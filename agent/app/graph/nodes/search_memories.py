@@ -20,7 +20,7 @@ def search_memories_node(services: GraphServices):
             return {'relevantMemories': []}
 
         try:
-            memories = services.memory_client.search(
+            memories = await services.memory_client.search(
                 query=question,
                 user_id=user_id,
                 limit=5,
@@ -7,10 +7,10 @@ from app.graph.state import AgentState
 
 
 def store_memories_node(services: GraphServices):
-    """Store memories from the conversation turn after response generation."""
+    """Queue the conversation turn for background memory consolidation."""
 
     async def _node(state: AgentState) -> Dict[str, Any]:
-        if not services.memory_client:
+        if not services.memory_queue:
             return {}
 
         user_id = state.get('metadata', {}).get('userId', '')
@@ -26,12 +26,10 @@ def store_memories_node(services: GraphServices):
                 {"role": "assistant", "content": answer or ""},
             ]
 
-            services.memory_client.add(
-                messages=messages,
+            await services.memory_queue.enqueue(
                 user_id=user_id,
-                metadata={
-                    "conversationId": state.get('metadata', {}).get('conversationId', ''),
-                }
+                messages=messages,
+                conversation_id=state.get('metadata', {}).get('conversationId', ''),
             )
         except Exception:
             pass
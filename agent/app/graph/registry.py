@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Mapping
+
+from app.graph.builder import FULL_VARIANT, GRAPH_VARIANTS, build_graph
+from app.graph.services import GraphServices
+
+logger = logging.getLogger(__name__)
+
+
+class GraphRegistry:
+    """Holds one compiled graph per variant, built once at startup.
+
+    Compiled LangGraph graphs are stateless between invocations (no
+    checkpointer is configured), so a single instance can serve any number
+    of concurrent runs.
+    """
+
+    def __init__(self, services: GraphServices, default_variant: str = FULL_VARIANT) -> None:
+        if default_variant not in GRAPH_VARIANTS:
+            raise ValueError(f'Unknown graph variant: {default_variant}')
+        self.default_variant = default_variant
+        self.compile_ms: Dict[str, float] = {}
+        self._graphs: Dict[str, Any] = {}
+        for variant in GRAPH_VARIANTS:
+            start = time.perf_counter()
+            self._graphs[variant] = build_graph(services, variant)
+            self.compile_ms[variant] = (time.perf_counter() - start) * 1000
+        logger.info('Compiled agent graphs: %s', {
+            variant: f'{ms:.1f}ms' for variant, ms in self.compile_ms.items()
+        })
+
+    @property
+    def variants(self) -> tuple[str, ...]:
+        return tuple(self._graphs)
+
+    def get(self, variant: str | None = None):
+        """Return the compiled graph for a variant, falling back to the default."""
+        if variant and variant in self._graphs:
+            return self._graphs[variant]
+        if variant:
+            logger.warning('Unknown graph variant %r, using %r', variant, self.default_variant)
+        return self._graphs[self.default_variant]
+
+    def for_state(self, state: Mapping[str, Any]):
+        """Pick the graph requested by the run config (runConfig.graphVariant)."""
+        run_config = (state.get('metadata') or {}).get('runConfig') or {}
+        return self.get(run_config.get('graphVariant'))
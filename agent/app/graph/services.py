@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import asyncio
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Optional
 
-from app.observability import RunEventBus
-from app.tools import AppApiClient, LlmClient, MemoryClient, EmbeddingClient, DocRetriever
+from app.observability import EventBus, RunTelemetryWriter
+from app.tools import AppApiClient, LlmClient, MemoryClient, MemoryWriteQueue, EmbeddingClient, DocRetriever
 from app.tools.tavily_client import TavilyClient
 from app.tools.integration_client import IntegrationClient
 
@@ -13,11 +12,12 @@ from app.tools.integration_client import IntegrationClient
 @dataclass
 class GraphServices:
     app_api_client: AppApiClient
-    event_bus: RunEventBus
+    event_bus: EventBus
     llm_client: LlmClient
     memory_client: Optional[MemoryClient] = None
+    memory_queue: Optional[MemoryWriteQueue] = None
     tavily_client: Optional[TavilyClient] = None
     embedding_client: Optional[EmbeddingClient] = None
     doc_retriever: Optional[DocRetriever] = None
     integration_client: Optional[IntegrationClient] = None
-    tool_budget_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    telemetry: Optional[RunTelemetryWriter] = None
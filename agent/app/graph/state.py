@@ -1,8 +1,16 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, TypedDict
+import operator
+from typing import Annotated, Any, Dict, List, TypedDict
 from typing_extensions import NotRequired
 
+from app.graph.budget import ToolBudget
+
+
+def merge_dicts(left: Dict[str, Any] | None, right: Dict[str, Any] | None) -> Dict[str, Any]:
+    """Reducer that lets parallel branches each contribute keys to one dict."""
+    return {**(left or {}), **(right or {})}
+
 
 class AgentState(TypedDict):
     runId: str
@@ -35,7 +43,10 @@ class AgentState(TypedDict):
     memoryUpdates: NotRequired[Dict[str, Any]]
 
     # Metadata & diagnostics
+    # warnings/timings use reducers so parallel branches can update them in the same step;
+    # nodes return only their new entries.
     metadata: NotRequired[Dict[str, Any]]
-    warnings: NotRequired[List[str]]
+    warnings: Annotated[List[str], operator.add]
     toolCallCount: NotRequired[int]
-    timings: NotRequired[Dict[str, Any]]
+    toolBudget: NotRequired[ToolBudget]
+    timings: Annotated[Dict[str, Any], merge_dicts]
@@ -1,3 +1,16 @@
-from .events import RunEventBus
+from .coalescer import TokenCoalescer
+from .events import BusMessage, EventBus, RunEventBus, SubscriberLagged
+from .factory import create_event_bus
+from .loop_lag import EventLoopLagMonitor
+from .telemetry import RunTelemetryWriter
 
-__all__ = ['RunEventBus']
+__all__ = [
+    'BusMessage',
+    'EventBus',
+    'EventLoopLagMonitor',
+    'RunEventBus',
+    'RunTelemetryWriter',
+    'SubscriberLagged',
+    'TokenCoalescer',
+    'create_event_bus',
+]
@@ -1,30 +1,255 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Deque, Dict, Protocol, runtime_checkable
 
 from app.schemas import StreamEvent
 
+logger = logging.getLogger(__name__)
+
+TERMINAL_EVENTS = frozenset({'completed'})
+SLOW_SUBSCRIBER_POLICIES = ('skip', 'drop')
+
+
+class BusMessage:
+    """A buffered event plus its wire encoding, computed once for all subscribers."""
+
+    __slots__ = ('event', '_encoded')
+
+    def __init__(self, event: StreamEvent, encoded: str | None = None) -> None:
+        self.event = event
+        self._encoded = encoded
+
+    @property
+    def encoded(self) -> str:
+        if self._encoded is None:
+            self._encoded = self.event.model_dump_json(by_alias=True)
+        return self._encoded
+
+
+class SubscriberLagged(Exception):
+    """Raised to a subscriber that fell behind the ring buffer under the 'drop' policy."""
+
+
+@runtime_checkable
+class EventBus(Protocol):
+    """Interface shared by event bus backends. Implement this to add new backends."""
+
+    async def emit(self, run_id: str, event: str, payload: Dict[str, Any] | None = None) -> None:
+        """Append an event to the run's log."""
+        ...
+
+    def subscribe(self, run_id: str) -> AsyncIterator[BusMessage]:
+        """Replay the run's buffered events, then follow live ones until it completes."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release backend resources on shutdown."""
+        ...
+
+
+class _RunLog:
+    """Bounded ring buffer of one run's events, addressed by sequence number."""
+
+    def __init__(self, max_events: int) -> None:
+        self.events: Deque[BusMessage] = deque(maxlen=max_events)
+        self.first_seq = 0
+        self.next_seq = 0
+        self.finished = False
+        self.subscribers = 0
+        self.last_activity = time.monotonic()
+        self._new_data = asyncio.Event()
+
+    def append(self, message: BusMessage) -> int:
+        """Append a message; returns how many old messages the ring buffer dropped."""
+        dropped = 0
+        if len(self.events) == self.events.maxlen:
+            self.first_seq += 1
+            dropped = 1
+        self.events.append(message)
+        self.next_seq += 1
+        self.last_activity = time.monotonic()
+        if message.event.event in TERMINAL_EVENTS:
+            self.finished = True
+        self._wake()
+        return dropped
+
+    def read_from(self, seq: int) -> list[BusMessage]:
+        start = max(seq - self.first_seq, 0)
+        return list(self.events)[start:]
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for new data; returns False on timeout."""
+        waiter = self._new_data
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _wake(self) -> None:
+        self._new_data.set()
+        self._new_data = asyncio.Event()
+
 
 class RunEventBus:
-    def __init__(self) -> None:
-        self._queues: dict[str, asyncio.Queue[StreamEvent]] = {}
+    """In-process event bus with bounded, replayable per-run logs.
 
-    def get_queue(self, run_id: str) -> asyncio.Queue[StreamEvent]:
-        if run_id not in self._queues:
-            self._queues[run_id] = asyncio.Queue()
-        return self._queues[run_id]
+    Each run keeps its last ``max_events_per_run`` events so subscribers that
+    connect after the run started are replayed what they missed. Any number
+    of subscribers can follow a run: each keeps its own cursor over the shared
+    log, and each message is encoded once no matter how many read it. The
+    producer only appends, so a slow subscriber never holds it up; a
+    subscriber that falls out of the buffer is either skipped ahead with a
+    ``lagged`` notice or dropped, per ``slow_subscriber_policy``. Runs are
+    evicted once idle for ``idle_ttl_seconds`` without subscribers, and the
+    oldest runs are evicted whenever more than ``max_buffered_events`` events
+    are held in total, so runs nobody watches no longer leak. Runs with live
+    subscribers are never evicted. Idle runs are swept on a background timer
+    as well as on ``emit`` and ``subscribe``, so memory is reclaimed even
+    when no new events arrive.
+    """
+
+    def __init__(
+        self,
+        max_events_per_run: int = 1000,
+        idle_ttl_seconds: float = 300.0,
+        max_buffered_events: int = 100_000,
+        sweep_interval_seconds: float = 10.0,
+        slow_subscriber_policy: str = 'skip',
+    ) -> None:
+        if slow_subscriber_policy not in SLOW_SUBSCRIBER_POLICIES:
+            raise ValueError(f'Unknown slow subscriber policy: {slow_subscriber_policy}')
+        self.slow_subscriber_policy = slow_subscriber_policy
+        self.max_events_per_run = max_events_per_run
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_buffered_events = max_buffered_events
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # Ordered by last activity (least recent first) for LRU eviction
+        self._runs: OrderedDict[str, _RunLog] = OrderedDict()
+        self._buffered_events = 0
+        self._last_sweep = time.monotonic()
+        self._sweeper: asyncio.Task[None] | None = None
+
+    def _get_log(self, run_id: str) -> _RunLog:
+        log = self._runs.get(run_id)
+        if log is None:
+            log = self._runs[run_id] = _RunLog(self.max_events_per_run)
+        else:
+            self._runs.move_to_end(run_id)
+        return log
 
     async def emit(self, run_id: str, event: str, payload: Dict[str, Any] | None = None) -> None:
-        queue = self.get_queue(run_id)
+        log = self._get_log(run_id)
         message = StreamEvent(
             run_id=run_id,
             event=event,
             timestamp=datetime.now(timezone.utc),
             payload=payload,
         )
-        await queue.put(message)
+        self._buffered_events += 1 - log.append(BusMessage(message))
+        self._maybe_evict()
+        self._ensure_sweeper()
+
+    async def subscribe(self, run_id: str) -> AsyncIterator[BusMessage]:
+        """Yield the run's buffered messages, then live ones, until the run completes.
+
+        Ends early if the run stays silent for ``idle_ttl_seconds``.
+        """
+        self._maybe_evict()
+        self._ensure_sweeper()
+        log = self._get_log(run_id)
+        log.subscribers += 1
+        cursor = log.first_seq
+        try:
+            while True:
+                if cursor < log.first_seq:
+                    skipped = log.first_seq - cursor
+                    if self.slow_subscriber_policy == 'drop':
+                        raise SubscriberLagged(f'Subscriber of run {run_id} fell {skipped} events behind')
+                    logger.warning('Subscriber of run %s fell behind; skipped %d events', run_id, skipped)
+                    cursor = log.first_seq
+                    yield BusMessage(StreamEvent(
+                        run_id=run_id,
+                        event='lagged',
+                        timestamp=datetime.now(timezone.utc),
+                        payload={'skipped': skipped},
+                    ))
+                    continue
+                pending = log.read_from(cursor)
+                for message in pending:
+                    cursor += 1
+                    yield message
+                if pending:
+                    continue
+                if log.finished:
+                    return
+                if not await log.wait(self.idle_ttl_seconds):
+                    logger.warning('Run %s idle for %.0fs; ending subscription', run_id, self.idle_ttl_seconds)
+                    return
+        finally:
+            log.subscribers -= 1
+            log.last_activity = time.monotonic()
+
+    def subscriber_count(self, run_id: str) -> int:
+        log = self._runs.get(run_id)
+        return log.subscribers if log else 0
+
+    async def aclose(self) -> None:
+        if self._sweeper and not self._sweeper.done():
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+        self._sweeper = None
 
     def close(self, run_id: str) -> None:
-        self._queues.pop(run_id, None)
+        """Drop a run's buffered events immediately."""
+        log = self._runs.pop(run_id, None)
+        if log is not None:
+            self._buffered_events -= len(log.events)
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        while self._runs:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                self._maybe_evict()
+            except Exception as exc:
+                logger.warning('Event bus sweep failed: %s', exc)
+        # Nothing buffered; the next emit/subscribe restarts the sweeper
+
+    def _maybe_evict(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval_seconds:
+            self._last_sweep = now
+            for run_id, log in list(self._runs.items()):
+                if not log.subscribers and now - log.last_activity >= self.idle_ttl_seconds:
+                    self.close(run_id)
+
+        if self._buffered_events <= self.max_buffered_events:
+            return
+        # Over the memory cap: evict least recently active runs. Watched runs
+        # are kept: evicting one would orphan its subscribers mid-stream.
+        for run_id, log in list(self._runs.items()):
+            if self._buffered_events <= self.max_buffered_events:
+                return
+            if not log.subscribers:
+                logger.warning('Event bus over capacity; evicting run %s', run_id)
+                self.close(run_id)
+        logger.warning(
+            'Event bus still over capacity (%d events) with only watched runs left',
+            self._buffered_events,
+        )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'runs': len(self._runs),
+            'bufferedEvents': self._buffered_events,
+        }
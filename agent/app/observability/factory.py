@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from app.config import get_settings
+from .events import EventBus, RunEventBus
+
+
+def create_event_bus(backend: Optional[str] = None) -> EventBus:
+    """Factory to create the configured event bus.
+
+    Supports 'memory' (default, single process) and 'redis' (Redis Streams,
+    shared across workers and nodes).
+    """
+    settings = get_settings()
+    backend = backend or settings.event_bus_backend
+
+    if backend == 'memory':
+        return RunEventBus(
+            max_events_per_run=settings.event_bus_max_events_per_run,
+            idle_ttl_seconds=settings.event_bus_idle_ttl_seconds,
+            max_buffered_events=settings.event_bus_max_buffered_events,
+            slow_subscriber_policy=settings.event_bus_slow_subscriber_policy,
+        )
+    elif backend == 'redis':
+        from .redis_events import RedisRunEventBus
+        return RedisRunEventBus(
+            url=settings.redis_url,
+            key_prefix=settings.event_bus_redis_prefix,
+            max_events_per_run=settings.event_bus_max_events_per_run,
+            idle_ttl_seconds=settings.event_bus_idle_ttl_seconds,
+        )
+    else:
+        raise ValueError(f'Unknown event bus backend: {backend}')
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task.
+
+    Every ``interval_seconds`` the monitor sleeps and records how much longer
+    than requested the sleep took. Anything blocking the loop (synchronous
+    I/O, CPU-heavy work) shows up directly as lag. Lags above
+    ``warn_threshold_ms`` are logged.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.25,
+        warn_threshold_ms: float = 100.0,
+        window: int = 240,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.warn_threshold_ms = warn_threshold_ms
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max((time.perf_counter() - start - self.interval_seconds) * 1000, 0.0)
+            self._samples.append(lag_ms)
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+            if lag_ms >= self.warn_threshold_ms:
+                logger.warning('Event loop blocked for %.0fms', lag_ms)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Lag over the recent window (ms), plus the max since startup."""
+        if not self._samples:
+            return {'lastMs': 0.0, 'p50Ms': 0.0, 'p99Ms': 0.0, 'maxMs': 0.0}
+        ordered = sorted(self._samples)
+        return {
+            'lastMs': round(self._samples[-1], 2),
+            'p50Ms': round(ordered[len(ordered) // 2], 2),
+            'p99Ms': round(ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)], 2),
+            'maxMs': round(self._max_lag_ms, 2),
+        }
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import math
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict
+
+import redis.asyncio as redis
+
+from app.observability.events import TERMINAL_EVENTS, BusMessage
+from app.schemas import StreamEvent
+
+logger = logging.getLogger(__name__)
+
+
+class RedisRunEventBus:
+    """Event bus backed by Redis Streams, one stream per run.
+
+    Lets the worker executing a run and the worker holding the WebSocket be
+    different processes or nodes. Streams are trimmed to roughly
+    ``max_events_per_run`` entries and expire after ``idle_ttl_seconds``
+    without new events; subscribers read from the start of the stream, so
+    late subscribers get the same replay as with the in-memory bus.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        key_prefix: str = 'agentpm:events',
+        max_events_per_run: int = 1000,
+        idle_ttl_seconds: float = 300.0,
+        block_ms: int = 5000,
+        client: redis.Redis | None = None,
+    ) -> None:
+        if client is None and url is None:
+            raise ValueError('RedisRunEventBus needs a url or a client')
+        self.key_prefix = key_prefix
+        self.max_events_per_run = max_events_per_run
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.block_ms = block_ms
+        # An injected client must be created with decode_responses=True
+        self._redis = client if client is not None else redis.from_url(url, decode_responses=True)
+
+    def _key(self, run_id: str) -> str:
+        return f'{self.key_prefix}:run:{run_id}'
+
+    async def emit(self, run_id: str, event: str, payload: Dict[str, Any] | None = None) -> None:
+        message = StreamEvent(
+            run_id=run_id,
+            event=event,
+            timestamp=datetime.now(timezone.utc),
+            payload=payload,
+        )
+        key = self._key(run_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                key,
+                {'data': message.model_dump_json(by_alias=True)},
+                maxlen=self.max_events_per_run,
+                approximate=True,
+            )
+            pipe.expire(key, max(1, math.ceil(self.idle_ttl_seconds)))
+            await pipe.execute()
+
+    async def subscribe(self, run_id: str) -> AsyncIterator[BusMessage]:
+        """Yield the run's stream from the beginning, then block for live entries.
+
+        Ends on a terminal event or after ``idle_ttl_seconds`` without entries.
+        """
+        key = self._key(run_id)
+        last_id = '0-0'
+        idle_since = time.monotonic()
+        while True:
+            response = await self._redis.xread({key: last_id}, count=100, block=self.block_ms)
+            if not response:
+                if time.monotonic() - idle_since >= self.idle_ttl_seconds:
+                    logger.warning('Run %s idle for %.0fs; ending subscription', run_id, self.idle_ttl_seconds)
+                    return
+                continue
+            idle_since = time.monotonic()
+            for _stream, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    encoded = fields.get('data')
+                    if not encoded:
+                        continue
+                    # The wire encoding is forwarded as-is; the model is only needed for routing.
+                    event = StreamEvent.model_validate(json.loads(encoded))
+                    yield BusMessage(event, encoded=encoded)
+                    if event.event in TERMINAL_EVENTS:
+                        return
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from app.tools.app_api_client import AppApiClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _RunBuffer:
+    auth_token: str | None = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def __len__(self) -> int:
+        return len(self.events) + len(self.tool_calls)
+
+
+class RunTelemetryWriter:
+    """Write-behind buffer for run events and tool-call records.
+
+    Nodes record telemetry without awaiting the API; records are batched per
+    run and flushed to the bulk endpoint when a run's buffer reaches
+    ``max_batch_size``, every ``flush_interval_seconds``, when the run
+    persists, and on shutdown.
+    """
+
+    def __init__(
+        self,
+        api_client: 'AppApiClient',
+        max_batch_size: int = 50,
+        flush_interval_seconds: float = 0.5,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.api = api_client
+        self.max_batch_size = max_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self._buffers: Dict[str, _RunBuffer] = {}
+        self._pending = 0
+        self._task: asyncio.Task[None] | None = None
+        self._inflight: set[asyncio.Task[None]] = set()
+        self.metrics: Dict[str, int] = {
+            'recorded': 0,
+            'flushed': 0,
+            'batches': 0,
+            'failed': 0,
+            'dropped': 0,
+            'cancelled': 0,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop the periodic flusher and drain everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._drain_inflight()
+        await self.flush_all()
+        await self._drain_inflight()
+        logger.info('Run telemetry writer closed: %s', self.metrics)
+
+    async def _drain_inflight(self) -> None:
+        # Flush tasks spawn send tasks, so loop until nothing is left in flight
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def record_event(
+        self,
+        run_id: str,
+        event_type: str,
+        payload: Dict[str, Any],
+        auth_token: str | None = None,
+    ) -> None:
+        self._record(run_id, auth_token, 'events', {
+            'type': event_type,
+            'payload': payload,
+        })
+
+    def record_tool_call(
+        self,
+        run_id: str,
+        tool_name: str,
+        request_json: Dict[str, Any],
+        response_json: Dict[str, Any],
+        latency_ms: float,
+        auth_token: str | None = None,
+    ) -> None:
+        self._record(run_id, auth_token, 'tool_calls', {
+            'toolName': tool_name,
+            'requestJson': request_json,
+            'responseJson': response_json,
+            'latencyMs': latency_ms,
+        })
+
+    def _record(self, run_id: str, auth_token: str | None, kind: str, record: Dict[str, Any]) -> None:
+        if self._pending >= self.max_pending:
+            self.metrics['dropped'] += 1
+            logger.warning('Telemetry buffer full (%d pending); dropping %s for run %s', self._pending, kind, run_id)
+            return
+        buffer = self._buffers.get(run_id)
+        if buffer is None:
+            buffer = self._buffers[run_id] = _RunBuffer()
+        if auth_token:
+            buffer.auth_token = auth_token
+        getattr(buffer, kind).append(record)
+        self._pending += 1
+        self.metrics['recorded'] += 1
+        if len(buffer) >= self.max_batch_size:
+            task = asyncio.create_task(self.flush(run_id))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def flush(self, run_id: str) -> None:
+        """Send everything buffered for one run in a single bulk request."""
+        buffer = self._buffers.get(run_id)
+        if buffer is None:
+            return
+        # Per-run lock keeps batches of the same run in order; runs never wait on each other.
+        async with buffer.lock:
+            events, buffer.events = buffer.events, []
+            tool_calls, buffer.tool_calls = buffer.tool_calls, []
+            count = len(events) + len(tool_calls)
+            if not count:
+                if self._buffers.get(run_id) is buffer:
+                    self._buffers.pop(run_id, None)
+                return
+            self._pending -= count
+            # The send runs as its own task and is shielded: a caller cancelled
+            # mid-flush (e.g. a closed WebSocket cancelling the run) must not
+            # lose the swapped-out records. close() waits for it.
+            send = asyncio.ensure_future(self._send(run_id, events, tool_calls, buffer.auth_token))
+            self._inflight.add(send)
+            send.add_done_callback(self._inflight.discard)
+            try:
+                await asyncio.shield(send)
+            finally:
+                if not buffer and self._buffers.get(run_id) is buffer:
+                    self._buffers.pop(run_id, None)
+
+    async def _send(
+        self,
+        run_id: str,
+        events: List[Dict[str, Any]],
+        tool_calls: List[Dict[str, Any]],
+        auth_token: str | None,
+    ) -> None:
+        count = len(events) + len(tool_calls)
+        try:
+            await self.api.create_telemetry_batch(
+                run_id,
+                events=events,
+                tool_calls=tool_calls,
+                auth_token=auth_token,
+            )
+            self.metrics['flushed'] += count
+            self.metrics['batches'] += 1
+        except asyncio.CancelledError:
+            self.metrics['cancelled'] += count
+            logger.warning('Telemetry flush of %d records for run %s was cancelled', count, run_id)
+            raise
+        except Exception as exc:
+            # Telemetry must never fail the run; account for the loss instead.
+            self.metrics['failed'] += count
+            logger.warning('Failed to flush %d telemetry records for run %s: %s', count, run_id, exc)
+
+    async def flush_all(self) -> None:
+        run_ids = list(self._buffers)
+        if run_ids:
+            await asyncio.gather(*(self.flush(run_id) for run_id in run_ids))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush_all()
+            except Exception as exc:
+                logger.warning('Telemetry flush loop error: %s', exc)
@@ -1,48 +1,90 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import codecs
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import tempfile
+import uuid
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from app.config import get_settings
 from app.tools.embedding_client import EmbeddingClient
+from app.tools.embedding_codec import encode_b64
 from app.tools.minio_client import MinioClient
+from app.tools.resilience import with_retry
+from app.tools.vector_cache import ProjectVectorCache
 from app.tools import AppApiClient
+from .parse_pool import ParsePool
 
 logger = logging.getLogger(__name__)
 
 
-def _parse_pdf(data: bytes) -> str:
+# Page iterators read from a spooled file and yield one text segment at a
+# time, so only the current page (not the whole document) is held as text.
+
+def _iter_pdf_pages(path: str) -> Iterator[str]:
     from pypdf import PdfReader
-    reader = PdfReader(io.BytesIO(data))
-    pages = []
+    reader = PdfReader(path)
     for page in reader.pages:
         text = page.extract_text()
         if text:
-            pages.append(text)
-    return '\n\n'.join(pages)
+            yield text
 
 
-def _parse_docx(data: bytes) -> str:
+def _iter_docx_paragraphs(path: str) -> Iterator[str]:
     from docx import Document as DocxDocument
-    doc = DocxDocument(io.BytesIO(data))
-    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-    return '\n\n'.join(paragraphs)
+    doc = DocxDocument(path)
+    for p in doc.paragraphs:
+        if p.text.strip():
+            yield p.text
 
 
-def _parse_text(data: bytes) -> str:
-    return data.decode('utf-8', errors='replace')
+def _iter_text_blocks(path: str, block_size: int = 64 * 1024) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            text = decoder.decode(block)
+            if text:
+                yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
 
 
 MIME_PARSERS = {
-    'application/pdf': _parse_pdf,
-    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': _parse_docx,
-    'text/plain': _parse_text,
-    'text/markdown': _parse_text,
+    'application/pdf': _iter_pdf_pages,
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': _iter_docx_paragraphs,
+    'text/plain': _iter_text_blocks,
+    'text/markdown': _iter_text_blocks,
+}
+
+# Separator placed between consecutive segments (pages / paragraphs)
+_SEGMENT_SEPARATORS = {
+    _iter_pdf_pages: '\n\n',
+    _iter_docx_paragraphs: '\n\n',
+    _iter_text_blocks: '',
 }
 
 
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+async def _aiter_segments(segments: Iterator[str]) -> AsyncIterator[str]:
+    """Drive a blocking segment iterator from a worker thread, one segment at a time."""
+    sentinel = object()
+    while True:
+        segment = await asyncio.to_thread(next, segments, sentinel)
+        if segment is sentinel:
+            return
+        yield segment
+
+
 class DocumentProcessor:
     """Processes uploaded documents: parse, chunk, embed, and persist."""
 
@@ -51,19 +93,41 @@ class DocumentProcessor:
         minio_client: Optional[MinioClient],
         embedding_client: EmbeddingClient,
         api_client: AppApiClient,
+        vector_cache: Optional[ProjectVectorCache] = None,
+        parse_pool: Optional[ParsePool] = None,
     ) -> None:
         self.minio = minio_client
+        self.parse_pool = parse_pool
         self.embedding = embedding_client
         self.api = api_client
+        self.vector_cache = vector_cache
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=1500,
             chunk_overlap=150,
             length_function=len,
             separators=['\n\n', '\n', '. ', ' ', ''],
         )
+        settings = get_settings()
+        self.split_window_chars = settings.ingest_split_window_chars
+        self.chunk_window_size = settings.ingest_chunk_window_size
+        self.upload_queue_size = settings.ingest_upload_queue_size
+        self.upload_retries = settings.ingest_upload_retries
 
-    async def process(self, document_id: str, s3_key: str, mime_type: str, project_id: str) -> None:
-        """Full document processing pipeline."""
+    async def process(
+        self,
+        document_id: str,
+        s3_key: str,
+        mime_type: str,
+        project_id: str,
+        incremental: bool = False,
+    ) -> None:
+        """Full document processing pipeline.
+
+        The object is spooled to a temp file, parsed page by page, and
+        chunked, embedded and persisted in bounded windows, so memory stays
+        flat regardless of document size. With ``incremental``, only chunks
+        not already stored for the document are embedded (see ``_ingest``).
+        """
         try:
             # Update status to processing
             await self.api.patch(f'/documents/{document_id}/status', {
@@ -73,16 +137,31 @@ class DocumentProcessor:
             if self.minio is None:
                 raise ValueError('MinIO client is not available')
 
-            # 1. Download from MinIO
-            logger.info(f'Downloading {s3_key} from MinIO')
-            data = self.minio.download(s3_key)
-
-            # 2. Parse document
             parser = MIME_PARSERS.get(mime_type)
             if not parser:
                 raise ValueError(f'Unsupported MIME type: {mime_type}')
-            text = parser(data)
-            await self.process_text(document_id=document_id, text=text, project_id=project_id)
+
+            # 1. Spool from MinIO to disk (streamed, never fully in memory)
+            fd, path = tempfile.mkstemp(prefix='agentpm-doc-')
+            os.close(fd)
+            try:
+                logger.info(f'Downloading {s3_key} from MinIO')
+                await asyncio.to_thread(self.minio.download_to_file, s3_key, path)
+
+                # 2-6. Parse page by page; chunk, embed and persist in windows.
+                # PDF/DOCX extraction is CPU-bound and goes to the process pool.
+                if self.parse_pool and self.parse_pool.supports(mime_type):
+                    segments = self.parse_pool.iter_segments(path, mime_type)
+                else:
+                    segments = _aiter_segments(parser(path))
+                await self._ingest(
+                    document_id=document_id,
+                    project_id=project_id,
+                    chunks=self._iter_chunks(segments, _SEGMENT_SEPARATORS[parser]),
+                    incremental=incremental,
+                )
+            finally:
+                os.unlink(path)
 
         except Exception as exc:
             logger.error(f'Document processing failed for {document_id}: {exc}')
@@ -95,50 +174,232 @@ class DocumentProcessor:
                 logger.error(f'Failed to update error status for {document_id}')
             raise
 
-    async def process_text(self, document_id: str, text: str, project_id: str) -> None:
-        """Process plain text content: chunk, embed, and persist."""
+    async def _iter_chunks(self, segments: AsyncIterator[str], separator: str) -> AsyncIterator[str]:
+        """Split a stream of text segments into chunks, a bounded window at a time.
+
+        Once the buffer exceeds ``split_window_chars`` it is split and every
+        chunk but the last is emitted; the buffer from where the last one
+        starts is carried into the next window, so chunk boundaries match
+        splitting the whole text at once closely. The raw tail is carried
+        rather than the chunk itself, which the splitter strips: trailing
+        whitespace would be lost and words glued across windows.
+        """
+        buffer = ''
+        async for segment in segments:
+            buffer = f'{buffer}{separator}{segment}' if buffer else segment
+            if len(buffer) >= self.split_window_chars:
+                pieces = self.splitter.split_text(buffer)
+                for piece in pieces[:-1]:
+                    yield piece
+                if not pieces:
+                    buffer = ''
+                else:
+                    start = buffer.rfind(pieces[-1])
+                    buffer = buffer[start:] if start >= 0 else pieces[-1]
+        if buffer.strip():
+            for piece in self.splitter.split_text(buffer):
+                yield piece
+
+    async def _embed_window(self, window: List[Tuple[int, str]], pending: bool = False) -> List[Dict[str, Any]]:
+        embeddings = await self.embedding.embed_batch([chunk_text for _, chunk_text in window])
+        chunk_payloads: List[Dict[str, Any]] = []
+        for (chunk_index, chunk_text), emb in zip(window, embeddings):
+            chunk_payloads.append({
+                # Fixed before the first attempt, so a retried upload is idempotent
+                'id': str(uuid.uuid4()),
+                'chunkIndex': chunk_index,
+                'content': chunk_text,
+                # float32 buffer, base64 in JSON; the API decodes it
+                'embeddingB64': encode_b64(emb) if emb else None,
+                'tokenCount': len(chunk_text.split()),
+                'metadata': {'contentHash': _content_hash(chunk_text)},
+                'pending': pending,
+            })
+        return chunk_payloads
+
+    async def _stored_chunks(self, document_id: str) -> Tuple[Dict[str, Deque[Tuple[str, int]]], set]:
+        """Stored chunks by content hash (hash -> (id, chunkIndex) in document order) and all stored ids."""
+        response = await self.api.get(f'/documents/{document_id}/chunks/hashes')
+        rows = response.get('chunks') or []
+        by_hash: Dict[str, Deque[Tuple[str, int]]] = defaultdict(deque)
+        for row in rows:
+            # Chunks stored before content hashing never match and are replaced
+            if row.get('contentHash'):
+                by_hash[row['contentHash']].append((row['id'], row['chunkIndex']))
+        return dict(by_hash), {row['id'] for row in rows}
+
+    async def _discard_pending(self, document_id: str) -> None:
+        """Drop the document's pending chunks; best effort, the next run retries."""
         try:
-            await self.api.patch(f'/documents/{document_id}/status', {
-                'status': 'processing',
+            await self.api.post(f'/documents/{document_id}/chunks/sync', {
+                'reindex': [],
+                'deleteIds': [],
+                'discard': True,
             })
+        except Exception as exc:
+            logger.warning(f'Failed to discard pending chunks of {document_id}: {exc}')
 
-            if not text.strip():
-                raise ValueError('Document contains no extractable text')
+    async def _upload_pages(self, document_id: str, pages: asyncio.Queue, report_progress: bool = True) -> None:
+        """Consume embedded chunk pages and POST them until the ``None`` sentinel.
 
-            logger.info(f'Parsed document: {len(text)} chars')
+        Failed POSTs are retried with the same chunk ids, so a page that was
+        stored before the response was lost is not stored twice.
+        """
+        uploaded = 0
+        while True:
+            page = await pages.get()
+            if page is None:
+                return
 
-            # 3. Chunk text
-            chunks = self.splitter.split_text(text)
-            logger.info(f'Split into {len(chunks)} chunks')
+            async def _post(page: List[Dict[str, Any]] = page) -> None:
+                await self.api.post(f'/documents/{document_id}/chunks', {'chunks': page})
 
-            # 4. Generate embeddings in batches
-            embeddings = await self.embedding.embed_batch(
-                [c for c in chunks],
-                batch_size=10,
-            )
+            await with_retry(_post, max_retries=self.upload_retries, base_delay=1.0)
+            uploaded += len(page)
+            if not report_progress:
+                continue
+            # Report progress; chunks are queryable as soon as they land
+            try:
+                await self.api.patch(f'/documents/{document_id}/status', {
+                    'status': 'processing',
+                    'chunkCount': uploaded,
+                })
+            except Exception as exc:
+                logger.warning(f'Progress update failed for {document_id}: {exc}')
 
-            # 5. Prepare chunk payloads
-            chunk_payloads: List[Dict[str, Any]] = []
-            for i, (chunk_text, emb) in enumerate(zip(chunks, embeddings)):
-                chunk_payloads.append({
-                    'chunkIndex': i,
-                    'content': chunk_text,
-                    'embedding': emb,
-                    'tokenCount': len(chunk_text.split()),
+    async def _ingest(
+        self,
+        document_id: str,
+        project_id: str,
+        chunks: AsyncIterator[str],
+        incremental: bool = False,
+    ) -> None:
+        """Embed and persist chunks ``chunk_window_size`` at a time, then mark processed.
+
+        Embedding and upload overlap: embedded pages go through a bounded
+        queue (``ingest_upload_queue_size`` pages) to an uploader task, so
+        the next window is embedded while the previous one is posted, and a
+        slow API applies backpressure instead of buffering pages in memory.
+
+        With ``incremental``, chunks whose content hash matches a chunk
+        already stored for the document are kept (and moved to their new
+        position) instead of being embedded and uploaded again. New chunks
+        are uploaded as pending, hidden from retrieval; the closing
+        ``/chunks/sync`` moves the kept chunks, deletes the ones that no
+        longer appear and publishes the pending ones in one transaction. A
+        failed run discards its pending chunks, leaving the previous version
+        intact.
+        """
+        stored: Dict[str, Deque[Tuple[str, int]]] = {}
+        stale: set = set()
+        if incremental:
+            # Pending chunks of a run that died without cleaning up would be published with this one
+            await self._discard_pending(document_id)
+            stored, stale = await self._stored_chunks(document_id)
+        reindex: List[Dict[str, Any]] = []
+
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.upload_queue_size)
+        # Incremental uploads are pending and the previous version's chunkCount
+        # stays accurate until the sync, so they do not report progress
+        uploader = asyncio.create_task(self._upload_pages(document_id, pages, report_progress=not incremental))
+
+        async def _enqueue(page: Optional[List[Dict[str, Any]]]) -> None:
+            put = asyncio.ensure_future(pages.put(page))
+            await asyncio.wait({put, uploader}, return_when=asyncio.FIRST_COMPLETED)
+            if uploader.done() and not put.done():
+                put.cancel()
+            if uploader.done() and uploader.exception():
+                raise uploader.exception()
+
+        total = embedded = 0
+        window: List[Tuple[int, str]] = []
+        try:
+            try:
+                async for chunk in chunks:
+                    index, total = total, total + 1
+                    matches = stored.get(_content_hash(chunk)) if stored else None
+                    if matches:
+                        chunk_id, stored_index = matches.popleft()
+                        stale.discard(chunk_id)
+                        if stored_index != index:
+                            reindex.append({'id': chunk_id, 'chunkIndex': index})
+                        continue
+                    window.append((index, chunk))
+                    embedded += 1
+                    if len(window) >= self.chunk_window_size:
+                        await _enqueue(await self._embed_window(window, pending=incremental))
+                        window = []
+                if window:
+                    await _enqueue(await self._embed_window(window, pending=incremental))
+                await _enqueue(None)
+                await uploader
+            finally:
+                if not uploader.done():
+                    uploader.cancel()
+                    await asyncio.gather(uploader, return_exceptions=True)
+
+            if not total:
+                raise ValueError('Document contains no extractable text')
+
+            if incremental:
+                await self.api.post(f'/documents/{document_id}/chunks/sync', {
+                    'reindex': reindex,
+                    'deleteIds': sorted(stale),
                 })
+                logger.info(
+                    f'Document {document_id} re-ingested incrementally: '
+                    f'{embedded} chunks embedded, '
+                    f'{len(reindex)} moved, {len(stale)} deleted'
+                )
+        except Exception:
+            if incremental:
+                await self._discard_pending(document_id)
+            raise
 
-            # 6. Bulk create chunks via API
-            await self.api.post(f'/documents/{document_id}/chunks', {
-                'chunks': chunk_payloads,
-            })
+        # Update document status
+        await self.api.patch(f'/documents/{document_id}/status', {
+            'status': 'processed',
+            'chunkCount': total,
+        })
 
-            # 7. Update document status
+        # Keep the project's in-process vector index current, if cached
+        if self.vector_cache:
+            try:
+                await self.vector_cache.refresh_document(project_id, document_id)
+            except Exception as exc:
+                logger.warning(f'Vector cache refresh failed for {document_id}: {exc}')
+                self.vector_cache.invalidate(project_id)
+
+        logger.info(f'Document {document_id} processed: {total} chunks')
+
+    async def process_text(
+        self,
+        document_id: str,
+        text: str,
+        project_id: str,
+        incremental: bool = False,
+    ) -> None:
+        """Process plain text content: chunk, embed, and persist."""
+        try:
             await self.api.patch(f'/documents/{document_id}/status', {
-                'status': 'processed',
-                'chunkCount': len(chunks),
+                'status': 'processing',
             })
 
-            logger.info(f'Document {document_id} processed: {len(chunks)} chunks')
+            if not text.strip():
+                raise ValueError('Document contains no extractable text')
+
+            logger.info(f'Parsed document: {len(text)} chars')
+
+            async def _chunks() -> AsyncIterator[str]:
+                for chunk in self.splitter.split_text(text):
+                    yield chunk
+
+            await self._ingest(
+                document_id=document_id,
+                project_id=project_id,
+                chunks=_chunks(),
+                incremental=incremental,
+            )
 
         except Exception as exc:
             logger.error(f'Document text processing failed for {document_id}: {exc}')
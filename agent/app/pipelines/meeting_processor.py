@@ -4,10 +4,10 @@ import json
 import logging
 from typing import Any, Dict, List, Optional
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
 from app.tools import AppApiClient, LlmClient
 from app.tools.embedding_client import EmbeddingClient
+from app.tools.vector_cache import ProjectVectorCache
+from .document_processor import DocumentProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -51,16 +51,12 @@ class MeetingProcessor:
         llm_client: LlmClient,
         api_client: AppApiClient,
         embedding_client: Optional[EmbeddingClient] = None,
+        vector_cache: Optional[ProjectVectorCache] = None,
     ) -> None:
         self.llm = llm_client
         self.api = api_client
         self.embedding = embedding_client
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1500,
-            chunk_overlap=150,
-            length_function=len,
-            separators=['\n\n', '\n', '. ', ' ', ''],
-        )
+        self.vector_cache = vector_cache
 
     async def process(
         self,
@@ -70,8 +66,13 @@ class MeetingProcessor:
         raw_transcript: str,
         meeting_date: Optional[str] = None,
         source: Optional[str] = None,
+        document_id: Optional[str] = None,
     ) -> None:
-        """Full meeting processing pipeline."""
+        """Full meeting processing pipeline.
+
+        The transcript is chunked and embedded into ``document_id``, the
+        document the API keeps for the meeting (sourceType ``meeting``).
+        """
         try:
             # 1. Update status to processing
             await self.api.patch(f'/meetings/{meeting_id}/status', {
@@ -96,8 +97,8 @@ class MeetingProcessor:
                 logger.info(f'Created {insight_count} insights for meeting {meeting_id}')
 
             # 4. Chunk transcript for RAG (reuse document chunking pattern)
-            if self.embedding:
-                await self._chunk_and_embed(meeting_id, project_id, title, raw_transcript)
+            if self.embedding and document_id:
+                await self._chunk_and_embed(meeting_id, document_id, project_id, title, raw_transcript)
 
             # 5. Update status to processed
             await self.api.patch(f'/meetings/{meeting_id}/status', {
@@ -179,40 +180,32 @@ class MeetingProcessor:
     async def _chunk_and_embed(
         self,
         meeting_id: str,
+        document_id: str,
         project_id: str,
         title: str,
         transcript: str,
     ) -> None:
-        """Chunk the transcript and store embeddings for RAG queries."""
+        """Chunk the transcript and store embeddings for RAG queries.
+
+        Reuses the document pipeline on the meeting's transcript document;
+        ingestion is incremental, so reprocessing an unchanged transcript
+        embeds nothing new.
+        """
         try:
-            # Prefix each chunk with meeting context for better retrieval
-            prefixed = f"Meeting: {title}\n\n{transcript}"
-            chunks = self.splitter.split_text(prefixed)
-            logger.info(f'Split meeting transcript into {len(chunks)} chunks')
-
-            embeddings = await self.embedding.embed_batch(
-                chunks,
-                batch_size=10,
+            processor = DocumentProcessor(
+                minio_client=None,
+                embedding_client=self.embedding,
+                api_client=self.api,
+                vector_cache=self.vector_cache,
             )
-
-            # Store as document chunks (reuse document infrastructure)
-            # Create a virtual document for the meeting transcript
-            doc_payload = {
-                'projectId': project_id,
-                'title': f'Meeting: {title}',
-                'originalFilename': f'meeting-{meeting_id}.txt',
-                'mimeType': 'text/plain',
-                'fileSize': len(transcript.encode('utf-8')),
-                's3Key': f'meetings://{meeting_id}',
-                'metadata': {
-                    'sourceType': 'meeting',
-                    'meetingId': meeting_id,
-                },
-            }
-
-            # We don't create document records for meetings — we just log that
-            # embedding was attempted. Meeting insights are the primary output.
-            logger.info(f'Embedded {len(chunks)} chunks for meeting {meeting_id}')
+            # Prefix with meeting context for better retrieval
+            await processor.process_text(
+                document_id=document_id,
+                text=f"Meeting: {title}\n\n{transcript}",
+                project_id=project_id,
+                incremental=True,
+            )
+            logger.info(f'Embedded transcript of meeting {meeting_id} into document {document_id}')
 
         except Exception as exc:
             # Non-fatal: insights are the primary output, embedding is bonus
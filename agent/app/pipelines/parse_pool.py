@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Deque, List, Optional, Set, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME = 'application/pdf'
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+# --- Worker functions (run in child processes; must stay module-level) ---
+
+def _pdf_page_count(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _pdf_pages(path: str, start: int, end: int) -> List[str]:
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    texts = []
+    for i in range(start, end):
+        text = reader.pages[i].extract_text()
+        if text:
+            texts.append(text)
+    return texts
+
+
+def _docx_paragraphs(path: str) -> List[str]:
+    from docx import Document as DocxDocument
+    return [p.text for p in DocxDocument(path).paragraphs if p.text.strip()]
+
+
+class ParseTimeout(Exception):
+    """Raised when a document takes longer than the per-document parse timeout."""
+
+
+class _Task:
+    """A submitted parse call, kept resubmittable in case its pool breaks."""
+
+    def __init__(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        self.fn = fn
+        self.args = args
+        self.future: Optional[Future] = None
+        self.generation = -1
+        self.breaks = 0
+
+
+class ParsePool:
+    """Process pool for CPU-bound PDF/DOCX text extraction.
+
+    Keeps parsing off the event loop (and off the GIL) so chat traffic is not
+    stalled by ingestion. PDFs are split into page ranges that are extracted
+    in parallel, with at most ``max_workers * 2`` ranges in flight per
+    document so memory stays bounded; text is yielded in page order. Files
+    above ``max_file_bytes`` are rejected.
+
+    Each document may spend ``timeout_seconds`` waiting on its workers; time
+    the consumer spends embedding and uploading between pages does not count.
+    A document that runs out of time has the pool's workers killed and the
+    pool rebuilt, since a cancelled future does not stop a running process
+    and a ProcessPoolExecutor breaks as a whole when any worker dies. Other
+    documents' tasks lost to such a kill are resubmitted without counting it
+    against them. A pool broken by a crashed worker is rebuilt too, and the
+    tasks that were in flight on it are resubmitted once.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_file_bytes: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        pdf_pages_per_task: Optional[int] = None,
+    ) -> None:
+        settings = get_settings()
+        self.max_workers = max_workers or settings.parse_pool_workers
+        self.max_file_bytes = max_file_bytes or settings.parse_max_file_mb * 1024 * 1024
+        self.timeout_seconds = timeout_seconds or settings.parse_timeout_seconds
+        self.pdf_pages_per_task = pdf_pages_per_task or settings.parse_pdf_pages_per_task
+        self.metrics = {'timeouts': 0, 'rebuilds': 0, 'resubmitted': 0}
+        self._generation = 0
+        # Generations retired by a timeout kill rather than a crash
+        self._killed: Set[int] = set()
+        self._closed = False
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+
+    def supports(self, mime_type: str) -> bool:
+        return mime_type in (PDF_MIME, DOCX_MIME)
+
+    def close(self) -> None:
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _rebuild(self, generation: int, kill: bool = False) -> None:
+        """Replace the executor, unless another caller already replaced it."""
+        if generation != self._generation or self._closed:
+            return
+        broken = self._executor
+        if kill:
+            # ProcessPoolExecutor cannot cancel a running call; stop its workers
+            self._killed.add(generation)
+            for process in list((broken._processes or {}).values()):
+                process.terminate()
+        # Queued calls fail with BrokenProcessPool (not CancelledError) so their
+        # documents resubmit them
+        broken.shutdown(wait=False)
+        self._generation += 1
+        self._executor = self._new_executor()
+        self.metrics['rebuilds'] += 1
+        logger.warning('Rebuilt the document parse pool (%s)', 'timeout' if kill else 'broken')
+
+    def _submit(self, task: _Task) -> _Task:
+        task.generation = self._generation
+        try:
+            task.future = self._executor.submit(task.fn, *task.args)
+        except BrokenProcessPool:
+            self._rebuild(task.generation)
+            task.generation = self._generation
+            task.future = self._executor.submit(task.fn, *task.args)
+        return task
+
+    async def _await(self, task: _Task, budget: List[float], document: str):
+        """Result of ``task``, charging the time spent waiting to the document's budget."""
+        while True:
+            if budget[0] <= 0:
+                self._timeout(task, document)
+            started = time.monotonic()
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(task.future), budget[0])
+            except asyncio.TimeoutError:
+                budget[0] = 0
+                self._timeout(task, document)
+            except BrokenProcessPool:
+                self._rebuild(task.generation)
+                if task.generation not in self._killed:
+                    task.breaks += 1
+                    if task.breaks > 1:
+                        raise
+                self.metrics['resubmitted'] += 1
+                self._submit(task)
+            finally:
+                budget[0] -= time.monotonic() - started
+
+    def _timeout(self, task: _Task, document: str) -> None:
+        self.metrics['timeouts'] += 1
+        self._rebuild(task.generation, kill=True)
+        raise ParseTimeout(f'Parsing {document} exceeded {self.timeout_seconds:.0f}s')
+
+    async def iter_segments(self, path: str, mime_type: str) -> AsyncIterator[str]:
+        """Yield the document's text segments (pages / paragraphs) in order."""
+        size = os.path.getsize(path)
+        if size > self.max_file_bytes:
+            raise ValueError(f'Document is {size} bytes; the limit is {self.max_file_bytes}')
+        budget = [self.timeout_seconds]
+        document = os.path.basename(path)
+
+        if mime_type == DOCX_MIME:
+            task = self._submit(_Task(_docx_paragraphs, (path,)))
+            try:
+                for paragraph in await self._await(task, budget, document):
+                    yield paragraph
+            finally:
+                task.future.cancel()
+            return
+
+        if mime_type != PDF_MIME:
+            raise ValueError(f'Unsupported MIME type for the parse pool: {mime_type}')
+
+        page_count = await self._await(self._submit(_Task(_pdf_page_count, (path,))), budget, document)
+        ranges = deque(
+            (start, min(start + self.pdf_pages_per_task, page_count))
+            for start in range(0, page_count, self.pdf_pages_per_task)
+        )
+        inflight: Deque[_Task] = deque()
+        try:
+            while ranges or inflight:
+                while ranges and len(inflight) < self.max_workers * 2:
+                    inflight.append(self._submit(_Task(_pdf_pages, (path, *ranges.popleft()))))
+                for text in await self._await(inflight.popleft(), budget, document):
+                    yield text
+        finally:
+            # Queued ranges are dropped; a running range is at most
+            # pdf_pages_per_task pages and is left to finish (timeouts kill it)
+            for task in inflight:
+                task.future.cancel()
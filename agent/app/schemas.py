@@ -24,9 +24,19 @@ class CamelModel(BaseModel):
     )
 
 
+class RetrievalFiltersConfig(CamelModel):
+    document_ids: Optional[List[str]] = None
+    mime_types: Optional[List[str]] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    source_type: Optional[str] = None
+
+
 class RunConfig(CamelModel):
     max_tool_calls: Optional[int] = None
     tool_timeout_seconds: Optional[float] = None
+    graph_variant: Optional[str] = None
+    retrieval_filters: Optional[RetrievalFiltersConfig] = None
 
 
 class RunRequest(CamelModel):
@@ -59,5 +69,13 @@ class StreamEvent(CamelModel):
     payload: Optional[Dict[str, Any]] = None
 
 
+class ReadyResponse(CamelModel):
+    ready: bool
+    warmup_ms: Dict[str, float] = Field(default_factory=dict)
+
+
 class HealthResponse(CamelModel):
     status: str = Field(default='ok')
+    event_loop_lag: Optional[Dict[str, float]] = None
+    embedding_cache: Optional[Dict[str, int]] = None
+    telemetry: Optional[Dict[str, int]] = None
@@ -1,8 +1,15 @@
 from .app_api_client import AppApiClient
 from .llm_client import LlmClient
 from .memory_client import MemoryClient
+from .memory_queue import MemoryWriteQueue
+from .embedding_cache import EmbeddingCache
 from .embedding_client import EmbeddingClient
 from .minio_client import MinioClient
-from .doc_retriever import DocRetriever
+from .pg_pool import PgPool
+from .vector_cache import ProjectVectorCache
+from .doc_retriever import DocRetriever, RetrievalFilters
+from .reranker import mmr_rerank
+from .warmup import BackendWarmer
+from .vector_index import ensure_retrieval_indexes
 
-__all__ = ['AppApiClient', 'LlmClient', 'MemoryClient', 'EmbeddingClient', 'MinioClient', 'DocRetriever']
+__all__ = ['AppApiClient', 'BackendWarmer', 'LlmClient', 'MemoryClient', 'MemoryWriteQueue', 'EmbeddingCache', 'EmbeddingClient', 'MinioClient', 'DocRetriever', 'PgPool', 'ProjectVectorCache', 'RetrievalFilters', 'ensure_retrieval_indexes', 'mmr_rerank']
@@ -68,6 +68,18 @@ class AppApiClient:
             'latencyMs': latency_ms,
         }, auth_token)
 
+    async def create_telemetry_batch(
+        self,
+        run_id: str,
+        events: list[Dict[str, Any]],
+        tool_calls: list[Dict[str, Any]],
+        auth_token: str | None = None,
+    ) -> None:
+        await self.post(f'/agent-runs/{run_id}/telemetry/bulk', {
+            'events': events,
+            'toolCalls': tool_calls,
+        }, auth_token)
+
     async def complete_run(
         self,
         run_id: str,
@@ -1,30 +1,311 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import psycopg2
 import psycopg2.extras
 
 from app.config import get_settings
 from app.tools.embedding_client import EmbeddingClient
+from app.tools.embedding_codec import to_vector_literal
+from app.tools.pg_pool import PgPool, PreparedStatement
+from app.tools.vector_cache import ProjectVectorCache, needs_lexical
+from app.tools.vector_index import FTS_CONFIG, embedding_expr, lexical_tsquery, tsvector_expr
+
+# metadata.sourceType values written by each ingestion path (uploads set none)
+UPLOAD_SOURCE_TYPE = 'upload'
+# Filter values and the stored sourceTypes they match; concrete types match themselves
+SOURCE_TYPES: Dict[str, Tuple[str, ...]] = {
+    'document': (UPLOAD_SOURCE_TYPE, 'notion', 'google_docs'),
+    'meeting': ('meeting',),
+    UPLOAD_SOURCE_TYPE: (UPLOAD_SOURCE_TYPE,),
+    'notion': ('notion',),
+    'google_docs': ('google_docs',),
+}
+
+
+@dataclass
+class RetrievalFilters:
+    """Optional constraints applied inside the retrieval query."""
+
+    document_ids: Optional[List[str]] = None
+    mime_types: Optional[List[str]] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    source_type: Optional[str] = None  # a key of SOURCE_TYPES
+
+    @classmethod
+    def from_run_config(cls, run_config: Dict[str, Any] | None) -> 'RetrievalFilters':
+        raw = (run_config or {}).get('retrievalFilters') or {}
+        return cls(
+            document_ids=raw.get('documentIds') or None,
+            mime_types=raw.get('mimeTypes') or None,
+            created_after=_as_datetime(raw.get('createdAfter')),
+            created_before=_as_datetime(raw.get('createdBefore')),
+            source_type=raw.get('sourceType') or None,
+        )
+
+    def source_types(self) -> Optional[Tuple[str, ...]]:
+        """Stored sourceType values matching ``source_type``; None when unfiltered."""
+        if not self.source_type:
+            return None
+        if self.source_type not in SOURCE_TYPES:
+            raise ValueError(f'Unknown source type: {self.source_type}')
+        return SOURCE_TYPES[self.source_type]
+
+    def params(self) -> tuple:
+        source_types = self.source_types()
+        return (
+            self.document_ids,
+            self.mime_types,
+            self.created_after,
+            self.created_before,
+            list(source_types) if source_types else None,
+        )
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if not value or isinstance(value, datetime):
+        return value or None
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+# Shared WHERE clause: project, filters ($2, $4..$8); NULL disables a filter.
+# Pending chunks belong to an incremental re-ingest that has not finished.
+_FILTERS_SQL = f"""
+              d."projectId" = $2
+              AND NOT dc.pending
+              AND ($4::varchar[] IS NULL OR dc."documentId" = ANY($4::varchar[]))
+              AND ($5::varchar[] IS NULL OR d."mimeType" = ANY($5::varchar[]))
+              AND ($6::timestamptz IS NULL OR d."createdAt" >= $6::timestamptz)
+              AND ($7::timestamptz IS NULL OR d."createdAt" < $7::timestamptz)
+              AND ($8::text[] IS NULL OR COALESCE(d.metadata->>'sourceType', '{UPLOAD_SOURCE_TYPE}') = ANY($8::text[]))
+"""
+
+
+def _dense_source(exact: bool) -> Tuple[str, str, str]:
+    """FROM, WHERE and title column of the vector search over filtered chunks ``dc``.
+
+    The approximate form lets the planner walk the global ANN index and
+    filter what it yields. The exact form fences the filtered rows in a
+    subquery (OFFSET 0 keeps it from being flattened), so the project and
+    filters are applied first and only the matching rows are cast and ranked.
+    """
+    if exact:
+        return f"""(
+                SELECT dc.*, d.title AS "documentTitle"
+                FROM document_chunk dc
+                JOIN document d ON d.id = dc."documentId"
+                WHERE {_FILTERS_SQL}
+                  AND dc.embedding IS NOT NULL
+                OFFSET 0
+            ) dc""", 'TRUE', 'dc."documentTitle"'
+    where = f"""{_FILTERS_SQL}
+              AND dc.embedding IS NOT NULL"""
+    return 'document_chunk dc JOIN document d ON d.id = dc."documentId"', where, 'd.title'
+
+
+def _retrieve_statement(dims: int, exact: bool = False) -> PreparedStatement:
+    # Cosine distance on the typed expression the ANN index is built on, so
+    # the planner can walk the index instead of casting every row. The
+    # distance bound and every filter are applied here rather than after
+    # LIMIT, so rows just past a cutoff are not lost.
+    expr = embedding_expr(dims)
+    source, where, title = _dense_source(exact)
+    return PreparedStatement(
+        name=f'doc_retriever_filtered_{dims}{"_exact" if exact else ""}',
+        sql=f"""
+            SELECT
+                dc.id,
+                dc."documentId",
+                dc."chunkIndex",
+                dc.content,
+                dc."tokenCount",
+                dc.metadata,
+                {title} as "documentTitle",
+                1 - ({expr} <=> $1::vector({dims})) as similarity,
+                CASE WHEN $10::boolean THEN dc.embedding END as embedding
+            FROM {source}
+            WHERE {where}
+              AND ({expr} <=> $1::vector({dims})) <= $3::float8
+            ORDER BY {expr} <=> $1::vector({dims})
+            LIMIT $9
+        """,
+        num_params=10,
+    )
+
+
+def _hybrid_statement(dims: int, exact: bool = False) -> PreparedStatement:
+    # Dense and full-text candidates ($10 each) are ranked separately and
+    # fused with reciprocal rank fusion, score = sum(1 / ($11 + rank)), in a
+    # single round-trip. Lexical matches bypass the similarity floor so exact
+    # identifiers (ENG-123, API names, acronyms) surface even when their
+    # embeddings are not close.
+    expr = embedding_expr(dims)
+    source, where, _ = _dense_source(exact)
+    tsv = tsvector_expr()
+    return PreparedStatement(
+        name=f'doc_retriever_hybrid_{dims}{"_exact" if exact else ""}',
+        sql=f"""
+            WITH dense AS (
+                SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                FROM (
+                    SELECT dc.id, ({expr} <=> $1::vector({dims})) AS distance
+                    FROM {source}
+                    WHERE {where}
+                      AND ({expr} <=> $1::vector({dims})) <= $3::float8
+                    ORDER BY {expr} <=> $1::vector({dims})
+                    LIMIT $10
+                ) ann
+            ),
+            lexical AS (
+                SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+                FROM (
+                    SELECT dc.id, ts_rank_cd({tsv}, query) AS score
+                    FROM document_chunk dc
+                    JOIN document d ON d.id = dc."documentId",
+                         to_tsquery('{FTS_CONFIG}', NULLIF($9::text, '')) query
+                    WHERE {_FILTERS_SQL}
+                      AND {tsv} @@ query
+                    ORDER BY score DESC
+                    LIMIT $10
+                ) fts
+            ),
+            fused AS (
+                SELECT id, SUM(1.0 / ($11::int + rank)) AS score
+                FROM (SELECT * FROM dense UNION ALL SELECT * FROM lexical) ranked
+                GROUP BY id
+            )
+            SELECT
+                dc.id,
+                dc."documentId",
+                dc."chunkIndex",
+                dc.content,
+                dc."tokenCount",
+                dc.metadata,
+                d.title as "documentTitle",
+                COALESCE(1 - ({expr} <=> $1::vector({dims})), 0) as similarity,
+                fused.score as "fusedScore",
+                CASE WHEN $13::boolean THEN dc.embedding END as embedding
+            FROM fused
+            JOIN document_chunk dc ON dc.id = fused.id
+            JOIN document d ON d.id = dc."documentId"
+            ORDER BY fused.score DESC
+            LIMIT $12
+        """,
+        num_params=13,
+    )
 
 
 class DocRetriever:
-    """Retrieves relevant document chunks via pgvector similarity search."""
+    """Retrieves relevant document chunks via pgvector and full-text search."""
 
-    def __init__(self, embedding_client: EmbeddingClient) -> None:
+    def __init__(
+        self,
+        embedding_client: EmbeddingClient,
+        pool: PgPool,
+        vector_cache: Optional[ProjectVectorCache] = None,
+    ) -> None:
         self.embedding_client = embedding_client
+        self.pool = pool
+        self.vector_cache = vector_cache
         settings = get_settings()
-        self._conn_params = {
-            'host': settings.pg_host,
-            'port': settings.pg_port,
-            'user': settings.pg_user,
-            'password': settings.pg_password,
-            'dbname': settings.pg_db,
-        }
+        self.index_type = settings.vector_index_type
+        self.ef_search = settings.hnsw_ef_search
+        self.ivfflat_probes = settings.ivfflat_probes
+        self.iterative_scan = settings.vector_iterative_scan
+        self.max_chunks = settings.rag_max_chunks
+        self.hybrid = settings.rag_hybrid
+        self.hybrid_candidates = settings.rag_hybrid_candidates
+        self.rrf_k = settings.rag_rrf_k
+        self._statement = _retrieve_statement(settings.ollama_embed_dims)
+        self._hybrid_statement = _hybrid_statement(settings.ollama_embed_dims)
+        self._exact_statement = _retrieve_statement(settings.ollama_embed_dims, exact=True)
+        self._exact_hybrid_statement = _hybrid_statement(settings.ollama_embed_dims, exact=True)
+        # Whether the installed pgvector has iterative index scans; checked on first query
+        self._iterative_scan_supported: Optional[bool] = None
+        self.metrics: Dict[str, int] = {'exactScanFallbacks': 0}
+
+    def _supports_iterative_scan(self, cur) -> bool:
+        if self._iterative_scan_supported is None:
+            cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cur.fetchone()
+            version = tuple(int(part) for part in row['extversion'].split('.')[:2]) if row else (0, 0)
+            self._iterative_scan_supported = version >= (0, 8)
+        return self._iterative_scan_supported
+
+    def _uses_iterative_scan(self, cur) -> bool:
+        return self.index_type != 'none' and bool(self.iterative_scan) and self._supports_iterative_scan(cur)
+
+    def _apply_search_params(self, cur, ef_search: Optional[int]) -> None:
+        """Per-transaction index search knobs (SET LOCAL semantics)."""
+        iterative = self._uses_iterative_scan(cur)
+        if self.index_type == 'hnsw':
+            cur.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search or self.ef_search),))
+            if iterative:
+                cur.execute("SELECT set_config('hnsw.iterative_scan', %s, true)", (self.iterative_scan,))
+        elif self.index_type == 'ivfflat':
+            cur.execute("SELECT set_config('ivfflat.probes', %s, true)", (str(self.ivfflat_probes),))
+            if iterative:
+                cur.execute("SELECT set_config('ivfflat.iterative_scan', %s, true)", (self.iterative_scan,))
+
+    async def _search(
+        self,
+        query: str,
+        embedding_str: str,
+        project_id: str,
+        limit: int,
+        score_threshold: float,
+        filters: RetrievalFilters,
+        ef_search: Optional[int],
+        hybrid: bool,
+        include_embeddings: bool,
+    ) -> List[Dict[str, Any]]:
+        params: Sequence[Any] = (embedding_str, project_id, 1 - score_threshold, *filters.params())
+        if hybrid:
+            candidates = max(self.hybrid_candidates, limit)
+            statement, exact_statement = self._hybrid_statement, self._exact_hybrid_statement
+            params = (*params, lexical_tsquery(query), candidates, self.rrf_k, limit, include_embeddings)
+        else:
+            candidates = limit
+            statement, exact_statement = self._statement, self._exact_statement
+            params = (*params, limit, include_embeddings)
+        # The candidate list must be at least as long as the requested page
+        ef = max(ef_search or self.ef_search, candidates)
+
+        def _query(conn) -> List[Dict[str, Any]]:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                self._apply_search_params(cur, ef)
+                self.pool.execute_prepared(cur, statement, params)
+                rows = cur.fetchall()
+                # Without iterative scans the ANN index yields ef_search
+                # candidates across all projects and filters them afterwards,
+                # so a small project can come back short: redo it exactly.
+                if len(rows) < limit and self.index_type != 'none' and not self._uses_iterative_scan(cur):
+                    self.metrics['exactScanFallbacks'] += 1
+                    self.pool.execute_prepared(cur, exact_statement, params)
+                    rows = cur.fetchall()
+                return rows
 
-    def _get_conn(self):
-        return psycopg2.connect(**self._conn_params)
+        rows = await self.pool.run(_query)
+        if not hybrid:
+            # relaxed_order iterative scans may return neighbours slightly out of order
+            rows.sort(key=lambda row: row['similarity'], reverse=True)
+        return [
+            {
+                'id': str(row['id']),
+                'documentId': str(row['documentId']),
+                'documentTitle': row['documentTitle'],
+                'chunkIndex': row['chunkIndex'],
+                'content': row['content'],
+                'tokenCount': row['tokenCount'],
+                'similarity': float(row.get('similarity', 0)),
+                **({'fusedScore': float(row['fusedScore'])} if 'fusedScore' in row else {}),
+                **({'embedding': row['embedding']} if include_embeddings else {}),
+            }
+            for row in rows
+        ]
 
     async def retrieve(
         self,
@@ -32,53 +313,70 @@ class DocRetriever:
         project_id: str,
         top_k: int = 5,
         score_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
+        filters: Optional[RetrievalFilters] = None,
+        token_budget: Optional[int] = None,
+        hybrid: Optional[bool] = None,
+        include_embeddings: bool = False,
     ) -> List[Dict[str, Any]]:
-        """Retrieve top-K similar document chunks for a query within a project."""
+        """Retrieve similar document chunks for a query within a project.
+
+        Only chunks matching ``filters`` are returned, and vector matches
+        must have similarity >= ``score_threshold``. With ``token_budget``, ``top_k`` is the
+        first page size: the result grows (doubling, up to ``rag_max_chunks``)
+        until the chunks fill the budget or no more qualify, and is cut to
+        what fits. ``ef_search`` overrides the HNSW candidate list size.
+        ``hybrid`` (default ``rag_hybrid``) fuses full-text and vector ranks;
+        results are then ordered by ``fusedScore`` rather than similarity.
+
+        Projects held in the in-process vector cache are answered from it
+        when the query needs no full-text matching. ``include_embeddings``
+        adds each chunk's ``embedding`` for re-ranking.
+        """
         query_embedding = await self.embedding_client.embed(query)
         if not query_embedding:
             return []
 
-        # Use cosine distance operator from pgvector
-        # We store embeddings as float arrays, so we use the <=> operator
-        sql = """
-            SELECT
-                dc.id,
-                dc."documentId",
-                dc."chunkIndex",
-                dc.content,
-                dc."tokenCount",
-                dc.metadata,
-                d.title as "documentTitle",
-                1 - (dc.embedding::vector <=> %s::vector) as similarity
-            FROM document_chunk dc
-            JOIN document d ON d.id = dc."documentId"
-            WHERE d."projectId" = %s
-              AND dc.embedding IS NOT NULL
-            ORDER BY dc.embedding::vector <=> %s::vector
-            LIMIT %s
-        """
+        embedding_str = to_vector_literal(query_embedding)
+        filters = filters or RetrievalFilters()
+        hybrid = self.hybrid if hybrid is None else hybrid
 
-        conn = self._get_conn()
-        try:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                embedding_str = f'[{",".join(str(x) for x in query_embedding)}]'
-                cur.execute(sql, (embedding_str, project_id, embedding_str, top_k))
-                rows = cur.fetchall()
-        finally:
-            conn.close()
-
-        results = []
-        for row in rows:
-            similarity = float(row.get('similarity', 0))
-            if similarity >= score_threshold:
-                results.append({
-                    'id': str(row['id']),
-                    'documentId': str(row['documentId']),
-                    'documentTitle': row['documentTitle'],
-                    'chunkIndex': row['chunkIndex'],
-                    'content': row['content'],
-                    'tokenCount': row['tokenCount'],
-                    'similarity': similarity,
-                })
-
-        return results
+        if self.vector_cache and ef_search is None and not (hybrid and needs_lexical(query)):
+            cached = self.vector_cache.search(
+                project_id,
+                query_embedding,
+                self.max_chunks if token_budget else top_k,
+                score_threshold,
+                filters,
+                include_embeddings,
+            )
+            if cached is not None:
+                return cached if token_budget is None else _fit_budget(cached, token_budget)
+
+        limit = top_k
+        while True:
+            results = await self._search(
+                query, embedding_str, project_id, limit, score_threshold, filters, ef_search, hybrid,
+                include_embeddings,
+            )
+            if token_budget is None:
+                return results
+            total = sum(r['tokenCount'] or 0 for r in results)
+            if total >= token_budget or len(results) < limit or limit >= self.max_chunks:
+                break
+            limit = min(limit * 2, self.max_chunks)
+
+        return _fit_budget(results, token_budget)
+
+
+def _fit_budget(results: List[Dict[str, Any]], token_budget: int) -> List[Dict[str, Any]]:
+    """Leading results that fit in the token budget (always at least one)."""
+    selected: List[Dict[str, Any]] = []
+    used = 0
+    for result in results:
+        tokens = result['tokenCount'] or 0
+        if selected and used + tokens > token_budget:
+            break
+        selected.append(result)
+        used += tokens
+    return selected
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import psycopg2.extras
+
+from app.config import get_settings
+from app.tools.embedding_codec import DTYPE, as_float32
+from app.tools.pg_pool import PgPool
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (model, content_hash)
+);
+CREATE INDEX IF NOT EXISTS embedding_cache_created_at_idx ON embedding_cache (created_at)
+"""
+
+# Expired rows, then the oldest rows beyond the size bound
+_PRUNE_SQL = (
+    'DELETE FROM embedding_cache WHERE created_at < now() - make_interval(secs => %(ttl)s)',
+    """
+    DELETE FROM embedding_cache WHERE ctid IN (
+        SELECT ctid FROM embedding_cache
+        ORDER BY created_at
+        LIMIT GREATEST((SELECT count(*) FROM embedding_cache) - %(max_rows)s, 0)
+    )
+    """,
+)
+
+# How long to wait before trying to create the table again after a failure
+_SCHEMA_RETRY_SECONDS = 30.0
+# How often writes trigger a prune of expired and excess rows
+_PRUNE_INTERVAL_SECONDS = 3600.0
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Embedding cache keyed by (model, sha256 of the text).
+
+    An in-process LRU of ``max_entries`` float32 vectors sits in front of the
+    agent-owned ``embedding_cache`` table, so identical text is embedded once
+    across questions, pipelines, restarts and workers. Cache errors are
+    logged and treated as misses; they never fail an embedding call. If the
+    table cannot be created (Postgres down at startup) creation is retried
+    lazily from later lookups and writes.
+
+    Writes to the table run in the background so a question never waits on
+    them. Rows expire ``ttl_seconds`` after they were written (and are then
+    re-embedded and rewritten), and at most ``max_rows`` are kept; expired
+    and excess rows are pruned from writes at most once an hour.
+    """
+
+    def __init__(
+        self,
+        pool: PgPool,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        max_rows: Optional[int] = None,
+    ) -> None:
+        settings = get_settings()
+        self.pool = pool
+        self.max_entries = max_entries or settings.embedding_cache_max_entries
+        self.ttl_seconds = ttl_seconds or settings.embedding_cache_ttl_seconds
+        self.max_rows = max_rows or settings.embedding_cache_max_rows
+        self._lru: OrderedDict[Tuple[str, str], np.ndarray] = OrderedDict()
+        self.metrics: Dict[str, int] = {
+            'memoryHits': 0,
+            'dbHits': 0,
+            'misses': 0,
+            'writes': 0,
+            'pruned': 0,
+            'errors': 0,
+        }
+        self._schema_ready = False
+        self._schema_retry_at = 0.0
+        self._prune_at = 0.0
+        self._pending: Set[asyncio.Task[None]] = set()
+
+    async def ensure_schema(self) -> None:
+        def _create(conn) -> None:
+            with conn.cursor() as cur:
+                cur.execute(_SCHEMA)
+
+        await self.pool.run(_create)
+        self._schema_ready = True
+
+    async def ready(self) -> bool:
+        """Whether the table exists, creating it if a retry is due."""
+        if self._schema_ready:
+            return True
+        if time.monotonic() < self._schema_retry_at:
+            return False
+        try:
+            await self.ensure_schema()
+            return True
+        except Exception as e:
+            self._schema_retry_at = time.monotonic() + _SCHEMA_RETRY_SECONDS
+            self.metrics['errors'] += 1
+            logger.warning('Embedding cache table unavailable: %s', e)
+            return False
+
+    def _remember(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors aligned with ``texts``; None where there is no entry."""
+        hashes = [content_hash(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        for h in hashes:
+            vector = self._lru.get((model, h))
+            if vector is not None:
+                self._lru.move_to_end((model, h))
+                found[h] = vector
+        in_memory = set(found)
+
+        missing = list({h for h in hashes if h not in found})
+        if missing and await self.ready():
+            try:
+                rows = await self.pool.run(lambda conn: self._select(conn, model, missing))
+                for h, data in rows:
+                    vector = np.frombuffer(bytes(data), dtype=DTYPE)
+                    found[h] = vector
+                    self._remember((model, h), vector)
+            except Exception as e:
+                self.metrics['errors'] += 1
+                logger.warning('Embedding cache lookup failed: %s', e)
+
+        for h in hashes:
+            if h in in_memory:
+                self.metrics['memoryHits'] += 1
+            elif h in found:
+                self.metrics['dbHits'] += 1
+            else:
+                self.metrics['misses'] += 1
+        return [found[h].tolist() if h in found else None for h in hashes]
+
+    def _select(self, conn, model: str, hashes: List[str]) -> List[Tuple[str, bytes]]:
+        with conn.cursor() as cur:
+            cur.execute(
+                'SELECT content_hash, embedding FROM embedding_cache '
+                'WHERE model = %s AND content_hash = ANY(%s) '
+                'AND created_at >= now() - make_interval(secs => %s)',
+                (model, hashes, self.ttl_seconds),
+            )
+            return cur.fetchall()
+
+    async def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Remember vectors in memory now and write them to the table in the background."""
+        rows: Dict[str, bytes] = {}
+        for text, vector in zip(texts, vectors):
+            if not vector:
+                continue
+            h = content_hash(text)
+            array = as_float32(vector)
+            self._remember((model, h), array)
+            rows[h] = array.tobytes()
+        if not rows:
+            return
+        task = asyncio.create_task(self._write(model, rows))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _write(self, model: str, rows: Dict[str, bytes]) -> None:
+        if not await self.ready():
+            return
+
+        def _insert(conn) -> None:
+            with conn.cursor() as cur:
+                # An expired row is rewritten, which restarts its TTL
+                psycopg2.extras.execute_values(
+                    cur,
+                    'INSERT INTO embedding_cache (model, content_hash, embedding) VALUES %s '
+                    'ON CONFLICT (model, content_hash) '
+                    'DO UPDATE SET embedding = EXCLUDED.embedding, created_at = now()',
+                    [(model, h, psycopg2.Binary(data)) for h, data in rows.items()],
+                )
+
+        try:
+            await self.pool.run(_insert)
+            self.metrics['writes'] += len(rows)
+        except Exception as e:
+            self.metrics['errors'] += 1
+            logger.warning('Embedding cache write failed: %s', e)
+            return
+        if time.monotonic() >= self._prune_at:
+            self._prune_at = time.monotonic() + _PRUNE_INTERVAL_SECONDS
+            await self.prune()
+
+    async def prune(self) -> None:
+        """Delete expired rows and the oldest rows beyond ``max_rows``."""
+        def _delete(conn) -> int:
+            deleted = 0
+            with conn.cursor() as cur:
+                for sql in _PRUNE_SQL:
+                    cur.execute(sql, {'ttl': self.ttl_seconds, 'max_rows': self.max_rows})
+                    deleted += cur.rowcount
+            return deleted
+
+        try:
+            self.metrics['pruned'] += await self.pool.run(_delete)
+        except Exception as e:
+            self.metrics['errors'] += 1
+            logger.warning('Embedding cache prune failed: %s', e)
+
+    async def close(self) -> None:
+        """Wait for background writes still in flight."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, 'entries': len(self._lru)}
@@ -1,50 +1,192 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 
 import httpx
 
 from app.config import get_settings
+from app.tools.embedding_cache import EmbeddingCache
+from app.tools.resilience import with_retry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Endpoint:
+    base_url: str
+    client: httpx.AsyncClient
+    inflight: int = 0
 
 
 class EmbeddingClient:
-    """Generates text embeddings via Ollama (nomic-embed-text)."""
+    """Generates text embeddings via Ollama (nomic-embed-text).
 
-    def __init__(self, base_url: str | None = None, model: str | None = None) -> None:
+    With an EmbeddingCache, previously embedded texts are served from the
+    cache and only misses are sent to Ollama.
+
+    ``embed_batch`` is pipelined: duplicate texts are embedded once, up to
+    ``embed_max_inflight_per_endpoint`` batches run concurrently on each
+    configured endpoint (least-busy first), and the batch size adapts
+    (AIMD-style) so a batch takes about ``embed_target_batch_seconds``
+    while staying under ``embed_max_batch_chars`` of input. Results are
+    always returned in input order.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        model: str | None = None,
+        cache: Optional[EmbeddingCache] = None,
+        endpoints: Optional[List[str]] = None,
+    ) -> None:
         settings = get_settings()
         self.base_url = base_url or settings.ollama_base_url
         self.model = model or settings.ollama_embed_model
         self.dims = settings.ollama_embed_dims
-        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=60.0)
+        self.cache = cache
+        self.keep_alive = settings.ollama_keep_alive
+        urls = endpoints or [u.strip() for u in settings.ollama_embed_endpoints.split(',') if u.strip()]
+        self._endpoints = [
+            _Endpoint(url, httpx.AsyncClient(base_url=url, timeout=60.0))
+            for url in (urls or [self.base_url])
+        ]
+        self._client = self._endpoints[0].client
+        self.max_inflight = settings.embed_max_inflight_per_endpoint * len(self._endpoints)
+        self.min_batch_size = settings.embed_min_batch_size
+        self.max_batch_size = settings.embed_max_batch_size
+        self.max_batch_chars = settings.embed_max_batch_chars
+        self.target_batch_seconds = settings.embed_target_batch_seconds
+        # Adaptive size carries over between jobs
+        self._batch_size = settings.embed_batch_size
 
     async def close(self) -> None:
-        await self._client.aclose()
+        for endpoint in self._endpoints:
+            await endpoint.client.aclose()
 
     async def embed(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        response = await self._client.post('/api/embed', json={
-            'model': self.model,
-            'input': text,
-        })
-        response.raise_for_status()
-        data = response.json()
-        # Ollama returns {"embeddings": [[...]]}
-        embeddings = data.get('embeddings', [])
-        if embeddings:
-            return embeddings[0]
-        return []
-
-    async def embed_batch(self, texts: List[str], batch_size: int = 10) -> List[List[float]]:
-        """Generate embeddings for multiple texts in batches."""
-        results: List[List[float]] = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            response = await self._client.post('/api/embed', json={
+        if self.cache:
+            cached = (await self.cache.get_many(self.model, [text]))[0]
+            if cached is not None:
+                return cached
+        embeddings = await self._post(text)
+        embedding = embeddings[0] if embeddings else []
+        if self.cache and embedding:
+            await self.cache.put_many(self.model, [text], [embedding])
+        return embedding
+
+    async def _post_to(self, endpoint: _Endpoint, payload: str | List[str]) -> List[List[float]]:
+        endpoint.inflight += 1
+        try:
+            response = await endpoint.client.post('/api/embed', json={
                 'model': self.model,
-                'input': batch,
+                'input': payload,
+                # Keep the model resident between requests instead of reloading it
+                'keep_alive': self.keep_alive,
             })
             response.raise_for_status()
-            data = response.json()
-            embeddings = data.get('embeddings', [])
-            results.extend(embeddings)
+        finally:
+            endpoint.inflight -= 1
+        # Ollama returns {"embeddings": [[...]]}
+        return response.json().get('embeddings', [])
+
+    async def _post(self, payload: str | List[str]) -> List[List[float]]:
+        """POST /api/embed to the least busy endpoint, retrying on another."""
+
+        async def _do() -> List[List[float]]:
+            return await self._post_to(min(self._endpoints, key=lambda e: e.inflight), payload)
+
+        return await with_retry(_do, max_retries=1, base_delay=0.5)
+
+    async def warm_up(self) -> None:
+        """Load the model and open a connection on every endpoint (bypasses the cache)."""
+        await asyncio.gather(*(self._post_to(endpoint, 'warm-up') for endpoint in self._endpoints))
+
+    async def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Generate embeddings for multiple texts in batches.
+
+        ``batch_size`` pins the batch size for this call; by default it adapts.
+        """
+        if not self.cache:
+            return await self._embed_many(texts, batch_size)
+        results = await self.cache.get_many(self.model, texts)
+        misses = [i for i, r in enumerate(results) if r is None]
+        if misses:
+            computed = await self._embed_many([texts[i] for i in misses], batch_size)
+            for i, embedding in zip(misses, computed):
+                results[i] = embedding
+            await self.cache.put_many(self.model, [texts[i] for i in misses], computed)
         return results
+
+    def _next_batch(self, unique: List[str], start: int, fixed_size: Optional[int]) -> int:
+        """End index of the next batch starting at ``start``."""
+        size = fixed_size or self._batch_size
+        end, chars = start, 0
+        while end < len(unique) and end - start < size:
+            chars += len(unique[end])
+            if end > start and chars > self.max_batch_chars:
+                break
+            end += 1
+        return end
+
+    def _adapt(self, size: int, elapsed: float) -> None:
+        if elapsed > self.target_batch_seconds:
+            self._batch_size = max(self.min_batch_size, size // 2)
+        elif elapsed < self.target_batch_seconds / 2 and size >= self._batch_size:
+            self._batch_size = min(self.max_batch_size, self._batch_size + max(1, self._batch_size // 2))
+
+    async def _embed_many(self, texts: List[str], batch_size: Optional[int]) -> List[List[float]]:
+        if not texts:
+            return []
+        # Embed each distinct text once
+        positions: Dict[str, int] = {}
+        unique: List[str] = []
+        for text in texts:
+            if text not in positions:
+                positions[text] = len(unique)
+                unique.append(text)
+        vectors: List[List[float]] = [[] for _ in unique]
+
+        semaphore = asyncio.Semaphore(self.max_inflight)
+
+        async def _run(start: int, end: int) -> None:
+            try:
+                began = time.perf_counter()
+                embeddings = await self._post(unique[start:end])
+                if len(embeddings) != end - start:
+                    raise ValueError(f'Expected {end - start} embeddings, got {len(embeddings)}')
+                vectors[start:end] = embeddings
+                if batch_size is None:
+                    self._adapt(end - start, time.perf_counter() - began)
+            finally:
+                semaphore.release()
+
+        tasks: List[asyncio.Task[None]] = []
+        start = 0
+        try:
+            while start < len(unique):
+                await semaphore.acquire()
+                # Re-read the adaptive size only once a slot frees up
+                end = self._next_batch(unique, start, batch_size)
+                tasks.append(asyncio.create_task(_run(start, end)))
+                start = end
+                # Surface failures early instead of after dispatching everything
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        logger.debug(
+            'Embedded %d texts (%d unique) in %d batches; batch size now %d',
+            len(texts), len(unique), len(tasks), self._batch_size,
+        )
+        return [vectors[positions[text]] for text in texts]
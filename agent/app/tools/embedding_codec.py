@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import base64
+from typing import Sequence
+
+import numpy as np
+
+# Little-endian float32: 4 bytes per dimension on the wire
+DTYPE = np.dtype('<f4')
+
+
+def as_float32(vector: Sequence[float] | np.ndarray) -> np.ndarray:
+    return np.asarray(vector, dtype=DTYPE)
+
+
+def encode_b64(vector: Sequence[float] | np.ndarray) -> str:
+    """Base64 of the float32 buffer (~4/3 * 4 bytes per dim vs ~20 for JSON floats)."""
+    return base64.b64encode(as_float32(vector).tobytes()).decode('ascii')
+
+
+def decode_b64(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=DTYPE)
+
+
+def to_vector_literal(vector: Sequence[float] | np.ndarray) -> str:
+    """pgvector text literal with float32 precision.
+
+    pgvector stores float4, so digits beyond float32 precision are wasted;
+    ``.9g`` is the shortest format that round-trips every float32.
+    """
+    return '[' + ','.join(format(x, '.9g') for x in as_float32(vector).tolist()) + ']'
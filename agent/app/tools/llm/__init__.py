@@ -1,5 +1,6 @@
 from .base import LlmProvider
+from .fake_provider import FakeProvider
 from .groq_provider import GroqProvider
 from .factory import create_llm_provider
 
-__all__ = ['LlmProvider', 'GroqProvider', 'create_llm_provider']
+__all__ = ['LlmProvider', 'FakeProvider', 'GroqProvider', 'create_llm_provider']
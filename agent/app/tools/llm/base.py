@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Protocol, runtime_checkable
+from typing import Any, AsyncIterator, Dict, Protocol, runtime_checkable
 
 
 @runtime_checkable
@@ -17,6 +17,16 @@ class LlmProvider(Protocol):
         """Send a chat completion request. Returns {'model': str, 'content': str}."""
         ...
 
+    def stream_chat(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.2,
+        max_tokens: int = 8192,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion. Yields content deltas as they arrive."""
+        ...
+
     async def close(self) -> None:
         """Cleanup resources."""
         ...
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional
 
 from app.config import get_settings
+from .fake_provider import FakeProvider
 from .groq_provider import GroqProvider
 
 
@@ -13,8 +14,8 @@ def create_llm_provider(
 ):
     """Factory to create the configured LLM provider.
 
-    Supports 'groq' (default). Add 'openai' by creating an OpenAIProvider
-    class and adding a case here.
+    Supports 'groq' (default) and 'fake' (offline, for local runs). Add
+    'openai' by creating an OpenAIProvider class and adding a case here.
     """
     settings = get_settings()
     provider = provider or settings.llm_provider
@@ -24,6 +25,8 @@ def create_llm_provider(
             api_key=api_key or settings.groq_api_key,
             model=model or settings.groq_model,
         )
+    elif provider == 'fake':
+        return FakeProvider(model=model)
     # elif provider == 'openai':
     #     from .openai_provider import OpenAIProvider
     #     return OpenAIProvider(
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class FakeProvider:
+    """Offline LLM provider for local development and load testing.
+
+    Answers with a canned response (or an echo of the prompt) and streams it
+    word by word, optionally pacing tokens to mimic a real model.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        response: Optional[str] = None,
+        token_delay_seconds: float = 0.0,
+    ) -> None:
+        self.model = model or 'fake'
+        self.response = response
+        self.token_delay_seconds = token_delay_seconds
+
+    def _answer(self, user: str) -> str:
+        if self.response is not None:
+            return self.response
+        question = user.rsplit('user:', 1)[-1].strip()
+        return f'[{self.model}] You asked: {question}'
+
+    async def chat(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.2,
+        max_tokens: int = 8192,
+    ) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'content': self._answer(user),
+        }
+
+    async def stream_chat(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.2,
+        max_tokens: int = 8192,
+    ) -> AsyncIterator[str]:
+        words = self._answer(user).split(' ')
+        for i, word in enumerate(words):
+            if self.token_delay_seconds:
+                await asyncio.sleep(self.token_delay_seconds)
+            yield word if i == 0 else f' {word}'
+
+    async def close(self) -> None:
+        return None
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_groq import ChatGroq
@@ -41,5 +41,26 @@ class GroqProvider:
 
         return await with_retry(_do, max_retries=1, base_delay=1.0)
 
+    async def stream_chat(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.2,
+        max_tokens: int = 8192,
+    ) -> AsyncIterator[str]:
+        # No retry here: once tokens have been forwarded a retry would duplicate them.
+        async for chunk in self._llm.astream(
+            [SystemMessage(content=system), HumanMessage(content=user)],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            content = chunk.content
+            if content:
+                yield content if isinstance(content, str) else str(content)
+
+    async def warm_up(self) -> None:
+        """Open the HTTPS connection and initialize langchain's client ahead of the first run."""
+        await self._llm.ainvoke([HumanMessage(content='ping')], max_tokens=1)
+
     async def close(self) -> None:
         return None
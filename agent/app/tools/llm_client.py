@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 from app.tools.llm.factory import create_llm_provider
 
@@ -15,6 +15,12 @@ class LlmClient:
     async def close(self) -> None:
         await self._provider.close()
 
+    async def warm_up(self) -> None:
+        """Let the provider pay its connection and setup costs now, if it has any."""
+        warm_up = getattr(self._provider, 'warm_up', None)
+        if warm_up is not None:
+            await warm_up()
+
     async def chat(
         self,
         system: str,
@@ -28,3 +34,18 @@ class LlmClient:
             temperature=temperature,
             max_tokens=max_tokens,
         )
+
+    async def stream_chat(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.2,
+        max_tokens: int = 8192,
+    ) -> AsyncIterator[str]:
+        async for token in self._provider.stream_chat(
+            system=system,
+            user=user,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            yield token
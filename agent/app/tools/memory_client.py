@@ -1,18 +1,42 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
 
 from mem0 import Memory
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
 
 class MemoryClient:
-    """Wrapper around mem0 for semantic memory storage and retrieval."""
+    """Async wrapper around mem0 for semantic memory storage and retrieval.
 
-    def __init__(self) -> None:
+    mem0 is synchronous and does embedding, pgvector queries and LLM calls
+    internally, so every call runs on a small dedicated thread pool with a
+    timeout instead of on the event loop. The pool size bounds how many mem0
+    calls run at once; callers past that wait in the executor queue.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        search_timeout_seconds: Optional[float] = None,
+        add_timeout_seconds: Optional[float] = None,
+    ) -> None:
         settings = get_settings()
-        
+        self.search_timeout_seconds = search_timeout_seconds or settings.memory_search_timeout_seconds
+        self.add_timeout_seconds = add_timeout_seconds or settings.memory_add_timeout_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.memory_max_workers,
+            thread_name_prefix='mem0',
+        )
+
         config = {
             "llm": {
                 "provider": "groq",
@@ -45,36 +69,74 @@ class MemoryClient:
         
         self._memory = Memory.from_config(config)
 
-    def add(
+    async def _run(
+        self,
+        fn: Callable[[], T],
+        timeout: float,
+        default: T,
+        op: str,
+        raise_errors: bool = False,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, fn), timeout)
+        except asyncio.TimeoutError:
+            # The worker thread keeps running to completion; only the caller stops waiting
+            logger.warning('mem0 %s timed out after %.1fs', op, timeout)
+            if raise_errors:
+                raise
+            return default
+        except Exception as e:
+            logger.warning('mem0 %s failed: %s', op, e)
+            if raise_errors:
+                raise
+            return default
+
+    async def add(
         self,
         messages: List[Dict[str, str]],
         user_id: str,
         metadata: Optional[Dict[str, Any]] = None,
+        raise_errors: bool = False,
     ) -> Dict[str, Any]:
-        """Add memories from a conversation turn."""
-        try:
-            result = self._memory.add(messages, user_id=user_id, metadata=metadata or {})
-            return result if result else {}
-        except Exception:
-            return {}
+        """Add memories from a conversation turn.
+
+        Failures and timeouts return ``{}`` unless ``raise_errors`` is set,
+        for callers (like the write queue) that retry.
+        """
+        result = await self._run(
+            lambda: self._memory.add(messages, user_id=user_id, metadata=metadata or {}),
+            self.add_timeout_seconds,
+            {},
+            'add',
+            raise_errors=raise_errors,
+        )
+        return result if result else {}
 
-    def search(
+    async def search(
         self,
         query: str,
         user_id: str,
         limit: int = 5,
     ) -> List[Dict[str, Any]]:
         """Search for relevant memories."""
-        try:
-            results = self._memory.search(query, user_id=user_id, limit=limit)
-            return results if results else []
-        except Exception:
-            return []
+        results = await self._run(
+            lambda: self._memory.search(query, user_id=user_id, limit=limit),
+            self.search_timeout_seconds,
+            [],
+            'search',
+        )
+        return results if results else []
 
-    def get_all(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_all(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all memories for a user."""
-        try:
-            results = self._memory.get_all(user_id=user_id)
-            return results if results else []
-        except Exception:
-            return []
+        results = await self._run(
+            lambda: self._memory.get_all(user_id=user_id),
+            self.search_timeout_seconds,
+            [],
+            'get_all',
+        )
+        return results if results else []
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
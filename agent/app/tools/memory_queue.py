@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.tools.memory_client import MemoryClient
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shard INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    messages TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memory_writes_shard ON memory_writes (shard, id);
+CREATE INDEX IF NOT EXISTS idx_memory_writes_user ON memory_writes (user_id, id);
+"""
+
+# Columns added after the first release; added in place to existing queue files
+_MIGRATIONS = {
+    'attempts': 'ALTER TABLE memory_writes ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0',
+    'next_attempt_at': 'ALTER TABLE memory_writes ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0',
+    'claimed_by': 'ALTER TABLE memory_writes ADD COLUMN claimed_by TEXT',
+    'claimed_at': 'ALTER TABLE memory_writes ADD COLUMN claimed_at REAL',
+}
+
+# Oldest turn in the shard whose user has no earlier (or same) turn that is
+# claimed under a live lease or waiting out a retry backoff: later turns of a
+# user never overtake earlier ones, across workers and processes.
+_HEAD_SQL = """
+SELECT w.user_id FROM memory_writes w
+WHERE w.shard = :shard
+  AND NOT EXISTS (
+      SELECT 1 FROM memory_writes o
+      WHERE o.user_id = w.user_id AND o.id <= w.id
+        AND ((o.claimed_by IS NOT NULL AND o.claimed_at > :lease_cutoff) OR o.next_attempt_at > :now)
+  )
+ORDER BY w.id
+LIMIT 1
+"""
+
+
+class MemoryWriteQueue:
+    """Durable background queue for mem0 writes.
+
+    Conversation turns are appended to a local SQLite file and drained by
+    ``num_workers`` background workers, so runs complete without waiting on
+    mem0's extraction LLM call, embeddings and vector upserts. Users are
+    sharded onto workers by a stable hash and each worker drains its shard in
+    insertion order, which keeps writes for a user in order. Consecutive
+    turns of the same user and conversation (up to ``max_batch_turns``) are
+    consolidated into a single ``add`` call.
+
+    Turns are deleted only after mem0 accepted them. A failed or timed-out
+    ``add`` leaves the turns queued with an attempt counter and exponential
+    backoff (``retry_base_seconds`` doubling up to ``retry_max_seconds``);
+    after ``max_attempts`` they are dropped with an error. Batches are
+    claimed with a lease inside a write transaction, so several processes
+    (uvicorn workers) sharing the file never process the same turns, and a
+    crashed process's claims are picked up again once ``claim_ttl_seconds``
+    have passed. Anything still queued at shutdown is handled on next start.
+    """
+
+    def __init__(
+        self,
+        memory_client: MemoryClient,
+        path: str,
+        num_workers: int = 2,
+        max_batch_turns: int = 8,
+        batch_window_seconds: float = 2.0,
+        max_attempts: int = 8,
+        retry_base_seconds: float = 5.0,
+        retry_max_seconds: float = 600.0,
+        claim_ttl_seconds: float = 300.0,
+        poll_interval_seconds: float = 15.0,
+    ) -> None:
+        self.memory_client = memory_client
+        self.num_workers = num_workers
+        self.max_batch_turns = max_batch_turns
+        self.batch_window_seconds = batch_window_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.claim_ttl_seconds = claim_ttl_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.owner = f'{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        self._db_lock = threading.Lock()
+        self._wakeups = [asyncio.Event() for _ in range(num_workers)]
+        self._workers: List[asyncio.Task[None]] = []
+        self.metrics: Dict[str, int] = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'retried': 0,
+            'dropped': 0,
+        }
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(memory_writes)')}
+        for column, ddl in _MIGRATIONS.items():
+            if column not in columns:
+                self._db.execute(ddl)
+
+    def _shard(self, user_id: str) -> int:
+        return zlib.crc32(user_id.encode('utf-8')) % self.num_workers
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(shard)) for shard in range(self.num_workers)]
+        # Drain whatever a previous process left behind
+        for wakeup in self._wakeups:
+            wakeup.set()
+
+    async def close(self) -> None:
+        """Stop the workers; queued turns stay on disk for the next start."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        with self._db_lock:
+            # Hand unfinished claims back right away instead of waiting out the lease
+            self._db.execute(
+                'UPDATE memory_writes SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?',
+                (self.owner,),
+            )
+            self._db.close()
+        logger.info('Memory write queue closed: %s', self.metrics)
+
+    async def enqueue(
+        self,
+        user_id: str,
+        messages: List[Dict[str, str]],
+        conversation_id: str = '',
+    ) -> None:
+        """Durably record a turn for background consolidation."""
+        shard = self._shard(user_id)
+        await asyncio.to_thread(self._insert, shard, user_id, conversation_id, json.dumps(messages))
+        self.metrics['enqueued'] += 1
+        self._wakeups[shard].set()
+
+    def _insert(self, shard: int, user_id: str, conversation_id: str, messages: str) -> None:
+        with self._db_lock:
+            self._db.execute(
+                'INSERT INTO memory_writes (shard, user_id, conversation_id, messages) VALUES (?, ?, ?, ?)',
+                (shard, user_id, conversation_id, messages),
+            )
+
+    def _next_batch(self, shard: int) -> Optional[Tuple[List[int], str, str, List[Dict[str, str]], int]]:
+        """Claim the oldest ready run of consecutive turns for one user and conversation.
+
+        Returns ``(ids, user_id, conversation_id, messages, attempts)``.
+        """
+        now = time.time()
+        with self._db_lock:
+            # BEGIN IMMEDIATE takes SQLite's write lock up front, so the read
+            # and the claim are atomic across processes sharing the file.
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                head = self._db.execute(_HEAD_SQL, {
+                    'shard': shard,
+                    'now': now,
+                    'lease_cutoff': now - self.claim_ttl_seconds,
+                }).fetchone()
+                if head is None:
+                    self._db.execute('COMMIT')
+                    return None
+                rows = self._db.execute(
+                    'SELECT id, conversation_id, messages, attempts FROM memory_writes '
+                    'WHERE shard = ? AND user_id = ? ORDER BY id LIMIT ?',
+                    (shard, head[0], self.max_batch_turns),
+                ).fetchall()
+                ids: List[int] = []
+                messages: List[Dict[str, str]] = []
+                conversation_id = rows[0][1]
+                attempts = 0
+                for row_id, row_conversation_id, row_messages, row_attempts in rows:
+                    if row_conversation_id != conversation_id:
+                        break
+                    ids.append(row_id)
+                    messages.extend(json.loads(row_messages))
+                    attempts = max(attempts, row_attempts)
+                self._db.execute(
+                    f'UPDATE memory_writes SET claimed_by = ?, claimed_at = ? '
+                    f'WHERE id IN ({",".join("?" * len(ids))})',
+                    (self.owner, now, *ids),
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return ids, head[0], conversation_id, messages, attempts
+
+    def _next_retry_at(self, shard: int) -> Optional[float]:
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT MIN(next_attempt_at) FROM memory_writes WHERE shard = ? AND next_attempt_at > ?',
+                (shard, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _delete(self, ids: List[int]) -> None:
+        with self._db_lock:
+            self._db.execute(
+                f'DELETE FROM memory_writes WHERE id IN ({",".join("?" * len(ids))})',
+                ids,
+            )
+
+    def _release_for_retry(self, ids: List[int], attempts: int) -> float:
+        """Unclaim a failed batch and schedule its next attempt; returns the delay."""
+        delay = min(self.retry_base_seconds * (2 ** (attempts - 1)), self.retry_max_seconds)
+        with self._db_lock:
+            self._db.execute(
+                f'UPDATE memory_writes SET attempts = ?, next_attempt_at = ?, '
+                f'claimed_by = NULL, claimed_at = NULL WHERE id IN ({",".join("?" * len(ids))})',
+                (attempts, time.time() + delay, *ids),
+            )
+        return delay
+
+    async def _wait(self, shard: int) -> None:
+        """Sleep until woken by an enqueue, a retry falls due, or the poll interval passes."""
+        timeout = self.poll_interval_seconds
+        retry_at = await asyncio.to_thread(self._next_retry_at, shard)
+        if retry_at is not None:
+            timeout = min(timeout, max(retry_at - time.time(), 0.0))
+        try:
+            await asyncio.wait_for(self._wakeups[shard].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self, shard: int) -> None:
+        wakeup = self._wakeups[shard]
+        while True:
+            await self._wait(shard)
+            if wakeup.is_set():
+                wakeup.clear()
+                # Give a chatty user's next turns a moment to arrive so they share one call
+                await asyncio.sleep(self.batch_window_seconds)
+            while True:
+                batch = await asyncio.to_thread(self._next_batch, shard)
+                if batch is None:
+                    break
+                ids, user_id, conversation_id, messages, attempts = batch
+                try:
+                    await self.memory_client.add(
+                        messages=messages,
+                        user_id=user_id,
+                        metadata={'conversationId': conversation_id, 'turns': len(ids)},
+                        raise_errors=True,
+                    )
+                except Exception as e:
+                    attempts += 1
+                    if attempts >= self.max_attempts:
+                        logger.error(
+                            'Memory consolidation for user %s failed %d times; dropping %d turns: %s',
+                            user_id, attempts, len(ids), e,
+                        )
+                        await asyncio.to_thread(self._delete, ids)
+                        self.metrics['dropped'] += len(ids)
+                        continue
+                    delay = await asyncio.to_thread(self._release_for_retry, ids, attempts)
+                    self.metrics['retried'] += len(ids)
+                    logger.warning(
+                        'Memory consolidation for user %s failed (attempt %d); retrying in %.0fs: %s',
+                        user_id, attempts, delay, e,
+                    )
+                    continue
+                await asyncio.to_thread(self._delete, ids)
+                self.metrics['written'] += len(ids)
+                self.metrics['batches'] += 1
@@ -38,6 +38,10 @@ class MinioClient:
             response.close()
             response.release_conn()
 
+    def download_to_file(self, key: str, path: str) -> None:
+        """Stream an object from MinIO to a local file without buffering it in memory."""
+        self._client.fget_object(self.bucket, key, path)
+
     def upload(self, key: str, data: bytes, content_type: str = 'application/octet-stream') -> None:
         """Upload bytes to MinIO."""
         self._client.put_object(
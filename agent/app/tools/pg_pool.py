@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set, TypeVar
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.extensions
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class PreparedStatement:
+    """A named statement using $1..$n placeholders, prepared once per connection."""
+
+    name: str
+    sql: str
+    num_params: int
+
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that carries its own pool bookkeeping.
+
+    Keeping the prepared-statement set on the connection object (rather
+    than keyed by ``id(conn)``) means it dies with the connection and can
+    never be inherited by a new connection that happens to reuse the id.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+        self.last_used = time.monotonic()
+
+
+class PgPool:
+    """Shared Postgres connection pool for the agent's own queries.
+
+    psycopg2 is blocking, so every query runs on a thread pool sized to the
+    connection pool: at most ``max_size`` queries are in flight and the rest
+    queue without ever touching the event loop. Up to ``max_size``
+    connections are kept open and reused (``warm()`` opens ``min_size`` of
+    them ahead of time); they carry a server-side ``statement_timeout``, are
+    pinged before reuse when they have sat idle longer than
+    ``health_check_interval_seconds``, and keep their prepared statements
+    for their whole lifetime.
+
+    Nothing connects at construction, so a database that is down at startup
+    only fails the queries made while it is down; connections are opened
+    lazily once it is back.
+    """
+
+    def __init__(
+        self,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        statement_timeout_ms: Optional[int] = None,
+        health_check_interval_seconds: Optional[float] = None,
+    ) -> None:
+        settings = get_settings()
+        self.min_size = min_size or settings.pg_pool_min_size
+        self.max_size = max_size or settings.pg_pool_max_size
+        self.statement_timeout_ms = statement_timeout_ms or settings.pg_statement_timeout_ms
+        self.health_check_interval_seconds = (
+            health_check_interval_seconds or settings.pg_pool_health_check_interval_seconds
+        )
+        self._conn_params = {
+            'host': settings.pg_host,
+            'port': settings.pg_port,
+            'user': settings.pg_user,
+            'password': settings.pg_password,
+            'dbname': settings.pg_db,
+            'connect_timeout': settings.pg_connect_timeout_seconds,
+            'options': f'-c statement_timeout={self.statement_timeout_ms}',
+        }
+        self._executor = ThreadPoolExecutor(max_workers=self.max_size, thread_name_prefix='pgpool')
+        # Idle connections, most recently used last (reused first, so extras age out of use)
+        self._idle: Deque[_PooledConnection] = deque()
+        self._busy: Set[_PooledConnection] = set()
+        self._open = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _connect(self) -> _PooledConnection:
+        return psycopg2.connect(connection_factory=_PooledConnection, **self._conn_params)
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._busy.discard(conn)
+            self._open -= 1
+            self._cond.notify()
+
+    def _checkout(self) -> Optional[_PooledConnection]:
+        """An idle connection, or None once a slot to open a new one is reserved."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.InterfaceError('connection pool is closed')
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._busy.add(conn)
+                    return conn
+                if self._open < self.max_size:
+                    self._open += 1
+                    return None
+                self._cond.wait()
+
+    def _acquire(self) -> _PooledConnection:
+        while True:
+            conn = self._checkout()
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._busy.add(conn)
+                return conn
+            if not conn.closed and time.monotonic() - conn.last_used <= self.health_check_interval_seconds:
+                return conn
+            try:
+                if conn.closed:
+                    raise psycopg2.InterfaceError('connection closed')
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+                return conn
+            except psycopg2.Error as e:
+                logger.warning('Discarding unhealthy Postgres connection: %s', e)
+                self._discard(conn)
+
+    def _release(self, conn: _PooledConnection, broken: bool = False) -> None:
+        if broken or conn.closed or self._closed:
+            self._discard(conn)
+            return
+        conn.last_used = time.monotonic()
+        with self._cond:
+            self._busy.discard(conn)
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def warm(self) -> None:
+        """Open ``min_size`` connections ahead of the first queries (blocking)."""
+        conns = [self._acquire() for _ in range(self.min_size)]
+        for conn in conns:
+            self._release(conn)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {'open': self._open, 'idle': len(self._idle), 'maxSize': self.max_size}
+
+    def _call(self, fn: Callable[[Any], T]) -> T:
+        conn = self._acquire()
+        broken = False
+        try:
+            result = fn(conn)
+            conn.commit()
+            return result
+        except Exception:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+
+    async def run(self, fn: Callable[[Any], T]) -> T:
+        """Run ``fn(conn)`` in a transaction on a pooled connection, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn)
+
+    def execute_prepared(self, cur, statement: PreparedStatement, params: Sequence[Any]) -> None:
+        """Execute a prepared statement on ``cur``, preparing it on first use per connection."""
+        conn = cur.connection
+        # Connections from this pool carry their set; anything else is prepared every time
+        prepared: Set[str] = getattr(conn, 'prepared', set())
+        if statement.name not in prepared:
+            cur.execute(f'PREPARE {statement.name} AS {statement.sql}')
+            prepared.add(statement.name)
+        placeholders = ', '.join(['%s'] * statement.num_params)
+        cur.execute(f'EXECUTE {statement.name} ({placeholders})', tuple(params))
+
+    async def fetch(self, statement: PreparedStatement, params: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Execute a prepared statement and return its rows as dicts."""
+
+        def _fetch(conn) -> List[Dict[str, Any]]:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                self.execute_prepared(cur, statement, params)
+                return cur.fetchall()
+
+        return await self.run(_fetch)
+
+    def close(self) -> None:
+        """Close the pool without waiting on statements still running.
+
+        Queued queries are dropped and running ones (e.g. a first CREATE
+        INDEX CONCURRENTLY, which can take minutes) are cancelled server-side;
+        an index build interrupted this way is dropped and rebuilt on the
+        next start.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            busy = list(self._busy)
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in busy:
+            try:
+                conn.cancel()
+            except psycopg2.Error:
+                pass
+        for conn in idle:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def _merge_text(left: str, right: str, max_overlap: int = 400) -> str:
+    """Join neighbouring chunks, dropping the text splitter's overlap."""
+    for size in range(min(len(left), len(right), max_overlap), 19, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f'{left}\n{right}'
+
+
+def _unit(vector: Any) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+def collapse_adjacent(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge retrieved chunks that are consecutive in the same document into one passage.
+
+    The merged passage keeps the best similarity (and fused score) of its parts
+    and the mean of their embeddings, so it still competes fairly in re-ranking.
+    """
+    ordered = sorted(results, key=lambda r: (r['documentId'], r['chunkIndex']))
+    passages: List[Dict[str, Any]] = []
+    for result in ordered:
+        previous = passages[-1] if passages else None
+        if (
+            previous is not None
+            and previous['documentId'] == result['documentId']
+            and result['chunkIndex'] == previous['chunkIndexes'][-1] + 1
+        ):
+            previous['content'] = _merge_text(previous['content'], result['content'])
+            previous['tokenCount'] = len(previous['content'].split())
+            previous['chunkIndexes'].append(result['chunkIndex'])
+            previous['similarity'] = max(previous['similarity'], result['similarity'])
+            if 'fusedScore' in previous and 'fusedScore' in result:
+                previous['fusedScore'] = max(previous['fusedScore'], result['fusedScore'])
+            if previous.get('embedding') is not None and result.get('embedding') is not None:
+                previous['embedding'] = _unit(previous['embedding'] + _unit(result['embedding']))
+            else:
+                previous['embedding'] = None
+            continue
+        passages.append({
+            **result,
+            'chunkIndexes': [result['chunkIndex']],
+            'embedding': _unit(result.get('embedding')),
+        })
+    return passages
+
+
+def _relevance(candidates: List[Dict[str, Any]]) -> List[float]:
+    # Hybrid results are ranked by their fused score, which also credits
+    # full-text matches; min-max scale it to the cosine range redundancy is
+    # measured in. Dense-only results fall back to the query similarity.
+    if not candidates or any('fusedScore' not in c for c in candidates):
+        return [c['similarity'] for c in candidates]
+    scores = np.asarray([c['fusedScore'] for c in candidates], dtype=np.float64)
+    spread = scores.max() - scores.min()
+    if spread <= 0:
+        return [1.0] * len(candidates)
+    return ((scores - scores.min()) / spread).tolist()
+
+
+def mmr_rerank(
+    results: List[Dict[str, Any]],
+    token_budget: int,
+    lambda_: float = 0.7,
+    collapse: bool = True,
+) -> List[Dict[str, Any]]:
+    """Select a diverse subset of retrieved chunks that fits ``token_budget``.
+
+    Maximal marginal relevance: each pick maximizes
+    ``lambda_ * relevance - (1 - lambda_) * max_cosine_to_already_picked``,
+    so near-duplicate passages lose to ones that add new information. Relevance
+    is the hybrid ``fusedScore`` scaled to [0, 1] when every result has one,
+    the query similarity otherwise; redundancy uses the chunks' own
+    embeddings (when a chunk has none, it is only penalized by relevance).
+    Passages that no longer fit the budget are skipped, and embeddings are
+    dropped from the output.
+    """
+    candidates = collapse_adjacent(results) if collapse else [
+        {**r, 'embedding': _unit(r.get('embedding'))} for r in results
+    ]
+    relevance = _relevance(candidates)
+    selected: List[Dict[str, Any]] = []
+    selected_vectors: List[np.ndarray] = []
+    used = 0
+    remaining = list(zip(candidates, relevance))
+    while remaining:
+        best_index, best_score = -1, -np.inf
+        for i, (candidate, candidate_relevance) in enumerate(remaining):
+            redundancy = 0.0
+            vector = candidate.get('embedding')
+            if vector is not None and selected_vectors:
+                redundancy = float(np.max(np.stack(selected_vectors) @ vector))
+            score = lambda_ * candidate_relevance - (1 - lambda_) * redundancy
+            if score > best_score:
+                best_index, best_score = i, score
+        candidate, _ = remaining.pop(best_index)
+        tokens = candidate.get('tokenCount') or 0
+        if selected and used + tokens > token_budget:
+            continue
+        used += tokens
+        selected.append(candidate)
+        if candidate.get('embedding') is not None:
+            selected_vectors.append(candidate['embedding'])
+    return [{k: v for k, v in r.items() if k != 'embedding'} for r in selected]
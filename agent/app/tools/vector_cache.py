@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import psycopg2.extras
+
+from app.config import get_settings
+from app.tools.pg_pool import PgPool
+
+try:  # Optional: graph index for large projects, brute force otherwise
+    import hnswlib
+except ImportError:  # pragma: no cover - optional dependency
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# Tokens that full-text search finds better than embeddings: anything with a
+# digit (ENG-123, v2), acronyms, snake_case / dotted API names
+_LEXICAL_HINT = re.compile(r'\b(?:[A-Z]{2,}\w*|\w*\d\w*|\w+[_.]\w+)\b')
+
+_LOAD_SQL = """
+    SELECT
+        dc.id,
+        dc."documentId",
+        dc."chunkIndex",
+        dc.content,
+        dc."tokenCount",
+        dc.embedding,
+        d.title as "documentTitle",
+        d."mimeType",
+        d."createdAt",
+        COALESCE(d.metadata->>'sourceType', 'upload') as "sourceType"
+    FROM document_chunk dc
+    JOIN document d ON d.id = dc."documentId"
+    WHERE d."projectId" = %s
+      AND dc.embedding IS NOT NULL
+      AND NOT dc.pending
+"""
+
+# A project's documents change (created, reprocessed, renamed, deleted) in
+# other workers and in the API; every one of those moves its count or its
+# latest updatedAt. The last column counts documents other than ``$3`` that
+# changed after ``$2``, for adopting a version after an in-place refresh.
+_VERSION_SQL = """
+    SELECT
+        count(*),
+        max("updatedAt"),
+        count(*) FILTER (WHERE "updatedAt" > %s AND id <> %s)
+    FROM document
+    WHERE "projectId" = %s
+"""
+
+_Version = Tuple[int, Optional[datetime]]
+
+
+def needs_lexical(query: str) -> bool:
+    """Whether a query contains identifier-like tokens that need full-text search."""
+    return bool(_LEXICAL_HINT.search(query))
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # createdAt is a timestamp without time zone; compare like Postgres would
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _ProjectIndex:
+    """All embedded chunks of one project, as a normalized float32 matrix."""
+
+    def __init__(self, rows: List[Dict[str, Any]], dims: int, hnsw_threshold: int) -> None:
+        self.dims = dims
+        self.hnsw_threshold = hnsw_threshold
+        self.rows: List[Dict[str, Any]] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.matrix = np.zeros((0, dims), dtype=np.float32)
+        self.hnsw = None
+        self._content_bytes = 0
+        # Document version the rows were read at, and when it was last confirmed
+        self.version: Optional[_Version] = None
+        self.verified_at = 0.0
+        self.append(rows)
+
+    @property
+    def size(self) -> int:
+        return int(self.alive.sum())
+
+    @property
+    def nbytes(self) -> int:
+        # Matrix plus content and a rough per-row overhead for the metadata dict
+        return self.matrix.nbytes + self._content_bytes + 256 * len(self.rows)
+
+    def append(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        vectors = _normalize(np.asarray([r.pop('embedding') for r in rows], dtype=np.float32))
+        start = len(self.rows)
+        self.rows.extend(rows)
+        self._content_bytes += sum(len(r['content']) for r in rows)
+        self.matrix = np.vstack([self.matrix, vectors]) if start else vectors
+        self.alive = np.concatenate([self.alive, np.ones(len(rows), dtype=bool)])
+        if self.hnsw is not None:
+            if self.hnsw.get_max_elements() < len(self.rows):
+                self.hnsw.resize_index(len(self.rows) * 2)
+            self.hnsw.add_items(vectors, np.arange(start, len(self.rows)))
+        elif hnswlib is not None and self.size >= self.hnsw_threshold:
+            self._build_hnsw()
+
+    def has_document(self, document_id: str) -> bool:
+        return any(
+            self.alive[i] and row['documentId'] == document_id
+            for i, row in enumerate(self.rows)
+        )
+
+    def remove_document(self, document_id: str) -> None:
+        for i, row in enumerate(self.rows):
+            if self.alive[i] and row['documentId'] == document_id:
+                self.alive[i] = False
+                if self.hnsw is not None:
+                    self.hnsw.mark_deleted(i)
+        # Compact once tombstones dominate
+        if len(self.rows) and self.size < len(self.rows) * 0.75:
+            keep = np.flatnonzero(self.alive)
+            self.rows = [self.rows[i] for i in keep]
+            self.matrix = self.matrix[keep]
+            self.alive = np.ones(len(self.rows), dtype=bool)
+            self._content_bytes = sum(len(r['content']) for r in self.rows)
+            self.hnsw = None
+            if hnswlib is not None and self.size >= self.hnsw_threshold:
+                self._build_hnsw()
+
+    def _build_hnsw(self) -> None:
+        settings = get_settings()
+        index = hnswlib.Index(space='ip', dim=self.dims)
+        index.init_index(
+            max_elements=max(len(self.rows) * 2, 1),
+            ef_construction=settings.hnsw_ef_construction,
+            M=settings.hnsw_m,
+        )
+        index.add_items(self.matrix, np.arange(len(self.rows)))
+        for i in np.flatnonzero(~self.alive):
+            index.mark_deleted(int(i))
+        index.set_ef(settings.hnsw_ef_search)
+        self.hnsw = index
+
+    def _mask(self, filters) -> Optional[np.ndarray]:
+        if filters is None or not any(v is not None for v in filters.params()):
+            return None
+        document_ids = set(filters.document_ids) if filters.document_ids else None
+        mime_types = set(filters.mime_types) if filters.mime_types else None
+        created_after = _naive_utc(filters.created_after)
+        created_before = _naive_utc(filters.created_before)
+        source_types = filters.source_types()
+        return np.fromiter(
+            (
+                (document_ids is None or r['documentId'] in document_ids)
+                and (mime_types is None or r['mimeType'] in mime_types)
+                and (created_after is None or r['createdAt'] >= created_after)
+                and (created_before is None or r['createdAt'] < created_before)
+                and (source_types is None or r['sourceType'] in source_types)
+                for r in self.rows
+            ),
+            dtype=bool,
+            count=len(self.rows),
+        )
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+        score_threshold: float,
+        filters=None,
+        include_embeddings: bool = False,
+    ) -> List[Dict[str, Any]]:
+        mask = self._mask(filters)
+        candidates: Optional[np.ndarray] = None
+        if self.hnsw is not None and mask is None:
+            k = min(limit, self.size)
+            if k:
+                labels, distances = self.hnsw.knn_query(query, k=k)
+                candidates = labels[0]
+                scores = 1 - distances[0]
+        if candidates is None:
+            valid = self.alive if mask is None else self.alive & mask
+            sims = self.matrix @ query
+            sims[~valid] = -np.inf
+            k = min(limit, int(valid.sum()))
+            if not k:
+                return []
+            top = np.argpartition(-sims, k - 1)[:k]
+            candidates = top[np.argsort(-sims[top])]
+            scores = sims[candidates]
+
+        results = []
+        for i, score in zip(candidates, scores):
+            if score < score_threshold:
+                break
+            row = self.rows[int(i)]
+            results.append({
+                'id': row['id'],
+                'documentId': row['documentId'],
+                'documentTitle': row['documentTitle'],
+                'chunkIndex': row['chunkIndex'],
+                'content': row['content'],
+                'tokenCount': row['tokenCount'],
+                'similarity': float(score),
+                **({'embedding': self.matrix[int(i)]} if include_embeddings else {}),
+            })
+        return results
+
+
+class ProjectVectorCache:
+    """In-process vector index for hot projects, evicted LRU under a memory budget.
+
+    A project is loaded in the background once it has been queried
+    ``min_hits`` times; until then (and for projects larger than the whole
+    budget) callers fall back to Postgres. Small projects are searched by
+    brute force over a NumPy matrix, projects with ``hnsw_threshold`` or more
+    chunks through an hnswlib graph when the ``hnsw`` extra is installed.
+    Documents that are (re)processed or removed through this worker are
+    updated in place rather than reloading the project.
+
+    Other workers and the API change documents too, so a cached project is
+    only served for ``revalidate_seconds`` after its document version (count
+    and latest ``updatedAt``) was last confirmed. Past that the query falls
+    back to Postgres while the version is checked in the background, and a
+    changed project is reloaded.
+    """
+
+    def __init__(
+        self,
+        pool: PgPool,
+        max_bytes: Optional[int] = None,
+        min_hits: Optional[int] = None,
+        hnsw_threshold: Optional[int] = None,
+        revalidate_seconds: Optional[float] = None,
+    ) -> None:
+        settings = get_settings()
+        self.pool = pool
+        self.dims = settings.ollama_embed_dims
+        self.max_bytes = max_bytes or settings.rag_cache_max_bytes
+        self.min_hits = min_hits or settings.rag_cache_min_hits
+        self.hnsw_threshold = hnsw_threshold or settings.rag_cache_hnsw_threshold
+        self.revalidate_seconds = (
+            settings.rag_cache_revalidate_seconds if revalidate_seconds is None else revalidate_seconds
+        )
+        self._projects: OrderedDict[str, _ProjectIndex] = OrderedDict()
+        self._hits: OrderedDict[str, int] = OrderedDict()
+        self._loading: Dict[str, asyncio.Task[None]] = {}
+        self._too_large: set[str] = set()
+        self.metrics: Dict[str, int] = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'evictions': 0,
+            'revalidations': 0,
+            'invalidations': 0,
+        }
+
+    def search(
+        self,
+        project_id: str,
+        query_embedding: Sequence[float],
+        limit: int,
+        score_threshold: float,
+        filters=None,
+        include_embeddings: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Search a cached project; returns None when the project is not cached."""
+        index = self._projects.get(project_id)
+        if index is None:
+            self.metrics['misses'] += 1
+            self._record_hit(project_id)
+            return None
+        if time.monotonic() - index.verified_at > self.revalidate_seconds:
+            # Possibly stale: answer from Postgres while the version is checked
+            self.metrics['misses'] += 1
+            if project_id not in self._loading:
+                self._loading[project_id] = asyncio.create_task(self._revalidate(project_id, index))
+            return None
+        self.metrics['hits'] += 1
+        self._projects.move_to_end(project_id)
+        query = _normalize(np.asarray([query_embedding], dtype=np.float32))[0]
+        return index.search(query, limit, score_threshold, filters, include_embeddings)
+
+    def _record_hit(self, project_id: str) -> None:
+        if project_id in self._too_large or project_id in self._loading:
+            return
+        hits = self._hits.pop(project_id, 0) + 1
+        self._hits[project_id] = hits
+        while len(self._hits) > 10_000:
+            self._hits.popitem(last=False)
+        if hits >= self.min_hits:
+            self._loading[project_id] = asyncio.create_task(self._load(project_id))
+
+    async def _fetch_rows(self, project_id: str, document_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = _LOAD_SQL + (' AND dc."documentId" = %s' if document_id else '')
+        params = (project_id, document_id) if document_id else (project_id,)
+
+        def _query(conn) -> List[Dict[str, Any]]:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(sql, params)
+                return [
+                    {**row, 'id': str(row['id']), 'documentId': str(row['documentId'])}
+                    for row in cur.fetchall()
+                ]
+
+        return await self.pool.run(_query)
+
+    async def _fetch_version(
+        self,
+        project_id: str,
+        since: Optional[datetime] = None,
+        excluding: Optional[str] = None,
+    ) -> Tuple[_Version, int]:
+        def _query(conn) -> Tuple[int, Optional[datetime], int]:
+            with conn.cursor() as cur:
+                cur.execute(_VERSION_SQL, (since, excluding, project_id))
+                return cur.fetchone()
+
+        count, updated_at, others_changed = await self.pool.run(_query)
+        return (count, updated_at), others_changed
+
+    async def _load(self, project_id: str) -> None:
+        try:
+            # Read the version first: a change landing mid-load moves it again
+            version, _ = await self._fetch_version(project_id)
+            rows = await self._fetch_rows(project_id)
+            index = await asyncio.to_thread(_ProjectIndex, rows, self.dims, self.hnsw_threshold)
+            index.version = version
+            index.verified_at = time.monotonic()
+            if index.nbytes > self.max_bytes:
+                logger.info('Project %s (%d bytes) exceeds the vector cache budget', project_id, index.nbytes)
+                self._too_large.add(project_id)
+                return
+            self._projects[project_id] = index
+            self._hits.pop(project_id, None)
+            self.metrics['loads'] += 1
+            logger.info('Cached %d chunks for project %s', index.size, project_id)
+            self._evict()
+        except Exception as e:
+            logger.warning('Failed to cache project %s: %s', project_id, e)
+        finally:
+            self._loading.pop(project_id, None)
+
+    async def _revalidate(self, project_id: str, index: _ProjectIndex) -> None:
+        reload = False
+        try:
+            self.metrics['revalidations'] += 1
+            version, _ = await self._fetch_version(project_id)
+            if version == index.version:
+                index.verified_at = time.monotonic()
+                return
+            logger.info('Project %s changed outside this worker, reloading its vector cache', project_id)
+            self.metrics['invalidations'] += 1
+            self.invalidate(project_id)
+            reload = True
+        except Exception as e:
+            logger.warning('Failed to revalidate cached project %s: %s', project_id, e)
+            self.invalidate(project_id)
+        finally:
+            # A reload keeps the slot, so no second one is scheduled meanwhile
+            if not reload:
+                self._loading.pop(project_id, None)
+        if reload:
+            await self._load(project_id)
+
+    async def _adopt_version(self, project_id: str, index: _ProjectIndex, document_id: str, delta: int) -> None:
+        # Keep serving without a reload only if this document explains the whole
+        # version change: ``delta`` documents added and no other document touched
+        previous = index.version
+        if previous is None:
+            return
+        version, others_changed = await self._fetch_version(project_id, previous[1], document_id)
+        if others_changed == 0 and version[0] == previous[0] + delta:
+            index.version = version
+        else:
+            index.verified_at = 0.0
+
+    async def refresh_document(self, project_id: str, document_id: str) -> None:
+        """Replace a document's chunks in a cached project after (re)processing."""
+        index = self._projects.get(project_id)
+        if index is None:
+            return
+        known = index.has_document(document_id)
+        rows = await self._fetch_rows(project_id, document_id)
+        index.remove_document(document_id)
+        index.append(rows)
+        # A document that was not cached may still have existed (no chunks yet);
+        # then the count is off by one and the project is simply revalidated
+        await self._adopt_version(project_id, index, document_id, 0 if known else 1)
+        self._evict()
+
+    async def remove_document(self, project_id: str, document_id: str) -> None:
+        """Drop a deleted document's chunks from a cached project."""
+        index = self._projects.get(project_id)
+        if index is None:
+            return
+        index.remove_document(document_id)
+        await self._adopt_version(project_id, index, document_id, -1)
+
+    def invalidate(self, project_id: str) -> None:
+        self._projects.pop(project_id, None)
+        self._too_large.discard(project_id)
+
+    def _evict(self) -> None:
+        while len(self._projects) > 1 and self.nbytes > self.max_bytes:
+            project_id, _ = self._projects.popitem(last=False)
+            self.metrics['evictions'] += 1
+            logger.info('Evicted project %s from the vector cache', project_id)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(index.nbytes for index in self._projects.values())
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, 'projects': len(self._projects), 'bytes': self.nbytes}
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import logging
+import re
+
+from app.config import get_settings
+from app.tools.pg_pool import PgPool
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'document_chunk_embedding_ann'
+FTS_INDEX_NAME = 'document_chunk_content_fts'
+VECTOR_INDEX_TYPES = ('hnsw', 'ivfflat', 'none')
+# 'simple' keeps identifiers like ENG-123 and acronyms intact (no stemming or stop words)
+FTS_CONFIG = 'simple'
+
+
+# Words too common to be worth matching on; the 'simple' config keeps every word
+_STOP_WORDS = frozenset("""
+a about after all also an and any are as at be been before but by can could did do does
+for from had has have how i if in into is it its me my no not of on or our out so than
+that the their them then there these they this to up us was we were what when where which
+who whom why will with would you your
+""".split())
+_TERM = re.compile(r'\w(?:[\w.-]*\w)?')
+
+
+def lexical_tsquery(text: str, max_terms: int = 16) -> str:
+    """An OR query over the significant terms of ``text``, for ``to_tsquery``.
+
+    websearch_to_tsquery ANDs every word of a question, stop words included,
+    so whole questions rarely match a chunk. Here any term matches and
+    ts_rank_cd ranks chunks containing more of them higher. Returns '' when
+    nothing is left to search for.
+    """
+    terms: list[str] = []
+    for term in _TERM.findall(text):
+        lowered = term.lower()
+        if lowered in _STOP_WORDS or lowered in terms:
+            continue
+        # Single letters only count when they are identifier-like (e.g. C)
+        if len(term) == 1 and not term.isupper():
+            continue
+        terms.append(lowered)
+        if len(terms) >= max_terms:
+            break
+    return ' | '.join("'" + term.replace("'", "''") + "'" for term in terms)
+
+
+def embedding_expr(dims: int, alias: str = 'dc') -> str:
+    """The typed expression the ANN index is built on; queries must use it verbatim."""
+    return f'({alias}.embedding::vector({dims}))'
+
+
+def tsvector_expr(alias: str = 'dc') -> str:
+    """The full-text expression the GIN index is built on; queries must use it verbatim."""
+    return f"to_tsvector('{FTS_CONFIG}', {alias}.content)"
+
+
+def _index_ddl(index_type: str, dims: int) -> str:
+    settings = get_settings()
+    expr = embedding_expr(dims, alias='document_chunk')
+    if index_type == 'hnsw':
+        params = f'm = {settings.hnsw_m}, ef_construction = {settings.hnsw_ef_construction}'
+    else:
+        params = f'lists = {settings.ivfflat_lists}'
+    return (
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        f'ON document_chunk USING {index_type} ({expr} vector_cosine_ops) WITH ({params})'
+    )
+
+
+def _fts_index_ddl() -> str:
+    return (
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {FTS_INDEX_NAME} '
+        f'ON document_chunk USING gin ({tsvector_expr(alias="document_chunk")})'
+    )
+
+
+def _ensure_index(cur, name: str, ddl: str) -> None:
+    cur.execute(
+        """
+        SELECT i.indisvalid FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND i.indrelid = 'document_chunk'::regclass
+        """,
+        (name,),
+    )
+    row = cur.fetchone()
+    if row is not None and not row[0]:
+        logger.warning('Dropping invalid index %s', name)
+        cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+        row = None
+    if row is None:
+        logger.info('Building index %s', name)
+        cur.execute(ddl)
+        logger.info('Index %s ready', name)
+
+
+async def ensure_retrieval_indexes(pool: PgPool) -> None:
+    """Create the ANN and full-text indexes on document_chunk if they do not exist.
+
+    The API owns ``document_chunk`` and keeps ``embedding`` as a float array,
+    so instead of a new column (which schema sync would drop) the index is
+    built on the typed cast ``embedding::vector(dims)``; the full-text index
+    is likewise an expression index over ``content``. Both are built
+    concurrently so chunk uploads keep working during the first build, and an
+    invalid index left behind by an interrupted build is dropped and rebuilt.
+    """
+    settings = get_settings()
+    index_type = settings.vector_index_type
+    if index_type not in VECTOR_INDEX_TYPES:
+        raise ValueError(f'Unknown vector index type: {index_type}')
+
+    def _ensure(conn) -> None:
+        # CONCURRENTLY cannot run inside a transaction, and a first build can
+        # outlast the pool's statement timeout
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SET statement_timeout = 0')
+                if index_type != 'none':
+                    _ensure_index(cur, INDEX_NAME, _index_ddl(index_type, settings.ollama_embed_dims))
+                _ensure_index(cur, FTS_INDEX_NAME, _fts_index_ddl())
+        finally:
+            if not conn.closed:
+                with conn.cursor() as cur:
+                    cur.execute('RESET statement_timeout')
+                conn.autocommit = False
+
+    await pool.run(_ensure)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.tools.embedding_client import EmbeddingClient
+from app.tools.llm_client import LlmClient
+
+logger = logging.getLogger(__name__)
+
+
+class BackendWarmer:
+    """Warms the LLM and embedding backends at startup and keeps Ollama resident.
+
+    ``start()`` runs the warm-up in the background so the app can accept
+    health checks immediately; ``ready`` turns true once every backend has
+    warmed up, which is what the /ready endpoint reports. Backends that fail
+    or time out are retried every ``retry_interval_seconds`` and the service
+    stays unready meanwhile. Afterwards a tiny embed is sent to every
+    endpoint each ``keep_alive_interval_seconds`` so Ollama does not unload
+    the model while traffic is quiet.
+    """
+
+    def __init__(
+        self,
+        llm_client: LlmClient,
+        embedding_client: Optional[EmbeddingClient],
+        timeout_seconds: float = 30.0,
+        keep_alive_interval_seconds: float = 240.0,
+        retry_interval_seconds: float = 10.0,
+    ) -> None:
+        self.llm_client = llm_client
+        self.embedding_client = embedding_client
+        self.timeout_seconds = timeout_seconds
+        self.keep_alive_interval_seconds = keep_alive_interval_seconds
+        self.retry_interval_seconds = retry_interval_seconds
+        self.ready = False
+        self.timings_ms: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _timed(self, name: str, coro) -> bool:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(coro, self.timeout_seconds)
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+            return True
+        except Exception as e:
+            logger.warning('Warm-up of %s failed: %s', name, e)
+            return False
+
+    async def _run(self) -> None:
+        pending = {'llm': self.llm_client.warm_up}
+        if self.embedding_client:
+            pending['embedding'] = self.embedding_client.warm_up
+        while True:
+            results = await asyncio.gather(*(self._timed(name, warm_up()) for name, warm_up in pending.items()))
+            pending = {name: warm_up for (name, warm_up), ok in zip(pending.items(), results) if not ok}
+            if not pending:
+                break
+            await asyncio.sleep(self.retry_interval_seconds)
+        self.ready = True
+        logger.info('Backends warm: %s', self.timings_ms)
+
+        if not self.embedding_client or self.keep_alive_interval_seconds <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.keep_alive_interval_seconds)
+            try:
+                await self.embedding_client.warm_up()
+            except Exception as e:
+                logger.warning('Ollama keep-alive failed: %s', e)
@@ -0,0 +1,130 @@
+"""Chat latency while PDFs are ingested: parsing in threads vs. the parse pool.
+
+Runs ``ingests`` concurrent DocumentProcessor.process calls on generated
+``pages``-page PDFs (fake MinIO, embedding and API clients, so parsing is
+the only real work) while a probe stands in for chat traffic: every 20 ms
+it handles a small "request" (JSON-encodes a reply after an await) and
+records how long that took end to end. Parsing in threads holds the GIL
+and the probe queues behind it; the process pool keeps it off.
+
+    python -m benchmarks.chat_latency [ingests] [pages]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.pipelines.document_processor import DocumentProcessor
+from app.pipelines.parse_pool import ParsePool
+
+
+class _FakeMinio:
+    def __init__(self, source: str) -> None:
+        self.source = source
+
+    def download_to_file(self, key: str, path: str) -> None:
+        shutil.copyfile(self.source, path)
+
+
+class _FakeEmbedding:
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(0.005)
+        return [[1.0, 0.0] for _ in texts]
+
+
+class _FakeApi:
+    async def get(self, path: str) -> Dict[str, Any]:
+        return {'chunks': []}
+
+    async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    async def patch(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+
+def _write_pdf(path: str, pages: int) -> None:
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', b'', b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for p in range(pages):
+        lines = [f'({p}.{i} the quarterly roadmap covers ENG-{i} and its rollout) Tj T*' for i in range(60)]
+        stream = '\n'.join(['BT', '/F1 9 Tf', '11 TL', '40 800 Td', *lines, 'ET']).encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+    out, offsets = bytearray(b'%PDF-1.4\n'), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+async def _probe(stop: asyncio.Event, latencies: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        json.dumps({'answer': 'ok', 'sources': list(range(50))})
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.02)
+
+
+async def _run(path: str, ingests: int, parse_pool: ParsePool | None) -> tuple[List[float], float]:
+    latencies: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, latencies))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        DocumentProcessor(_FakeMinio(path), _FakeEmbedding(), _FakeApi(), parse_pool=parse_pool).process(
+            f'doc-{i}', 'documents/bench.pdf', 'application/pdf', 'bench',
+        )
+        for i in range(ingests)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    return latencies, elapsed
+
+
+def _report(name: str, latencies: List[float], elapsed: float) -> None:
+    ms = sorted(l * 1000 for l in latencies)
+    print(
+        f'{name:>12}: ingest {elapsed:6.1f} s   chat latency p50 {statistics.median(ms):7.2f} ms   '
+        f'p99 {ms[int(len(ms) * 0.99) - 1]:7.2f} ms   max {ms[-1]:7.2f} ms'
+    )
+
+
+def main(ingests: int = 5, pages: int = 100) -> None:
+    directory = tempfile.mkdtemp(prefix='agentpm-bench-')
+    path = os.path.join(directory, 'bench.pdf')
+    _write_pdf(path, pages)
+    parse_pool = ParsePool()
+    print(f'{ingests} concurrent ingests of a {pages}-page PDF, {parse_pool.max_workers} parse workers')
+    try:
+        # Warm up: imports, and spawning the pool's workers
+        asyncio.run(_run(path, 1, parse_pool))
+        _report('threads', *asyncio.run(_run(path, ingests, None)))
+        _report('parse pool', *asyncio.run(_run(path, ingests, parse_pool)))
+    finally:
+        parse_pool.close()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
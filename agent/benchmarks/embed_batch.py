@@ -0,0 +1,100 @@
+"""embed_batch throughput against local fake Ollama embedding servers.
+
+Starts ``endpoints`` fake ``/api/embed`` servers on localhost. Each one
+processes a single request at a time, the way one Ollama model instance
+does, and takes ``overhead_ms`` plus ``per_text_ms`` per input text. Then
+it embeds ``texts`` chunks (about 10% duplicates) three ways:
+
+* ``sequential``  - fixed batches of 16, one request at a time, first
+                    endpoint only (the old behaviour);
+* ``fixed``       - fixed batches of 16, pipelined across every endpoint;
+* ``adaptive``    - the default: pipelined, adaptive batch size, dedup.
+
+    python -m benchmarks.embed_batch [texts] [endpoints] [overhead_ms] [per_text_ms]
+"""
+from __future__ import annotations
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from app.tools.embedding_client import EmbeddingClient
+
+DIMS = 8
+
+
+def _fake_ollama(overhead_ms: float, per_text_ms: float) -> FastAPI:
+    app = FastAPI()
+    # One model instance: requests queue up behind each other
+    busy = asyncio.Lock()
+
+    @app.post('/api/embed')
+    async def embed(request: Request) -> dict:
+        body = await request.json()
+        texts = body['input'] if isinstance(body['input'], list) else [body['input']]
+        async with busy:
+            await asyncio.sleep((overhead_ms + per_text_ms * len(texts)) / 1000)
+        return {'embeddings': [[float(len(t))] * DIMS for t in texts]}
+
+    return app
+
+
+def _start_server(app: FastAPI) -> tuple[str, uvicorn.Server]:
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level='warning', ws='none'))
+    threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f'http://127.0.0.1:{sock.getsockname()[1]}', server
+
+
+async def _embed(client: EmbeddingClient, texts: list[str], batch_size: int | None) -> float:
+    start = time.perf_counter()
+    vectors = await client.embed_batch(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+    return elapsed
+
+
+async def _run(texts: list[str], urls: list[str]) -> None:
+    runs = (
+        ('sequential', urls[:1], 1, 16),
+        ('fixed', urls, None, 16),
+        ('adaptive', urls, None, None),
+    )
+    for name, endpoints, max_inflight, batch_size in runs:
+        client = EmbeddingClient(endpoints=endpoints)
+        if max_inflight is not None:
+            client.max_inflight = max_inflight
+        try:
+            # Second pass: the adaptive size carries over, as it does between documents
+            await _embed(client, texts, batch_size)
+            elapsed = await _embed(client, texts, batch_size)
+        finally:
+            await client.close()
+        print(
+            f'{name:>10}: {elapsed:6.2f} s   {len(texts) / elapsed:7.0f} texts/s   '
+            f'batch size {batch_size or client._batch_size}'
+        )
+
+
+def main(texts: int = 2000, endpoints: int = 2, overhead_ms: float = 40.0, per_text_ms: float = 2.0) -> None:
+    servers = [_start_server(_fake_ollama(overhead_ms, per_text_ms)) for _ in range(endpoints)]
+    chunks = [f'chunk {i % int(texts * 0.9)} ' + 'lorem ipsum ' * (i % 50) for i in range(texts)]
+    print(f'{texts} texts, {endpoints} endpoints, {overhead_ms:.0f} ms + {per_text_ms:.1f} ms/text per request')
+    try:
+        asyncio.run(_run(chunks, [url for url, _ in servers]))
+    finally:
+        for _, server in servers:
+            server.should_exit = True
+
+
+if __name__ == '__main__':
+    args = [int(a) if i < 2 else float(a) for i, a in enumerate(sys.argv[1:5])]
+    main(*args)
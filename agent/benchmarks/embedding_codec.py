@@ -0,0 +1,58 @@
+"""Embedding wire formats: JSON float lists vs. base64 float32 vs. ``::vector`` literals.
+
+Encodes and decodes ``chunks`` random ``dims``-dimensional embeddings the
+three ways they travel through the service:
+
+* ``json``      - a list of Python floats in a JSON body (the old upload format);
+* ``base64``    - ``encode_b64``/``decode_b64``, float32 little-endian;
+* ``literal``   - ``to_vector_literal``, the ``.9g`` text handed to ``::vector``.
+
+Reports encode/decode time and the payload size for the whole batch.
+
+    python -m benchmarks.embedding_codec [chunks] [dims]
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.tools.embedding_codec import decode_b64, encode_b64, to_vector_literal
+
+
+def _parse_literal(text: str) -> np.ndarray:
+    return np.array(text[1:-1].split(','), dtype=np.float32)
+
+
+def _time(fn: Callable[[], List]) -> tuple[float, List]:
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main(chunks: int = 1000, dims: int = 768) -> None:
+    rng = np.random.default_rng(0)
+    vectors = [v.tolist() for v in rng.standard_normal((chunks, dims))]
+    formats = (
+        ('json', lambda v: json.dumps(v), lambda s: json.loads(s)),
+        ('base64', encode_b64, decode_b64),
+        ('literal', to_vector_literal, _parse_literal),
+    )
+    print(f'{chunks} embeddings x {dims} dims')
+    for name, encode, decode in formats:
+        encode_s, encoded = _time(lambda: [encode(v) for v in vectors])
+        decode_s, decoded = _time(lambda: [decode(s) for s in encoded])
+        size = sum(len(s) for s in encoded)
+        error = max(float(np.max(np.abs(np.asarray(d, dtype=np.float64) - v))) for d, v in zip(decoded, vectors))
+        print(
+            f'{name:>8}: encode {encode_s * 1000:8.1f} ms   decode {decode_s * 1000:8.1f} ms   '
+            f'{size / 1e6:7.2f} MB ({size / (chunks * dims):5.1f} B/dim)   max error {error:.1e}'
+        )
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
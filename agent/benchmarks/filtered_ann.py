@@ -0,0 +1,145 @@
+"""Filtered ANN retrieval: small projects behind a global HNSW index.
+
+Seeds a scratch schema with one large project and one small project, then
+runs top-k retrievals for each through DocRetriever three ways:
+
+* ``exact``       - no ANN index (sequential scan); also the ground truth;
+* ``hnsw``        - ANN index, project filter applied after the index scan
+                    (no iterative scan, no fallback: the old behaviour);
+* ``hnsw+exact``  - ANN index with the current behaviour: iterative scans on
+                    pgvector >= 0.8, otherwise an exact rescan of short pages.
+
+Reports mean rows returned, recall@k against ``exact`` and latency.
+
+    python -m benchmarks.filtered_ann [big_project_chunks] [small_project_chunks] [queries] [k]
+
+Needs Postgres with pgvector (PG_* settings). The defaults (100k chunks)
+take a few minutes to seed and index; pass 1000000 for the 1M case.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from unittest.mock import AsyncMock
+
+from app.config import get_settings
+from app.tools.doc_retriever import DocRetriever
+from app.tools.pg_pool import PgPool
+from app.tools.vector_index import ensure_retrieval_indexes
+
+SCHEMA = 'bench_filtered_ann'
+DIMS = get_settings().ollama_embed_dims
+
+_TABLES = """
+CREATE TABLE document (
+    id varchar PRIMARY KEY, "projectId" varchar NOT NULL, title varchar NOT NULL DEFAULT '',
+    "mimeType" varchar NOT NULL DEFAULT 'text/plain', metadata jsonb,
+    "createdAt" timestamp NOT NULL DEFAULT now(), "updatedAt" timestamp NOT NULL DEFAULT now()
+);
+CREATE TABLE document_chunk (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(), "documentId" varchar NOT NULL, "chunkIndex" int NOT NULL,
+    content text NOT NULL, embedding double precision[], "tokenCount" int NOT NULL DEFAULT 0,
+    metadata jsonb, pending boolean NOT NULL DEFAULT false, "createdAt" timestamp NOT NULL DEFAULT now()
+);
+CREATE INDEX ON document_chunk ("documentId", "chunkIndex");
+"""
+
+
+def _pool() -> PgPool:
+    pool = PgPool(min_size=1, max_size=4)
+    pool._conn_params = {**pool._conn_params, 'options': f'-c statement_timeout=0 -c search_path={SCHEMA},public'}
+    return pool
+
+
+def _setup(pool: PgPool, big: int, small: int) -> None:
+    def _create(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+            cur.execute(f'CREATE SCHEMA {SCHEMA}')
+            cur.execute(_TABLES)
+            for project_id, chunks in (('big', big), ('small', small)):
+                cur.execute('INSERT INTO document (id, "projectId") VALUES (%s, %s)', (project_id, project_id))
+                cur.execute(
+                    'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding, "tokenCount") '
+                    'SELECT %s, g, %s, ARRAY(SELECT random() FROM generate_series(1, %s) WHERE g >= 0), 10 '
+                    'FROM generate_series(0, %s - 1) g',
+                    (project_id, f'{project_id} chunk', DIMS, chunks),
+                )
+            cur.execute('ANALYZE document; ANALYZE document_chunk')
+
+    pool._call(_create)
+
+
+def _teardown(pool: PgPool) -> None:
+    pool._call(lambda conn: conn.cursor().execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+
+
+async def _measure(retriever: DocRetriever, queries: list, project_id: str, k: int) -> tuple[list, list[float]]:
+    results, latencies = [], []
+    for vector in queries:
+        retriever.embedding_client.embed.return_value = vector
+        start = time.perf_counter()
+        rows = await retriever.retrieve('q', project_id, top_k=k, score_threshold=-1.0, hybrid=False)
+        latencies.append(time.perf_counter() - start)
+        results.append([r['id'] for r in rows])
+    return results, latencies
+
+
+def _report(name: str, results: list, truth: list, latencies: list[float], k: int) -> None:
+    rows = statistics.mean(len(r) for r in results)
+    recall = statistics.mean(len(set(r) & set(t)) / max(len(t), 1) for r, t in zip(results, truth))
+    ms = sorted(l * 1000 for l in latencies)
+    print(
+        f'  {name:>11}: rows {rows:5.1f}/{k}   recall@{k} {recall:5.2f}   '
+        f'latency mean {statistics.mean(ms):7.1f} ms   p95 {ms[int(len(ms) * 0.95) - 1]:7.1f} ms'
+    )
+
+
+async def _run(big: int, small: int, queries: int, k: int) -> None:
+    pool = _pool()
+    try:
+        start = time.perf_counter()
+        await asyncio.to_thread(_setup, pool, big, small)
+        print(f'seeded {big} + {small} chunks in {time.perf_counter() - start:.0f}s')
+
+        retriever = DocRetriever(AsyncMock(), pool)
+        vectors = [[random.random() for _ in range(DIMS)] for _ in range(queries)]
+        truth = {}
+        runs = {}
+        retriever.index_type = 'none'
+        for project_id in ('small', 'big'):
+            truth[project_id] = await _measure(retriever, vectors, project_id, k)
+
+        start = time.perf_counter()
+        await ensure_retrieval_indexes(pool)
+        await pool.run(lambda conn: conn.cursor().execute('ANALYZE document_chunk'))
+        print(f'built indexes in {time.perf_counter() - start:.0f}s')
+
+        for name, index_type in (('hnsw', 'none'), ('hnsw+exact', 'hnsw')):
+            # index_type only drives the search knobs and the fallback; the index exists either way
+            retriever.index_type = index_type
+            for project_id in ('small', 'big'):
+                runs[name, project_id] = await _measure(retriever, vectors, project_id, k)
+
+        for project_id, chunks in (('small', small), ('big', big)):
+            print(f'{project_id} project ({chunks} chunks):')
+            truth_ids, truth_latencies = truth[project_id]
+            _report('exact', truth_ids, truth_ids, truth_latencies, k)
+            for name in ('hnsw', 'hnsw+exact'):
+                _report(name, *runs[name, project_id][:1], truth_ids, runs[name, project_id][1], k)
+        print(f'exact rescans: {retriever.metrics["exactScanFallbacks"]}')
+    finally:
+        await asyncio.to_thread(_teardown, pool)
+        pool.close()
+
+
+def main(big: int = 100_000, small: int = 50, queries: int = 50, k: int = 5) -> None:
+    asyncio.run(_run(big, small, queries, k))
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:5]]
+    main(*args)
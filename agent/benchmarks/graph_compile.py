@@ -0,0 +1,39 @@
+"""Per-run cost of building the agent graph vs. reusing the compiled registry.
+
+    python -m benchmarks.graph_compile [runs]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from app.graph import GraphRegistry, GraphServices, build_graph
+from app.graph.builder import GRAPH_VARIANTS
+from app.observability import RunEventBus
+
+
+def main(runs: int = 200) -> None:
+    services = GraphServices(
+        app_api_client=AsyncMock(),
+        event_bus=RunEventBus(),
+        llm_client=MagicMock(model='bench'),
+    )
+    registry = GraphRegistry(services)
+
+    for variant in GRAPH_VARIANTS:
+        start = time.perf_counter()
+        for _ in range(runs):
+            build_graph(services, variant)
+        per_build = (time.perf_counter() - start) / runs * 1000
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            registry.get(variant)
+        per_lookup = (time.perf_counter() - start) / runs * 1000
+
+        print(f'{variant:>5}: build_graph {per_build:8.3f} ms/run   registry.get {per_lookup:8.5f} ms/run')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,106 @@
+"""Lexical-branch recall@k: websearch_to_tsquery (AND of every word) vs. OR of significant terms.
+
+Loads a small fixture corpus of project-notes chunks into a scratch schema
+and runs natural-language questions through the full-text branch of hybrid
+retrieval only, with the same 'simple' config and GIN expression the
+retriever uses. Each question has the chunk ids that should answer it.
+
+    python -m benchmarks.lexical_recall [k]
+
+Needs Postgres (PG_* settings).
+"""
+from __future__ import annotations
+
+import statistics
+import sys
+
+import psycopg2
+
+from app.config import get_settings
+from app.tools.vector_index import FTS_CONFIG, lexical_tsquery
+
+SCHEMA = 'bench_lexical_recall'
+
+CORPUS = [
+    'ENG-123: OAuth token refresh fails after the v2.1 upgrade; users are logged out hourly.',
+    'ENG-140 tracks rate limiting on the public API gateway (429 responses under load).',
+    'Decision: move billing webhooks to the Stripe v2 events API before the March release.',
+    'The mobile app crashes on Android 14 when the camera permission is revoked (ENG-151).',
+    'Postgres connection pool exhaustion caused the 2024-05-02 outage; PgBouncer is now in front.',
+    'Design review: the onboarding checklist replaces the welcome modal for new workspaces.',
+    'Blocked: SSO with Okta needs the SAML metadata URL from the customer IT team.',
+    'Q3 roadmap: offline mode for the desktop client, then shared dashboards.',
+    'Search latency regressed after enabling hybrid retrieval; HNSW ef_search was lowered to 40.',
+    'Action item: Priya to add retries with jitter to the S3 upload worker (ENG-162).',
+    'Customer feedback: CSV export truncates rows beyond 10,000 in the reports page.',
+    'The staging cluster runs Kubernetes 1.29; production upgrade is scheduled after the freeze.',
+    'Meeting notes: the team agreed to deprecate the v1 REST endpoints by end of year.',
+    'Dark mode contrast issues in the settings page were fixed in release 3.4.2.',
+    'Incident follow-up: alert on Redis memory above 80% and evict idle run streams.',
+    'Sprint retro: too many meetings; standups move to async updates in Slack.',
+]
+
+# (question, relevant chunk indexes)
+QUESTIONS = [
+    ('What is the status of ENG-123?', {0}),
+    ('Why are users getting logged out after the OAuth upgrade?', {0}),
+    ('What did we decide about Stripe webhooks?', {2}),
+    ('Is there a ticket for the Android camera crash?', {3}),
+    ('What caused the outage on 2024-05-02?', {4}),
+    ('Who is blocked on Okta SSO?', {6}),
+    ('What is planned on the Q3 roadmap?', {7}),
+    ('Why did search latency regress with hybrid retrieval?', {8}),
+    ('Who owns the S3 upload retries?', {9}),
+    ('Does the CSV export have a row limit?', {10}),
+    ('Which Kubernetes version does staging run?', {11}),
+    ('When are the v1 REST endpoints deprecated?', {12}),
+    ('Which release fixed dark mode in settings?', {13}),
+    ('What are the follow-ups from the Redis incident?', {14}),
+    ('What came out of the sprint retro about standups?', {15}),
+    ('Which tickets mention rate limiting on the API gateway?', {1}),
+]
+
+_SEARCH_SQL = f"""
+    SELECT id FROM chunk, {{query}} q
+    WHERE to_tsvector('{FTS_CONFIG}', content) @@ q
+    ORDER BY ts_rank_cd(to_tsvector('{FTS_CONFIG}', content), q) DESC, id
+    LIMIT %s
+"""
+
+STRATEGIES = {
+    'websearch (AND)': (f"websearch_to_tsquery('{FTS_CONFIG}', %s)", lambda question: question),
+    'significant (OR)': (f"to_tsquery('{FTS_CONFIG}', NULLIF(%s, ''))", lexical_tsquery),
+}
+
+
+def main(k: int = 5) -> None:
+    s = get_settings()
+    conn = psycopg2.connect(host=s.pg_host, port=s.pg_port, user=s.pg_user, password=s.pg_password, dbname=s.pg_db)
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}; SET search_path = {SCHEMA}')
+        cur.execute('CREATE TABLE chunk (id int PRIMARY KEY, content text NOT NULL)')
+        cur.executemany('INSERT INTO chunk VALUES (%s, %s)', list(enumerate(CORPUS)))
+        cur.execute(f"CREATE INDEX ON chunk USING gin (to_tsvector('{FTS_CONFIG}', content))")
+
+        print(f'{len(QUESTIONS)} questions over {len(CORPUS)} chunks, lexical branch only')
+        for name, (query_sql, to_param) in STRATEGIES.items():
+            recalls, hits = [], []
+            for question, relevant in QUESTIONS:
+                cur.execute(_SEARCH_SQL.format(query=query_sql), (to_param(question), k))
+                found = {row[0] for row in cur.fetchall()}
+                recalls.append(len(found & relevant) / len(relevant))
+                hits.append(bool(found))
+            print(
+                f'{name:>17}: recall@{k} {statistics.mean(recalls):4.2f}   '
+                f'questions with any match {sum(hits)}/{len(QUESTIONS)}'
+            )
+    finally:
+        cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+        conn.close()
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
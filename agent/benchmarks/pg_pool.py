@@ -0,0 +1,156 @@
+"""Retrieval QPS at 50 concurrent queries: connect-per-query vs. PgPool.
+
+Each "retrieval" is a prepared top-k vector query over a scratch table of
+chunks on the configured Postgres (PG_* settings). Three strategies run the
+same queries with ``concurrency`` in flight:
+
+* ``connect``  - a fresh connection per query (no pool), as before PgPool;
+* ``threaded`` - psycopg2's ThreadedConnectionPool(min, max), which closes
+  everything above ``min`` idle connections on return;
+* ``pgpool``   - PgPool, which keeps up to ``max_size`` connections open.
+
+    python -m benchmarks.pg_pool [queries] [concurrency] [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.pool
+
+from app.config import get_settings
+from app.tools.pg_pool import PgPool, PreparedStatement
+
+TABLE = 'bench_pg_pool_chunk'
+DIMS = 768
+
+_TOP_K_SQL = (
+    f'SELECT id FROM {TABLE} WHERE project_id = {{project}} '
+    f'ORDER BY embedding::vector({DIMS}) <=> {{vector}}::vector LIMIT 5'
+)
+_TOP_K = PreparedStatement('bench_top_k', _TOP_K_SQL.format(project='$1', vector='$2'), 2)
+
+
+def _params() -> dict:
+    s = get_settings()
+    return {'host': s.pg_host, 'port': s.pg_port, 'user': s.pg_user, 'password': s.pg_password, 'dbname': s.pg_db}
+
+
+def _setup(rows: int) -> None:
+    conn = psycopg2.connect(**_params())
+    with conn, conn.cursor() as cur:
+        cur.execute(f'DROP TABLE IF EXISTS {TABLE}')
+        cur.execute(f'CREATE TABLE {TABLE} (id serial PRIMARY KEY, project_id int, embedding float4[])')
+        cur.execute(
+            f'INSERT INTO {TABLE} (project_id, embedding) '
+            f'SELECT mod(g, 20), ARRAY(SELECT random() FROM generate_series(1, {DIMS}) WHERE g > 0) '
+            f'FROM generate_series(1, %s) g',
+            (rows,),
+        )
+        cur.execute(f'ANALYZE {TABLE}')
+    conn.close()
+
+
+def _teardown() -> None:
+    conn = psycopg2.connect(**_params())
+    with conn, conn.cursor() as cur:
+        cur.execute(f'DROP TABLE IF EXISTS {TABLE}')
+    conn.close()
+
+
+def _query_args() -> tuple:
+    vector = '[' + ','.join(f'{random.random():.4f}' for _ in range(DIMS)) + ']'
+    return random.randrange(20), vector
+
+
+def _top_k(conn, args: tuple) -> list:
+    with conn.cursor() as cur:
+        cur.execute(_TOP_K_SQL.format(project='%s', vector='%s'), args)
+        return cur.fetchall()
+
+
+async def _run_connect(queries: int, concurrency: int, max_size: int) -> list[float]:
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def one(args: tuple) -> list:
+        conn = psycopg2.connect(**_params())
+        try:
+            return _top_k(conn, args)
+        finally:
+            conn.close()
+
+    try:
+        return await _drive(queries, concurrency, lambda args: asyncio.get_running_loop().run_in_executor(executor, one, args))
+    finally:
+        executor.shutdown()
+
+
+async def _run_threaded(queries: int, concurrency: int, max_size: int) -> list[float]:
+    pool = psycopg2.pool.ThreadedConnectionPool(2, max_size, **_params())
+    executor = ThreadPoolExecutor(max_workers=max_size)
+
+    def one(args: tuple) -> list:
+        conn = pool.getconn()
+        try:
+            rows = _top_k(conn, args)
+            conn.commit()
+            return rows
+        finally:
+            pool.putconn(conn)
+
+    try:
+        return await _drive(queries, concurrency, lambda args: asyncio.get_running_loop().run_in_executor(executor, one, args))
+    finally:
+        executor.shutdown()
+        pool.closeall()
+
+
+async def _run_pgpool(queries: int, concurrency: int, max_size: int) -> list[float]:
+    pool = PgPool(min_size=2, max_size=max_size)
+    try:
+        return await _drive(queries, concurrency, lambda args: pool.fetch(_TOP_K, args))
+    finally:
+        pool.close()
+
+
+async def _drive(queries: int, concurrency: int, call) -> list[float]:
+    latencies: list[float] = []
+    remaining = iter(range(queries))
+
+    async def worker() -> None:
+        for _ in remaining:
+            args = _query_args()
+            start = time.perf_counter()
+            await call(args)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def main(queries: int = 2000, concurrency: int = 50, rows: int = 2000) -> None:
+    max_size = get_settings().pg_pool_max_size
+    print(f'{queries} retrievals, {concurrency} in flight, {rows} chunks, pool max {max_size}')
+    _setup(rows)
+    try:
+        for name, runner in (('connect', _run_connect), ('threaded', _run_threaded), ('pgpool', _run_pgpool)):
+            start = time.perf_counter()
+            latencies = asyncio.run(runner(queries, concurrency, max_size))
+            elapsed = time.perf_counter() - start
+            ms = sorted(l * 1000 for l in latencies)
+            print(
+                f'{name:>9}: {queries / elapsed:8.1f} QPS   latency mean {statistics.mean(ms):7.1f} ms'
+                f'   p99 {ms[int(len(ms) * 0.99) - 1]:7.1f} ms'
+            )
+    finally:
+        _teardown()
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,84 @@
+"""Tool-budget contention: one process-wide asyncio.Lock vs. per-run ToolBudget.
+
+Simulates many concurrent runs whose parallel branches each make tool calls
+(budget check, then a short awaited "tool" call). With the global lock, the
+check of every run queues behind whichever run holds it.
+
+    python -m benchmarks.tool_budget [runs] [branches] [calls]
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+from app.graph.budget import ToolBudget
+
+TOOL_LATENCY_SECONDS = 0.001
+
+
+async def _global_lock_acquire(lock: asyncio.Lock, state: dict, max_calls: int) -> bool:
+    # The pre-ToolBudget implementation: check-and-increment under a shared lock
+    async with lock:
+        if state['toolCallCount'] >= max_calls:
+            return False
+        # Any await under the lock (logging, tracing, a slow hook) serializes every run
+        await asyncio.sleep(0)
+        state['toolCallCount'] += 1
+        return True
+
+
+async def _run_global(runs: int, branches: int, calls: int) -> list[float]:
+    lock = asyncio.Lock()
+    waits: list[float] = []
+
+    async def branch(state: dict) -> None:
+        for _ in range(calls):
+            start = time.perf_counter()
+            allowed = await _global_lock_acquire(lock, state, branches * calls)
+            waits.append(time.perf_counter() - start)
+            if allowed:
+                await asyncio.sleep(TOOL_LATENCY_SECONDS)
+
+    states = [{'toolCallCount': 0} for _ in range(runs)]
+    await asyncio.gather(*(branch(s) for s in states for _ in range(branches)))
+    return waits
+
+
+async def _run_per_run(runs: int, branches: int, calls: int) -> list[float]:
+    waits: list[float] = []
+
+    async def branch(budget: ToolBudget) -> None:
+        for _ in range(calls):
+            start = time.perf_counter()
+            allowed = budget.try_acquire()
+            waits.append(time.perf_counter() - start)
+            if allowed:
+                await asyncio.sleep(TOOL_LATENCY_SECONDS)
+
+    budgets = [ToolBudget(max_calls=branches * calls) for _ in range(runs)]
+    await asyncio.gather(*(branch(b) for b in budgets for _ in range(branches)))
+    return waits
+
+
+def _report(name: str, waits: list[float], elapsed: float) -> None:
+    waits_us = sorted(w * 1e6 for w in waits)
+    p99 = waits_us[int(len(waits_us) * 0.99) - 1]
+    print(
+        f'{name:>10}: total {elapsed * 1000:8.1f} ms   budget wait mean {statistics.mean(waits_us):9.1f} us'
+        f'   p99 {p99:9.1f} us'
+    )
+
+
+def main(runs: int = 500, branches: int = 3, calls: int = 5) -> None:
+    print(f'{runs} concurrent runs x {branches} branches x {calls} tool calls')
+    for name, runner in (('global', _run_global), ('per-run', _run_per_run)):
+        start = time.perf_counter()
+        waits = asyncio.run(runner(runs, branches, calls))
+        _report(name, waits, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
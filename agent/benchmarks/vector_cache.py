@@ -0,0 +1,154 @@
+"""Project vector cache: Postgres retrieval vs. the in-process index.
+
+Seeds a scratch schema with one project, then runs top-k dense retrievals
+through DocRetriever with and without a ProjectVectorCache, reports the
+cost of the per-project version check that bounds staleness, and how long
+a document deleted by "another worker" keeps being served.
+
+    python -m benchmarks.vector_cache [chunks] [documents] [queries] [k] [revalidate_seconds]
+
+Needs Postgres with pgvector (PG_* settings).
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from unittest.mock import AsyncMock
+
+from app.config import get_settings
+from app.tools.doc_retriever import DocRetriever
+from app.tools.pg_pool import PgPool
+from app.tools.vector_cache import ProjectVectorCache
+from app.tools.vector_index import ensure_retrieval_indexes
+
+SCHEMA = 'bench_vector_cache'
+PROJECT = 'bench'
+DIMS = get_settings().ollama_embed_dims
+
+_TABLES = """
+CREATE TABLE document (
+    id varchar PRIMARY KEY, "projectId" varchar NOT NULL, title varchar NOT NULL DEFAULT '',
+    "mimeType" varchar NOT NULL DEFAULT 'text/plain', metadata jsonb,
+    "createdAt" timestamp NOT NULL DEFAULT now(), "updatedAt" timestamp NOT NULL DEFAULT now()
+);
+CREATE TABLE document_chunk (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    "documentId" varchar NOT NULL REFERENCES document (id) ON DELETE CASCADE, "chunkIndex" int NOT NULL,
+    content text NOT NULL, embedding double precision[], "tokenCount" int NOT NULL DEFAULT 0,
+    metadata jsonb, pending boolean NOT NULL DEFAULT false, "createdAt" timestamp NOT NULL DEFAULT now()
+);
+CREATE INDEX ON document_chunk ("documentId", "chunkIndex");
+"""
+
+
+def _pool() -> PgPool:
+    pool = PgPool(min_size=1, max_size=4)
+    pool._conn_params = {**pool._conn_params, 'options': f'-c statement_timeout=0 -c search_path={SCHEMA},public'}
+    return pool
+
+
+def _setup(pool: PgPool, chunks: int, documents: int) -> None:
+    def _create(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+            cur.execute(f'CREATE SCHEMA {SCHEMA}')
+            cur.execute(_TABLES)
+            for d in range(documents):
+                document_id = f'doc-{d}'
+                cur.execute('INSERT INTO document (id, "projectId") VALUES (%s, %s)', (document_id, PROJECT))
+                cur.execute(
+                    'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding, "tokenCount") '
+                    'SELECT %s, g, %s, ARRAY(SELECT random() FROM generate_series(1, %s) WHERE g >= 0), 10 '
+                    'FROM generate_series(0, %s - 1) g',
+                    (document_id, f'{document_id} chunk', DIMS, chunks // documents),
+                )
+            cur.execute('ANALYZE document; ANALYZE document_chunk')
+
+    pool._call(_create)
+
+
+def _teardown(pool: PgPool) -> None:
+    pool._call(lambda conn: conn.cursor().execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+
+
+async def _measure(retriever: DocRetriever, queries: list, k: int) -> list[float]:
+    latencies = []
+    for vector in queries:
+        retriever.embedding_client.embed.return_value = vector
+        start = time.perf_counter()
+        await retriever.retrieve('q', PROJECT, top_k=k, score_threshold=-1.0, hybrid=False)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(name: str, latencies: list[float]) -> None:
+    ms = sorted(l * 1000 for l in latencies)
+    print(f'  {name:>14}: mean {statistics.mean(ms):8.2f} ms   p95 {ms[int(len(ms) * 0.95) - 1]:8.2f} ms')
+
+
+async def _run(chunks: int, documents: int, queries: int, k: int, revalidate_seconds: float) -> None:
+    pool = _pool()
+    try:
+        await asyncio.to_thread(_setup, pool, chunks, documents)
+        await ensure_retrieval_indexes(pool)
+        vectors = [[random.random() for _ in range(DIMS)] for _ in range(queries)]
+        print(f'{chunks} chunks in {documents} documents, top-{k}')
+
+        postgres = DocRetriever(AsyncMock(), pool)
+        _report('postgres', await _measure(postgres, vectors, k))
+
+        cache = ProjectVectorCache(pool, min_hits=1, revalidate_seconds=revalidate_seconds)
+        cached = DocRetriever(AsyncMock(), pool, cache)
+        cache.search(PROJECT, vectors[0], k, -1.0)
+        while cache._loading:
+            await asyncio.gather(*cache._loading.values())
+        _report('cached', await _measure(cached, vectors, k))
+
+        checks = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            await cache._fetch_version(PROJECT)
+            checks.append(time.perf_counter() - start)
+        _report('version check', checks)
+
+        # Another worker deletes a document: how long the cache keeps serving it
+        # (a None result means the query went to Postgres, which no longer has it)
+        await asyncio.sleep(revalidate_seconds)
+        cache.search(PROJECT, vectors[0], k, -1.0)
+        while cache._loading:
+            await asyncio.gather(*cache._loading.values())
+        await pool.run(lambda conn: conn.cursor().execute("DELETE FROM document WHERE id = 'doc-0'"))
+        start = time.perf_counter()
+        while True:
+            rows = cache.search(PROJECT, vectors[0], chunks, -1.0)
+            if rows is None or all(r['documentId'] != 'doc-0' for r in rows):
+                break
+            await asyncio.sleep(0.01)
+        served = time.perf_counter() - start
+        while cache._loading:
+            await asyncio.gather(*cache._loading.values())
+        print(
+            f'  deleted document served for {served:.2f}s (bound {revalidate_seconds:.1f}s), '
+            f'project reloaded after {time.perf_counter() - start:.2f}s; cache {cache.stats}'
+        )
+    finally:
+        await asyncio.to_thread(_teardown, pool)
+        pool.close()
+
+
+def main(
+    chunks: int = 20_000,
+    documents: int = 20,
+    queries: int = 200,
+    k: int = 5,
+    revalidate_seconds: float = 1.0,
+) -> None:
+    asyncio.run(_run(chunks, documents, queries, k, revalidate_seconds))
+
+
+if __name__ == '__main__':
+    args = [float(a) if i == 4 else int(a) for i, a in enumerate(sys.argv[1:6])]
+    main(*args)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+import psycopg2
+from fastapi import FastAPI, Response
 
 from app.api import run_router, stream_router, documents_router, knowledge_router, roadmap_router, meetings_router, standups_router, intelligence_router
 from app.config import get_settings
-from app.graph import GraphServices
-from app.observability import RunEventBus
-from app.schemas import HealthResponse
-from app.tools import AppApiClient, LlmClient, MemoryClient, EmbeddingClient, DocRetriever, MinioClient
+from app.graph import GraphRegistry, GraphServices
+from app.pipelines.parse_pool import ParsePool
+from app.observability import EventLoopLagMonitor, RunTelemetryWriter, create_event_bus
+from app.schemas import HealthResponse, ReadyResponse
+from app.tools import AppApiClient, BackendWarmer, LlmClient, MemoryClient, MemoryWriteQueue, EmbeddingCache, EmbeddingClient, DocRetriever, MinioClient, PgPool, ProjectVectorCache, ensure_retrieval_indexes
 from app.tools.tavily_client import TavilyClient
 from app.tools.integration_client import IntegrationClient
 
@@ -17,6 +20,13 @@ from app.tools.integration_client import IntegrationClient
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
+    loop_lag_monitor = EventLoopLagMonitor(
+        interval_seconds=settings.loop_lag_interval_seconds,
+        warn_threshold_ms=settings.loop_lag_warn_threshold_ms,
+    )
+    loop_lag_monitor.start()
+    app.state.loop_lag_monitor = loop_lag_monitor
+
     app_api_client = AppApiClient(
         base_url=settings.app_api_base_url,
         timeout_seconds=settings.app_api_timeout_seconds,
@@ -25,7 +35,14 @@ async def lifespan(app: FastAPI):
         api_key=settings.groq_api_key,
         model=settings.groq_model,
     )
-    event_bus = RunEventBus()
+    event_bus = create_event_bus()
+    telemetry = RunTelemetryWriter(
+        api_client=app_api_client,
+        max_batch_size=settings.telemetry_batch_size,
+        flush_interval_seconds=settings.telemetry_flush_interval_seconds,
+        max_pending=settings.telemetry_max_pending,
+    )
+    telemetry.start()
 
     # Initialize mem0 client (optional - graceful degradation if unavailable)
     memory_client = None
@@ -34,6 +51,25 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[WARN] Mem0 client unavailable, semantic memory disabled: {e}")
 
+    # Memory writes are consolidated in the background, off the answer path
+    memory_queue = None
+    if memory_client:
+        try:
+            memory_queue = MemoryWriteQueue(
+                memory_client,
+                path=settings.memory_queue_path,
+                num_workers=settings.memory_queue_workers,
+                max_batch_turns=settings.memory_queue_batch_turns,
+                batch_window_seconds=settings.memory_queue_batch_window_seconds,
+                max_attempts=settings.memory_queue_max_attempts,
+                retry_base_seconds=settings.memory_queue_retry_base_seconds,
+                retry_max_seconds=settings.memory_queue_retry_max_seconds,
+                claim_ttl_seconds=settings.memory_queue_claim_ttl_seconds,
+            )
+            memory_queue.start()
+        except Exception as e:
+            print(f"[WARN] Memory write queue unavailable, memories will not be stored: {e}")
+
     # Initialize Tavily client (optional - web search disabled if unavailable)
     tavily_client = None
     if settings.tavily_api_key:
@@ -43,10 +79,34 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             print(f"[WARN] Tavily client unavailable: {e}")
 
+    # Initialize Postgres pool (shared by the agent's own pgvector queries).
+    # Connections are opened lazily, so Postgres being down now only fails
+    # the queries made while it is down.
+    pg_pool = None
+    try:
+        pg_pool = PgPool()
+        await asyncio.to_thread(pg_pool.warm)
+        print("[INFO] Postgres pool initialized")
+    except Exception as e:
+        print(f"[WARN] Postgres unreachable, will connect on first use: {e}")
+
+    # Embedding cache (optional - shared by every pipeline through the client)
+    embedding_cache = None
+    if pg_pool and settings.embedding_cache_enabled:
+        try:
+            embedding_cache = EmbeddingCache(pg_pool)
+            if await embedding_cache.ready():
+                print("[INFO] Embedding cache initialized")
+            else:
+                print("[WARN] Embedding cache table unavailable, will retry on use")
+        except Exception as e:
+            embedding_cache = None
+            print(f"[WARN] Embedding cache unavailable: {e}")
+
     # Initialize embedding client (optional - RAG disabled if unavailable)
     embedding_client = None
     try:
-        embedding_client = EmbeddingClient()
+        embedding_client = EmbeddingClient(cache=embedding_cache)
         print("[INFO] Embedding client initialized (Ollama)")
     except Exception as e:
         print(f"[WARN] Embedding client unavailable, RAG disabled: {e}")
@@ -59,41 +119,116 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[WARN] MinIO client unavailable, document processing disabled: {e}")
 
-    # Initialize doc retriever (requires embedding client)
+    # Process pool for CPU-bound document parsing (optional - falls back to threads)
+    parse_pool = None
+    try:
+        parse_pool = ParsePool()
+        print("[INFO] Document parse pool initialized")
+    except Exception as e:
+        print(f"[WARN] Document parse pool unavailable, parsing in threads: {e}")
+
+    # In-process vector index for hot projects (optional)
+    vector_cache = None
+    if pg_pool and settings.rag_cache_enabled:
+        try:
+            vector_cache = ProjectVectorCache(pg_pool)
+            print("[INFO] Project vector cache enabled")
+        except Exception as e:
+            print(f"[WARN] Project vector cache unavailable: {e}")
+
+    # Initialize doc retriever (requires embedding client and Postgres pool)
     doc_retriever = None
-    if embedding_client:
+    if embedding_client and pg_pool:
         try:
-            doc_retriever = DocRetriever(embedding_client)
+            doc_retriever = DocRetriever(embedding_client, pg_pool, vector_cache)
             print("[INFO] Doc retriever initialized")
         except Exception as e:
             print(f"[WARN] Doc retriever unavailable: {e}")
 
+    # Build the ANN and full-text indexes in the background; retrieval scans until they exist
+    retrieval_index_task = None
+    if pg_pool:
+        async def _build_retrieval_indexes() -> None:
+            # Keep retrying while Postgres is unreachable; other failures are final
+            while True:
+                try:
+                    await ensure_retrieval_indexes(pg_pool)
+                    return
+                except psycopg2.OperationalError as e:
+                    print(f"[WARN] Retrieval indexes not built yet, retrying in 30s: {e}")
+                    await asyncio.sleep(30)
+                except Exception as e:
+                    print(f"[WARN] Retrieval indexes unavailable, retrieval will scan: {e}")
+                    return
+
+        retrieval_index_task = asyncio.create_task(_build_retrieval_indexes())
+
     # Initialize integration client (always available since it just wraps the API client)
     integration_client = IntegrationClient(api_client=app_api_client)
     print("[INFO] Integration client initialized")
 
-    app.state.graph_services = GraphServices(
+    graph_services = GraphServices(
         app_api_client=app_api_client,
         event_bus=event_bus,
         llm_client=llm_client,
         memory_client=memory_client,
+        memory_queue=memory_queue,
         tavily_client=tavily_client,
         embedding_client=embedding_client,
         doc_retriever=doc_retriever,
         integration_client=integration_client,
+        telemetry=telemetry,
     )
+    app.state.graph_services = graph_services
+
+    # Pay model-load and connection setup before the first user does (optional)
+    warmer = None
+    if settings.warmup_enabled:
+        warmer = BackendWarmer(
+            llm_client,
+            embedding_client,
+            timeout_seconds=settings.warmup_timeout_seconds,
+            keep_alive_interval_seconds=settings.ollama_keep_alive_interval_seconds,
+            retry_interval_seconds=settings.warmup_retry_interval_seconds,
+        )
+        warmer.start()
+    app.state.warmer = warmer
+    # Compile every graph variant once; runs share the compiled instances
+    app.state.graph_registry = GraphRegistry(graph_services)
     app.state.event_bus = event_bus
     app.state.embedding_client = embedding_client
+    app.state.embedding_cache = embedding_cache
+    app.state.telemetry = telemetry
     app.state.minio_client = minio_client
+    app.state.vector_cache = vector_cache
+    app.state.parse_pool = parse_pool
 
     yield
 
+    if warmer:
+        await warmer.stop()
+    # Drain buffered run telemetry while the API client is still open
+    await telemetry.close()
+    await event_bus.aclose()
     await app_api_client.close()
     await llm_client.close()
     if tavily_client:
         await tavily_client.close()
     if embedding_client:
         await embedding_client.close()
+    if retrieval_index_task and not retrieval_index_task.done():
+        retrieval_index_task.cancel()
+    if parse_pool:
+        parse_pool.close()
+    if embedding_cache:
+        await embedding_cache.close()
+    if pg_pool:
+        pg_pool.close()
+    if memory_queue:
+        await memory_queue.close()
+    if memory_client:
+        memory_client.close()
+    await loop_lag_monitor.stop()
 
 
 def create_app() -> FastAPI:
@@ -109,7 +244,21 @@ def create_app() -> FastAPI:
 
     @app.get('/health', response_model=HealthResponse, response_model_by_alias=True)
     async def health() -> HealthResponse:
-        return HealthResponse()
+        embedding_cache = app.state.embedding_cache
+        return HealthResponse(
+            event_loop_lag=app.state.loop_lag_monitor.stats,
+            embedding_cache=embedding_cache.stats if embedding_cache else None,
+            telemetry=app.state.telemetry.metrics,
+        )
+
+    @app.get('/ready', response_model=ReadyResponse, response_model_by_alias=True)
+    async def ready(response: Response) -> ReadyResponse:
+        warmer = app.state.warmer
+        if warmer is None:
+            return ReadyResponse(ready=True)
+        if not warmer.ready:
+            response.status_code = 503
+        return ReadyResponse(ready=warmer.ready, warmup_ms=warmer.timings_ms)
 
     return app
 
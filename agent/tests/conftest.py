@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.graph.services import GraphServices
+from app.observability import RunEventBus
+
+
+@pytest.fixture
+def graph_services() -> GraphServices:
+    """Services with every external client mocked out."""
+    return GraphServices(
+        app_api_client=AsyncMock(),
+        event_bus=RunEventBus(),
+        llm_client=MagicMock(model='fake-model'),
+    )
+
+
+@pytest.fixture
+def pg_pool():
+    """A small pool on the configured Postgres; skips when it is unreachable."""
+    import psycopg2
+
+    from app.tools.pg_pool import PgPool
+
+    pool = PgPool(min_size=1, max_size=4)
+    try:
+        pool.warm()
+    except psycopg2.OperationalError as e:
+        pool.close()
+        pytest.skip(f'Postgres unavailable: {e}')
+    yield pool
+    pool.close()
+
+
+_RETRIEVAL_SCHEMA = """
+CREATE TABLE document (
+    id varchar PRIMARY KEY,
+    "projectId" varchar NOT NULL,
+    title varchar NOT NULL DEFAULT '',
+    "mimeType" varchar NOT NULL DEFAULT 'text/plain',
+    metadata jsonb,
+    "createdAt" timestamp NOT NULL DEFAULT now(),
+    "updatedAt" timestamp NOT NULL DEFAULT now()
+);
+CREATE TABLE document_chunk (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    "documentId" varchar NOT NULL REFERENCES document (id) ON DELETE CASCADE,
+    "chunkIndex" int NOT NULL,
+    content text NOT NULL,
+    embedding double precision[],
+    "tokenCount" int NOT NULL DEFAULT 0,
+    metadata jsonb,
+    pending boolean NOT NULL DEFAULT false,
+    "createdAt" timestamp NOT NULL DEFAULT now()
+);
+CREATE INDEX ON document_chunk ("documentId", "chunkIndex");
+"""
+
+
+@pytest.fixture
+def retrieval_pool(pg_pool):
+    """``pg_pool`` bound to a throwaway schema holding minimal document tables."""
+    import uuid
+
+    schema = f'test_{uuid.uuid4().hex[:12]}'
+
+    def _create(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute(f'CREATE SCHEMA {schema}')
+            cur.execute(f'SET LOCAL search_path = {schema}, public')
+            cur.execute(_RETRIEVAL_SCHEMA)
+
+    pg_pool._call(_create)
+    # Fresh connections from now on resolve the tables in the test schema
+    pg_pool.close()
+    pool = type(pg_pool)(min_size=1, max_size=pg_pool.max_size)
+    pool._conn_params = {**pool._conn_params, 'options': f'{pool._conn_params["options"]} -c search_path={schema},public'}
+    yield pool
+    pool.close()
+    cleanup = type(pg_pool)(min_size=1, max_size=1)
+    cleanup._call(lambda conn: conn.cursor().execute(f'DROP SCHEMA {schema} CASCADE'))
+    cleanup.close()
+
+
+@pytest.fixture
+def write_pdf():
+    """Writes a minimal multi-page PDF of Helvetica text lines; returns the text size."""
+
+    def _write(path: str, pages: int, lines_per_page: int = 60) -> int:
+        objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+        kids = []
+        text_chars = 0
+        for p in range(pages):
+            lines = [f'Page {p} line {i}: the quarterly roadmap covers ENG-{p * 100 + i} and its rollout.'
+                     for i in range(lines_per_page)]
+            text_chars += sum(len(line) + 1 for line in lines)
+            ops = ['BT', '/F1 9 Tf', '11 TL', '40 800 Td']
+            ops += [f'({line}) Tj T*' for line in lines]
+            ops.append('ET')
+            stream = '\n'.join(ops).encode('latin-1')
+            objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+            content_id = len(objects)
+            objects.append(
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+            )
+            kids.append(len(objects))
+        objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+
+        out = bytearray(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+        with open(path, 'wb') as f:
+            f.write(out)
+        return text_chars
+
+    return _write
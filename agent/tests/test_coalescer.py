@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.observability.coalescer import TokenCoalescer
+
+
+def test_first_token_is_sent_immediately_then_tokens_are_grouped():
+    frames: list[str] = []
+
+    async def emit(frame: str) -> None:
+        frames.append(frame)
+
+    async def run() -> None:
+        coalescer = TokenCoalescer(emit, interval_ms=20, max_bytes=1024)
+        await coalescer.push('Hello')
+        assert frames == ['Hello']
+        for token in (' ', 'wor', 'ld'):
+            await coalescer.push(token)
+        await asyncio.sleep(0.05)
+        await coalescer.aclose()
+
+    asyncio.run(run())
+    assert frames == ['Hello', ' world']
+
+
+def test_flushes_when_max_bytes_is_reached():
+    frames: list[str] = []
+
+    async def emit(frame: str) -> None:
+        frames.append(frame)
+
+    async def run() -> None:
+        coalescer = TokenCoalescer(emit, interval_ms=10_000, max_bytes=4)
+        for token in ('a', 'bb', 'cc', 'd'):
+            await coalescer.push(token)
+        await coalescer.aclose()
+
+    asyncio.run(run())
+    assert frames == ['a', 'bbcc', 'd']
+
+
+def test_timer_flush_failure_is_logged(caplog):
+    async def emit(frame: str) -> None:
+        if frame != 'first':
+            raise RuntimeError('socket gone')
+
+    async def run() -> None:
+        coalescer = TokenCoalescer(emit, interval_ms=5, max_bytes=1024)
+        await coalescer.push('first')
+        await coalescer.push('second')
+        await asyncio.sleep(0.05)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(run())
+    assert 'Timed token flush failed' in caplog.text
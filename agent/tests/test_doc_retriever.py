@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+from app.config import get_settings
+from app.tools.doc_retriever import DocRetriever, RetrievalFilters
+from app.tools.pg_pool import PgPool
+from app.tools.vector_index import ensure_retrieval_indexes, lexical_tsquery
+
+DIMS = get_settings().ollama_embed_dims
+
+
+def _seed(pool: PgPool, project_id: str, documents: int, chunks_per_document: int) -> None:
+    def _insert(conn) -> None:
+        with conn.cursor() as cur:
+            for d in range(documents):
+                document_id = f'{project_id}-{d}'
+                cur.execute('INSERT INTO document (id, "projectId", title) VALUES (%s, %s, %s)',
+                            (document_id, project_id, document_id))
+                cur.execute(
+                    'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding, "tokenCount") '
+                    'SELECT %s, g, %s || g, ARRAY(SELECT random() FROM generate_series(1, %s) WHERE g >= 0), 10 '
+                    'FROM generate_series(0, %s - 1) g',
+                    (document_id, f'{document_id} chunk ', DIMS, chunks_per_document),
+                )
+
+    pool._call(_insert)
+
+
+def _retriever(pool: PgPool) -> DocRetriever:
+    embedding_client = AsyncMock()
+    embedding_client.embed.return_value = [random.random() for _ in range(DIMS)]
+    return DocRetriever(embedding_client, pool)
+
+
+def test_small_project_gets_k_rows_through_global_ann_index(retrieval_pool: PgPool) -> None:
+    # The tables are tiny; leave the ANN index as the planner's only choice, as it is on a large table
+    retrieval_pool._conn_params['options'] += ' -c enable_seqscan=off'
+    retrieval_pool._call(lambda conn: conn.cursor().execute('DROP INDEX "document_chunk_documentId_chunkIndex_idx"'))
+    _seed(retrieval_pool, 'big', 20, 100)
+    _seed(retrieval_pool, 'small', 1, 10)
+    asyncio.run(ensure_retrieval_indexes(retrieval_pool))
+    retriever = _retriever(retrieval_pool)
+    retriever.index_type = 'hnsw'
+
+    results = asyncio.run(retriever.retrieve('q', 'small', top_k=5, score_threshold=-1.0, hybrid=False))
+
+    assert len(results) == 5
+    assert all(r['documentId'] == 'small-0' for r in results)
+    similarities = [r['similarity'] for r in results]
+    assert similarities == sorted(similarities, reverse=True)
+    if not retriever._iterative_scan_supported:
+        # ef_search candidates are drawn from the whole table; the exact rescan filled the page
+        assert retriever.metrics['exactScanFallbacks'] == 1
+
+    hybrid = asyncio.run(retriever.retrieve('zzz', 'small', top_k=5, score_threshold=-1.0, hybrid=True))
+    assert [r['id'] for r in hybrid] == [r['id'] for r in results]
+
+
+def test_close_does_not_wait_for_running_statements(retrieval_pool: PgPool) -> None:
+    async def main() -> float:
+        loop = asyncio.get_running_loop()
+        # Like a first CREATE INDEX CONCURRENTLY: no statement timeout, runs for minutes
+        slow = asyncio.ensure_future(retrieval_pool.run(
+            lambda conn: conn.cursor().execute('SET LOCAL statement_timeout = 0; SELECT pg_sleep(30)')
+        ))
+        await asyncio.sleep(0.3)
+        start = loop.time()
+        retrieval_pool.close()
+        try:
+            await asyncio.wait_for(slow, 2)
+        except Exception:
+            pass
+        return loop.time() - start
+
+    assert asyncio.run(main()) < 2
+
+
+def test_source_type_filter_maps_to_stored_types(retrieval_pool: PgPool) -> None:
+    # createdAt is a timestamp without time zone, read in the session's zone
+    retrieval_pool._conn_params['options'] += ' -c TimeZone=UTC'
+    def _insert(conn) -> None:
+        with conn.cursor() as cur:
+            for document_id, source_type in (
+                ('upload', None), ('notion', 'notion'), ('gdoc', 'google_docs'), ('meeting', 'meeting'),
+            ):
+                metadata = json.dumps({'sourceType': source_type} if source_type else {})
+                cur.execute(
+                    'INSERT INTO document (id, "projectId", metadata, "createdAt") VALUES (%s, %s, %s, %s)',
+                    (document_id, 'p', metadata, datetime(2024, 1, 2, 12)),
+                )
+                cur.execute(
+                    'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding) '
+                    'SELECT %s, 0, %s, array_fill(1.0::float8, ARRAY[%s])',
+                    (document_id, document_id, DIMS),
+                )
+
+    retrieval_pool._call(_insert)
+    retriever = _retriever(retrieval_pool)
+
+    def documents(**filters) -> set:
+        rows = asyncio.run(retriever.retrieve(
+            'q', 'p', top_k=10, score_threshold=-1.0, hybrid=False, filters=RetrievalFilters(**filters),
+        ))
+        return {r['documentId'] for r in rows}
+
+    assert documents(source_type='document') == {'upload', 'notion', 'gdoc'}
+    assert documents(source_type='meeting') == {'meeting'}
+    assert documents(source_type='google_docs') == {'gdoc'}
+    # Timezone-aware bounds compare as instants
+    after = datetime(2024, 1, 2, 11, 30, tzinfo=timezone.utc)
+    assert len(documents(created_after=after)) == 4
+    assert documents(created_before=after) == set()
+
+
+def test_pending_chunks_are_not_retrieved(retrieval_pool: PgPool) -> None:
+    def _insert(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute('INSERT INTO document (id, "projectId") VALUES (%s, %s)', ('d', 'p'))
+            cur.execute(
+                'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding, pending) '
+                "SELECT 'd', g, 'roadmap v' || g, array_fill(1.0::float8, ARRAY[%s]), g > 0 "
+                'FROM generate_series(0, 1) g',
+                (DIMS,),
+            )
+
+    retrieval_pool._call(_insert)
+    retriever = _retriever(retrieval_pool)
+
+    for hybrid in (False, True):
+        rows = asyncio.run(retriever.retrieve('roadmap', 'p', top_k=10, score_threshold=-1.0, hybrid=hybrid))
+        assert [r['content'] for r in rows] == ['roadmap v0']
+
+
+def test_lexical_tsquery_keeps_significant_terms() -> None:
+    assert lexical_tsquery('What is the status of ENG-123 in the OAuth flow?') == (
+        "'status' | 'eng-123' | 'oauth' | 'flow'"
+    )
+    assert lexical_tsquery("Who's on it?") == ''
+    assert lexical_tsquery("O'Brien") == "'o' | 'brien'"
+
+
+def test_question_matches_chunks_lexically(retrieval_pool: PgPool) -> None:
+    def _insert(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute('INSERT INTO document (id, "projectId") VALUES (%s, %s)', ('d', 'p'))
+            for index, content in enumerate((
+                'ENG-123: OAuth token refresh fails after the v2.1 upgrade.',
+                'Quarterly planning notes for the design team.',
+            )):
+                cur.execute(
+                    'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding) '
+                    'VALUES (%s, %s, %s, array_fill(0.0::float8, ARRAY[%s]))',
+                    ('d', index, content, DIMS),
+                )
+
+    retrieval_pool._call(_insert)
+    retriever = _retriever(retrieval_pool)
+    # Dense matches are ruled out by the threshold; only the lexical branch can answer
+    rows = asyncio.run(retriever.retrieve(
+        'What is the status of ENG-123 in the OAuth flow?', 'p', top_k=5, score_threshold=0.99, hybrid=True,
+    ))
+    assert [r['chunkIndex'] for r in rows] == [0]
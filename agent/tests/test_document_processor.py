@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+import tracemalloc
+from typing import Any, AsyncIterator, Dict, List
+
+from app.pipelines.document_processor import (
+    DocumentProcessor,
+    _SEGMENT_SEPARATORS,
+    _iter_pdf_pages,
+    _iter_text_blocks,
+)
+
+
+class _FakeApi:
+    """Counts what is posted instead of keeping it, like a remote API would."""
+
+    def __init__(self) -> None:
+        self.chunks = 0
+        self.statuses: List[Dict[str, Any]] = []
+
+    async def get(self, path: str) -> Dict[str, Any]:
+        return {'chunks': []}
+
+    async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.chunks += len(body.get('chunks', []))
+        return {}
+
+    async def patch(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.statuses.append(body)
+        return {}
+
+
+class _FakeEmbedding:
+    def __init__(self) -> None:
+        self.embedded = 0
+        self.fail = False
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if self.fail:
+            raise ConnectionError('embedding backend down')
+        self.embedded += len(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class _ChunkStore(_FakeApi):
+    """Stores chunks like the API: pending until /chunks/sync publishes them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: Dict[str, Dict[str, Any]] = {}
+
+    def visible(self) -> List[str]:
+        rows = sorted((r for r in self.rows.values() if not r.get('pending')), key=lambda r: r['chunkIndex'])
+        return [r['content'] for r in rows]
+
+    async def get(self, path: str) -> Dict[str, Any]:
+        return {'chunks': [
+            {'id': chunk_id, 'chunkIndex': r['chunkIndex'], 'contentHash': r['metadata']['contentHash']}
+            for chunk_id, r in self.rows.items() if not r.get('pending')
+        ]}
+
+    async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        if path.endswith('/chunks/sync'):
+            if body.get('discard'):
+                self.rows = {k: r for k, r in self.rows.items() if not r.get('pending')}
+                return {}
+            for chunk_id in body['deleteIds']:
+                self.rows.pop(chunk_id)
+            for moved in body['reindex']:
+                self.rows[moved['id']]['chunkIndex'] = moved['chunkIndex']
+            for r in self.rows.values():
+                r['pending'] = False
+            return {}
+        for chunk in body['chunks']:
+            self.rows.setdefault(chunk['id'], chunk)
+        return {}
+
+
+class _FakeMinio:
+    def __init__(self, source: str) -> None:
+        self.source = source
+
+    def download_to_file(self, key: str, path: str) -> None:
+        shutil.copyfile(self.source, path)
+
+
+def _processor(api: _FakeApi, minio: _FakeMinio | None = None) -> DocumentProcessor:
+    return DocumentProcessor(minio_client=minio, embedding_client=_FakeEmbedding(), api_client=api)
+
+
+async def _collect(chunks: AsyncIterator[str]) -> List[str]:
+    return [chunk async for chunk in chunks]
+
+
+def test_windowed_chunking_keeps_whitespace_across_windows() -> None:
+    # Text blocks are joined without a separator; these end in whitespace where a window closes
+    words = [f'word{i}' for i in range(3000)]
+    processor = _processor(_FakeApi())
+    processor.split_window_chars = 4000
+
+    async def segments() -> AsyncIterator[str]:
+        for start in range(0, len(words), 100):
+            yield ' '.join(words[start:start + 100]) + ' '
+
+    chunks = asyncio.run(_collect(processor._iter_chunks(segments(), _SEGMENT_SEPARATORS[_iter_text_blocks])))
+
+    emitted = {word for chunk in chunks for word in chunk.split()}
+    assert emitted == set(words)
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_pdf_ingest_memory_does_not_grow_with_the_document(tmp_path, write_pdf) -> None:
+    path = str(tmp_path / 'big.pdf')
+    text_chars = write_pdf(path, pages=200, lines_per_page=40)
+    api = _FakeApi()
+    processor = _processor(api, _FakeMinio(path))
+    processor.split_window_chars = 8000
+    processor.chunk_window_size = 8
+    # Imports and first-use allocations are not the document's
+    write_pdf(str(tmp_path / 'warm.pdf'), pages=1)
+    asyncio.run(_processor(_FakeApi(), _FakeMinio(str(tmp_path / 'warm.pdf'))).process(
+        'd0', 'documents/warm.pdf', 'application/pdf', 'p1'))
+
+    parser_peak = _peak(lambda: [None for _ in _iter_pdf_pages(path)])
+    ingest_peak = _peak(lambda: asyncio.run(processor.process('d1', 'documents/big.pdf', 'application/pdf', 'p1')))
+
+    assert api.statuses[-1]['status'] == 'processed'
+    assert api.chunks == api.statuses[-1]['chunkCount'] > 200
+    # pypdf's own page tree aside, only a window of text and chunks is held at once
+    assert ingest_peak - parser_peak < text_chars / 4, (ingest_peak, parser_peak, text_chars)
+
+
+def test_retried_uploads_do_not_duplicate_chunks() -> None:
+    class _FlakyApi(_FakeApi):
+        """Stores the first page, then loses the response."""
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.stored: Dict[str, str] = {}
+            self.failed = False
+
+        async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+            for chunk in body['chunks']:
+                # ON CONFLICT (id) DO NOTHING
+                self.stored.setdefault(chunk['id'], chunk['content'])
+            if not self.failed:
+                self.failed = True
+                raise ConnectionError('response lost')
+            return {}
+
+    api = _FlakyApi()
+    processor = _processor(api)
+    text = '\n\n'.join(f'Paragraph {i}. ' + 'Roadmap details. ' * 60 for i in range(10))
+
+    asyncio.run(processor.process_text('d1', text, 'p1'))
+
+    assert api.failed
+    assert len(api.stored) == api.statuses[-1]['chunkCount']
+
+
+def _paragraphs(edited: int | None = None) -> str:
+    return '\n\n'.join(
+        (f'Paragraph {i} was rewritten. ' if i == edited else f'Paragraph {i}. ') + 'Roadmap details. ' * 80
+        for i in range(20)
+    )
+
+
+def test_incremental_reingest_embeds_only_the_edited_paragraph() -> None:
+    api = _ChunkStore()
+    processor = _processor(api)
+    asyncio.run(processor.process_text('d1', _paragraphs(), 'p1'))
+    first = processor.embedding.embedded
+
+    processor.embedding.embedded = 0
+    api.statuses = []
+    asyncio.run(processor.process_text('d1', _paragraphs(edited=7), 'p1', incremental=True))
+
+    assert first >= 20
+    assert 1 <= processor.embedding.embedded <= 2
+    assert api.visible() == processor.splitter.split_text(_paragraphs(edited=7))
+    assert not any(r.get('pending') for r in api.rows.values())
+    # The previous version's chunkCount stands until the new one is published
+    assert [s['chunkCount'] for s in api.statuses if 'chunkCount' in s] == [len(api.visible())]
+
+
+def test_failed_incremental_reingest_keeps_the_previous_version() -> None:
+    api = _ChunkStore()
+    processor = _processor(api)
+    processor.chunk_window_size = 1
+    processor.upload_retries = 0
+    original = _paragraphs()
+    asyncio.run(processor.process_text('d1', original, 'p1'))
+
+    # Edits early and late: the first new chunk is uploaded before embedding fails
+    edited = _paragraphs(edited=2).replace('Paragraph 15.', 'Paragraph 15 changed.')
+    embed_batch = processor.embedding.embed_batch
+    calls = 0
+
+    async def fail_second(texts: List[str]) -> List[List[float]]:
+        nonlocal calls
+        calls += 1
+        processor.embedding.fail = calls > 1
+        return await embed_batch(texts)
+
+    processor.embedding.embed_batch = fail_second
+    try:
+        asyncio.run(processor.process_text('d1', edited, 'p1', incremental=True))
+    except ConnectionError:
+        pass
+
+    assert calls == 2
+    assert api.visible() == processor.splitter.split_text(original)
+    assert not any(r.get('pending') for r in api.rows.values())
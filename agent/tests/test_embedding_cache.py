@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.tools.embedding_cache import EmbeddingCache
+from app.tools.pg_pool import PgPool
+
+MODEL = 'test-model'
+
+
+def _row_count(pool: PgPool) -> int:
+    def _count(conn) -> int:
+        with conn.cursor() as cur:
+            cur.execute('SELECT count(*) FROM embedding_cache')
+            return cur.fetchone()[0]
+
+    return pool._call(_count)
+
+
+def test_writes_do_not_block_the_caller(retrieval_pool: PgPool) -> None:
+    async def main() -> None:
+        cache = EmbeddingCache(retrieval_pool)
+        assert await cache.ready()
+        real_run = retrieval_pool.run
+
+        async def slow_run(fn):
+            await asyncio.sleep(0.5)
+            return await real_run(fn)
+
+        retrieval_pool.run = slow_run
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await cache.put_many(MODEL, ['a', 'b'], [[1.0, 2.0], [3.0, 4.0]])
+        assert loop.time() - start < 0.1
+        # Served from memory while the write is in flight
+        assert await cache.get_many(MODEL, ['a']) == [[1.0, 2.0]]
+
+        await cache.close()
+        retrieval_pool.run = real_run
+        assert cache.metrics['writes'] == 2
+        assert await EmbeddingCache(retrieval_pool).get_many(MODEL, ['a', 'b']) == [[1.0, 2.0], [3.0, 4.0]]
+
+    asyncio.run(main())
+
+
+def test_rows_expire_and_are_capped(retrieval_pool: PgPool) -> None:
+    async def main() -> None:
+        cache = EmbeddingCache(retrieval_pool)
+        texts = [f'text {i}' for i in range(6)]
+        await cache.put_many(MODEL, texts, [[float(i)] for i in range(6)])
+        await cache.close()
+
+        # The first two are past the TTL, the rest were written in order
+        def _age(conn) -> None:
+            with conn.cursor() as cur:
+                for i, text in enumerate(texts):
+                    hours = 2 if i < 2 else 0
+                    cur.execute(
+                        "UPDATE embedding_cache SET created_at = now() - make_interval(hours => %s, secs => %s) "
+                        'WHERE content_hash = encode(sha256(convert_to(%s, \'UTF8\')), \'hex\')',
+                        (hours, 10 - i, text),
+                    )
+
+        await retrieval_pool.run(_age)
+
+        fresh = EmbeddingCache(retrieval_pool, ttl_seconds=3600, max_rows=3)
+        found = await fresh.get_many(MODEL, texts)
+        assert found[:2] == [None, None]
+        assert found[2:] == [[2.0], [3.0], [4.0], [5.0]]
+
+        await fresh.prune()
+        assert fresh.metrics['pruned'] == 3
+        assert _row_count(retrieval_pool) == 3
+        assert await EmbeddingCache(retrieval_pool).get_many(MODEL, texts[2:]) == [None, [3.0], [4.0], [5.0]]
+
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.tools.embedding_codec import DTYPE, decode_b64, encode_b64, to_vector_literal
+
+
+def test_base64_round_trip_keeps_float32_values() -> None:
+    vector = np.random.default_rng(0).standard_normal(768).tolist()
+
+    decoded = decode_b64(encode_b64(vector))
+
+    assert decoded.dtype == DTYPE
+    assert len(decoded) == 768
+    assert np.array_equal(decoded, np.asarray(vector, dtype=np.float32))
+    # Only float32 rounding is lost
+    assert np.allclose(decoded, vector, rtol=1e-7, atol=0)
+
+
+def test_base64_is_four_bytes_per_dimension() -> None:
+    assert len(encode_b64([0.5] * 768)) == 4 * 768 * 4 // 3
+
+
+def test_vector_literal_round_trips_every_float32() -> None:
+    vector = np.random.default_rng(1).standard_normal(768).astype(np.float32)
+    vector[:4] = [np.finfo(np.float32).tiny, np.finfo(np.float32).max, -0.0, 1 / 3]
+
+    literal = to_vector_literal(vector)
+
+    assert literal.startswith('[') and literal.endswith(']')
+    parsed = np.array(literal[1:-1].split(','), dtype=np.float32)
+    assert len(parsed) == 768
+    assert np.array_equal(parsed, vector)
+
+
+def test_empty_vector() -> None:
+    assert encode_b64([]) == ''
+    decoded = decode_b64('')
+    assert decoded.dtype == DTYPE and len(decoded) == 0
+    assert to_vector_literal([]) == '[]'
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from app.graph.nodes.generate_answer import generate_answer_node
+from app.graph.services import GraphServices
+from app.tools.llm import FakeProvider
+
+FALLBACK = 'I am sorry, I cannot answer that right now.'
+
+
+class _FailingStream(FakeProvider):
+    """Streaming fails before the first token; the buffered completion works."""
+
+    async def stream_chat(self, *args: Any, **kwargs: Any) -> AsyncIterator[str]:
+        raise ConnectionError('stream refused')
+        yield ''
+
+
+def _run(services: GraphServices) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    async def main() -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        result = await generate_answer_node(services)({'runId': 'run-1', 'question': 'How is the roadmap?'})
+        await services.event_bus.emit('run-1', 'completed')
+        frames = [
+            message.event.payload async for message in services.event_bus.subscribe('run-1')
+            if message.event.event == 'text_token'
+        ]
+        await services.event_bus.aclose()
+        return result, frames
+
+    return asyncio.run(main())
+
+
+def _streamed(frames: List[Dict[str, Any]]) -> str:
+    assert frames[-1] == {'token': '', 'done': True}
+    assert not any(frame['done'] for frame in frames[:-1])
+    return ''.join(frame['token'] for frame in frames)
+
+
+def test_streamed_tokens_are_the_answer(graph_services: GraphServices) -> None:
+    graph_services.llm_client = FakeProvider(response='The roadmap is on track for Q3.')
+
+    result, frames = _run(graph_services)
+
+    assert result['finalAnswer'] == 'The roadmap is on track for Q3.'
+    assert _streamed(frames) == result['finalAnswer']
+
+
+def test_stream_failure_before_output_falls_back_to_chat(graph_services: GraphServices) -> None:
+    graph_services.llm_client = _FailingStream(response='Buffered answer.')
+
+    result, frames = _run(graph_services)
+
+    assert result['finalAnswer'] == 'Buffered answer.'
+    assert _streamed(frames) == 'Buffered answer.'
+
+
+def test_empty_stream_streams_the_apology(graph_services: GraphServices) -> None:
+    graph_services.llm_client = FakeProvider(response='')
+
+    result, frames = _run(graph_services)
+
+    assert result['finalAnswer'] == FALLBACK
+    assert _streamed(frames) == FALLBACK
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict
+
+import pytest
+
+from app.graph import builder
+from app.graph.builder import FAST_VARIANT, FULL_VARIANT, build_graph
+
+_BRANCHES = {
+    FULL_VARIANT: ('load_user', 'search_memories', 'fetch_activity', 'retrieve_docs', 'fetch_context'),
+    FAST_VARIANT: ('load_user', 'fetch_activity', 'fetch_context'),
+}
+_INDEPENDENT = {
+    FULL_VARIANT: {'load_user', 'search_memories', 'parse_intent', 'fetch_activity'},
+    FAST_VARIANT: {'load_user', 'parse_intent', 'fetch_activity'},
+}
+
+
+def _stub(name: str):
+    def factory(services):
+        async def _node(state: Dict[str, Any]) -> Dict[str, Any]:
+            await asyncio.sleep(0.01)
+            # Every node writes the reducer keys, as the real ones do on errors and timing
+            return {'warnings': [f'{name} warning'], 'timings': {name: 1.0}}
+
+        return _node
+
+    return factory
+
+
+@pytest.fixture
+def stub_nodes(monkeypatch) -> None:
+    for name in (
+        'load_user', 'search_memories', 'parse_intent', 'fetch_activity', 'retrieve_docs',
+        'fetch_context', 'generate_answer', 'store_memories', 'persist',
+    ):
+        monkeypatch.setattr(builder, f'{name}_node', _stub(name))
+
+
+async def _run(graph) -> tuple[Dict[str, int], Dict[str, Any]]:
+    steps: Dict[str, int] = {}
+    state: Dict[str, Any] = {}
+    async for mode, chunk in graph.astream(
+        {'runId': 'run-1', 'question': 'q', 'warnings': [], 'timings': {}},
+        stream_mode=['debug', 'values'],
+    ):
+        if mode == 'debug' and chunk['type'] == 'task':
+            name = chunk['payload']['name']
+            assert name not in steps, f'{name} ran twice'
+            steps[name] = chunk['step']
+        elif mode == 'values':
+            state = chunk
+    return steps, state
+
+
+@pytest.mark.parametrize('variant', [FULL_VARIANT, FAST_VARIANT])
+def test_branches_run_together_and_merge_into_the_answer(variant, graph_services, stub_nodes) -> None:
+    steps, state = asyncio.run(_run(build_graph(graph_services, variant)))
+
+    # Independent branches share the first superstep; intent-dependent ones the next
+    assert {steps[name] for name in _INDEPENDENT[variant]} == {1}
+    assert steps['fetch_context'] == 2
+    if variant == FULL_VARIANT:
+        assert steps['retrieve_docs'] == 2
+
+    # generate_answer runs once, after every branch feeding it
+    assert steps['generate_answer'] == max(steps[name] for name in _BRANCHES[variant]) + 1
+
+    # Same-step writes to warnings/timings were merged rather than rejected
+    assert sorted(state['warnings']) == sorted(f'{name} warning' for name in steps)
+    assert set(state['timings']) == set(steps)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from app.graph import registry as registry_module
+from app.graph.builder import FAST_VARIANT, FULL_VARIANT, GRAPH_VARIANTS
+from app.graph.registry import GraphRegistry
+
+
+def test_compiles_each_variant_once(graph_services):
+    with patch.object(registry_module, 'build_graph', wraps=registry_module.build_graph) as build:
+        registry = GraphRegistry(graph_services)
+        for _ in range(10):
+            registry.get(FULL_VARIANT)
+            registry.get(FAST_VARIANT)
+    assert build.call_count == len(GRAPH_VARIANTS)
+    assert set(registry.compile_ms) == set(GRAPH_VARIANTS)
+
+
+def test_reuses_the_same_compiled_graph(graph_services):
+    registry = GraphRegistry(graph_services)
+    assert registry.get(FULL_VARIANT) is registry.get(FULL_VARIANT)
+    assert registry.get(FAST_VARIANT) is not registry.get(FULL_VARIANT)
+
+
+def test_unknown_variant_falls_back_to_default(graph_services):
+    registry = GraphRegistry(graph_services)
+    assert registry.get('nope') is registry.get(FULL_VARIANT)
+    state = {'metadata': {'runConfig': {'graphVariant': FAST_VARIANT}}}
+    assert registry.for_state(state) is registry.get(FAST_VARIANT)
+    assert registry.for_state({}) is registry.get(FULL_VARIANT)
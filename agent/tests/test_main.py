@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.observability import EventLoopLagMonitor, RunTelemetryWriter
+from app.tools import BackendWarmer
+from main import create_app
+
+
+class _FailingApi:
+    async def create_telemetry_batch(self, *args, **kwargs):
+        raise RuntimeError('api down')
+
+
+def _app(**state) -> FastAPI:
+    # The lifespan (and the backends it connects to) never runs; state is set here
+    app = create_app()
+    app.state.loop_lag_monitor = EventLoopLagMonitor()
+    app.state.embedding_cache = None
+    app.state.telemetry = RunTelemetryWriter(_FailingApi())
+    app.state.warmer = None
+    for name, value in state.items():
+        setattr(app.state, name, value)
+    return app
+
+
+def _client(**state) -> TestClient:
+    # Not entered as a context manager, so the lifespan does not run
+    return TestClient(_app(**state))
+
+
+def test_health_reports_lost_telemetry() -> None:
+    writer = RunTelemetryWriter(_FailingApi(), max_pending=2)
+    client = _client(telemetry=writer)
+    assert client.get('/health').json()['telemetry']['failed'] == 0
+
+    async def run() -> None:
+        for event in ('started', 'token', 'completed'):
+            writer.record_event('run-1', event, {})
+        await writer.flush_all()
+
+    asyncio.run(run())
+
+    body = client.get('/health').json()
+    assert body['telemetry'] == {
+        'recorded': 2, 'flushed': 0, 'batches': 0, 'failed': 2, 'dropped': 1, 'cancelled': 0,
+    }
+    assert 'eventLoopLag' in body
+
+
+class _Backend:
+    """warm_up() waits for ``release`` and fails its first ``failures`` calls."""
+
+    def __init__(self, failures: int = 0, hang: bool = False) -> None:
+        self.release = asyncio.Event()
+        self.failures = failures
+        self.hang = hang
+        self.calls = 0
+
+    async def warm_up(self) -> None:
+        self.calls += 1
+        if self.hang and self.calls == 1:
+            await asyncio.sleep(3600)
+        await self.release.wait()
+        if self.calls <= self.failures:
+            raise ConnectionError('backend down')
+
+
+async def _ready(app: FastAPI) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://agent') as client:
+        return await client.get('/ready')
+
+
+def test_ready_once_every_backend_is_warm() -> None:
+    llm, embedding = _Backend(), _Backend()
+
+    async def run() -> None:
+        warmer = BackendWarmer(llm, embedding, keep_alive_interval_seconds=0)
+        app = _app(warmer=warmer)
+        warmer.start()
+        await asyncio.sleep(0.05)
+        response = await _ready(app)
+        assert response.status_code == 503
+        assert response.json() == {'ready': False, 'warmupMs': {}}
+
+        llm.release.set()
+        embedding.release.set()
+        await asyncio.sleep(0.05)
+        response = await _ready(app)
+        assert response.status_code == 200
+        assert set(response.json()['warmupMs']) == {'llm', 'embedding'}
+        await warmer.stop()
+
+    asyncio.run(run())
+
+
+def test_not_ready_while_a_backend_fails_or_times_out() -> None:
+    llm, embedding = _Backend(hang=True), _Backend(failures=1)
+    llm.release.set()
+    embedding.release.set()
+
+    async def run() -> None:
+        warmer = BackendWarmer(
+            llm, embedding, timeout_seconds=0.1, keep_alive_interval_seconds=0, retry_interval_seconds=0.5,
+        )
+        app = _app(warmer=warmer)
+        warmer.start()
+        # Both first attempts are over (timed out / failed); the retry is not due yet
+        await asyncio.sleep(0.2)
+        assert (await _ready(app)).status_code == 503
+        assert (llm.calls, embedding.calls) == (1, 1)
+
+        await asyncio.sleep(0.5)
+        assert (await _ready(app)).status_code == 200
+        assert (llm.calls, embedding.calls) == (2, 2)
+        await warmer.stop()
+
+    asyncio.run(run())
+
+
+def test_ready_without_a_warmer() -> None:
+    response = _client().get('/ready')
+    assert response.status_code == 200 and response.json()['ready'] is True
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.pipelines.meeting_processor import MeetingProcessor
+
+
+def _processor() -> MeetingProcessor:
+    api = AsyncMock()
+    api.get.return_value = {'chunks': []}
+    llm = MagicMock()
+    llm.chat = AsyncMock(return_value={'content': '{"insights": []}'})
+    embedding = MagicMock()
+    embedding.embed_batch = AsyncMock(side_effect=lambda texts: [[0.1, 0.2] for _ in texts])
+    return MeetingProcessor(llm_client=llm, api_client=api, embedding_client=embedding)
+
+
+def test_transcript_is_ingested_into_the_meeting_document() -> None:
+    processor = _processor()
+    asyncio.run(processor.process('m1', 'p1', 'Standup', 'We shipped ENG-123.', document_id='d1'))
+
+    posted = [call.args for call in processor.api.post.call_args_list]
+    chunk_posts = [body for path, body in posted if path == '/documents/d1/chunks']
+    assert chunk_posts and chunk_posts[0]['chunks'][0]['content'].startswith('Meeting: Standup')
+    statuses = [call.args for call in processor.api.patch.call_args_list]
+    assert ('/documents/d1/status', {'status': 'processed', 'chunkCount': 1}) in statuses
+    assert statuses[-1] == ('/meetings/m1/status', {'status': 'processed', 'insightCount': 0})
+
+
+def test_no_document_means_no_embedding() -> None:
+    processor = _processor()
+    asyncio.run(processor.process('m1', 'p1', 'Standup', 'We shipped ENG-123.'))
+
+    processor.embedding.embed_batch.assert_not_called()
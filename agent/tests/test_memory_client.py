@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.observability import EventLoopLagMonitor
+from app.tools import memory_client as memory_client_module
+from app.tools.memory_client import MemoryClient
+
+
+class _BlockingMem0:
+    """Synchronous like mem0: each call blocks its thread for ``delay`` seconds."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def search(self, query, user_id, limit=5):
+        time.sleep(self.delay)
+        return [{'memory': f'{user_id} likes {query}'}]
+
+    def add(self, messages, user_id, metadata=None):
+        time.sleep(self.delay)
+        return {'results': [{'memory': messages[0]['content']}]}
+
+
+@pytest.fixture
+def blocking_mem0(monkeypatch):
+    mem0 = _BlockingMem0(delay=0.5)
+    monkeypatch.setattr(memory_client_module.Memory, 'from_config', staticmethod(lambda config: mem0))
+    return mem0
+
+
+def test_blocking_calls_do_not_stall_the_event_loop(blocking_mem0) -> None:
+    client = MemoryClient(max_workers=2, search_timeout_seconds=5.0, add_timeout_seconds=5.0)
+    monitor = EventLoopLagMonitor(interval_seconds=0.01)
+
+    async def run() -> list:
+        monitor.start()
+        results = await asyncio.gather(
+            client.search('roadmaps', user_id='u1'),
+            client.add([{'role': 'user', 'content': 'ship Q3'}], user_id='u1'),
+        )
+        await monitor.stop()
+        return results
+
+    try:
+        memories, added = asyncio.run(run())
+    finally:
+        client.close()
+
+    assert memories == [{'memory': 'u1 likes roadmaps'}]
+    assert added == {'results': [{'memory': 'ship Q3'}]}
+    # Half a second of blocking mem0 work; the loop kept waking on time throughout
+    assert len(monitor._samples) >= 20
+    assert monitor.stats['maxMs'] < 100
+
+
+def test_timed_out_call_returns_the_default(blocking_mem0) -> None:
+    client = MemoryClient(max_workers=1, search_timeout_seconds=0.1, add_timeout_seconds=0.1)
+
+    async def run() -> tuple:
+        start = time.perf_counter()
+        memories = await client.search('roadmaps', user_id='u1')
+        added = await client.add([{'role': 'user', 'content': 'ship Q3'}], user_id='u1')
+        return memories, added, time.perf_counter() - start
+
+    try:
+        memories, added, elapsed = asyncio.run(run())
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(client.add([{'role': 'user', 'content': 'retry me'}], user_id='u1', raise_errors=True))
+    finally:
+        client.close()
+
+    assert memories == [] and added == {}
+    # The caller stops waiting at the timeout, not when mem0 finishes
+    assert elapsed < 0.5
+
+
+def test_lag_monitor_reports_a_blocked_loop() -> None:
+    monitor = EventLoopLagMonitor(interval_seconds=0.01, warn_threshold_ms=50)
+
+    async def run() -> None:
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # what an un-offloaded mem0 call does to the loop
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    assert monitor.stats == {'lastMs': 0.0, 'p50Ms': 0.0, 'p99Ms': 0.0, 'maxMs': 0.0}
+    asyncio.run(run())
+
+    assert monitor.stats['maxMs'] >= 150
+    assert monitor.stats['p50Ms'] < 50
+    assert monitor._task is None
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+from app.tools.memory_queue import MemoryWriteQueue
+
+
+class _FakeMemory:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls: list[tuple[str, int]] = []
+
+    async def add(self, messages, user_id, metadata=None, raise_errors=False):
+        self.calls.append((user_id, len(messages)))
+        if self.failures:
+            self.failures -= 1
+            raise TimeoutError('mem0 add timed out')
+        return {'results': []}
+
+
+def _queue(memory, path, **kwargs) -> MemoryWriteQueue:
+    options = dict(num_workers=1, batch_window_seconds=0, retry_base_seconds=0.05, poll_interval_seconds=0.05)
+    options.update(kwargs)
+    return MemoryWriteQueue(memory, path=str(path), **options)
+
+
+def _turn(text: str) -> list[dict[str, str]]:
+    return [{'role': 'user', 'content': text}]
+
+
+def _remaining(path) -> int:
+    with sqlite3.connect(str(path)) as db:
+        return db.execute('SELECT COUNT(*) FROM memory_writes').fetchone()[0]
+
+
+def test_failed_write_is_kept_and_retried(tmp_path):
+    path = tmp_path / 'queue.db'
+    memory = _FakeMemory(failures=1)
+
+    async def run():
+        queue = _queue(memory, path)
+        queue.start()
+        await queue.enqueue('alice', _turn('hi'), 'c1')
+        await asyncio.sleep(0.4)
+        await queue.close()
+        return queue.metrics
+
+    metrics = asyncio.run(run())
+    assert memory.calls == [('alice', 1), ('alice', 1)]
+    assert metrics['retried'] == 1 and metrics['written'] == 1
+    assert _remaining(path) == 0
+
+
+def test_write_is_dropped_after_max_attempts(tmp_path):
+    path = tmp_path / 'queue.db'
+    memory = _FakeMemory(failures=100)
+
+    async def run():
+        queue = _queue(memory, path, max_attempts=2)
+        queue.start()
+        await queue.enqueue('alice', _turn('hi'), 'c1')
+        await asyncio.sleep(0.4)
+        await queue.close()
+        return queue.metrics
+
+    metrics = asyncio.run(run())
+    assert len(memory.calls) == 2
+    assert metrics['dropped'] == 1
+    assert _remaining(path) == 0
+
+
+def test_turns_are_batched_per_user_and_conversation(tmp_path):
+    path = tmp_path / 'queue.db'
+    memory = _FakeMemory()
+
+    async def run():
+        queue = _queue(memory, path)
+        for text in ('a', 'b', 'c'):
+            await queue.enqueue('alice', _turn(text), 'c1')
+        await queue.enqueue('alice', _turn('d'), 'c2')
+        queue.start()
+        await asyncio.sleep(0.2)
+        await queue.close()
+
+    asyncio.run(run())
+    assert memory.calls == [('alice', 3), ('alice', 1)]
+
+
+def test_claimed_turns_are_not_handed_to_another_process(tmp_path):
+    path = tmp_path / 'queue.db'
+
+    async def run():
+        first = _queue(_FakeMemory(), path, claim_ttl_seconds=60)
+        second = _queue(_FakeMemory(), path, claim_ttl_seconds=60)
+        await first.enqueue('alice', _turn('a'), 'c1')
+        await first.enqueue('bob', _turn('b'), 'c1')
+        claimed_first = first._next_batch(0)
+        claimed_second = second._next_batch(0)
+        nothing_left = second._next_batch(0)
+        return claimed_first, claimed_second, nothing_left
+
+    claimed_first, claimed_second, nothing_left = asyncio.run(run())
+    assert claimed_first[1] == 'alice'
+    assert claimed_second[1] == 'bob'
+    assert nothing_left is None
+
+
+def test_expired_claims_are_picked_up_again(tmp_path):
+    path = tmp_path / 'queue.db'
+
+    async def run():
+        crashed = _queue(_FakeMemory(), path, claim_ttl_seconds=0.05)
+        survivor = _queue(_FakeMemory(), path, claim_ttl_seconds=0.05)
+        await crashed.enqueue('alice', _turn('a'), 'c1')
+        assert crashed._next_batch(0) is not None
+        assert survivor._next_batch(0) is None
+        await asyncio.sleep(0.1)
+        return survivor._next_batch(0)
+
+    batch = asyncio.run(run())
+    assert batch is not None and batch[1] == 'alice'
+
+
+def test_backoff_blocks_later_turns_of_that_user_only(tmp_path):
+    path = tmp_path / 'queue.db'
+
+    async def run():
+        queue = _queue(_FakeMemory(), path, retry_base_seconds=60)
+        await queue.enqueue('alice', _turn('a'), 'c1')
+        ids, *_ = queue._next_batch(0)
+        queue._release_for_retry(ids, attempts=1)
+        await queue.enqueue('alice', _turn('b'), 'c2')
+        await queue.enqueue('bob', _turn('c'), 'c1')
+        return queue._next_batch(0), queue._next_batch(0)
+
+    bob, nothing = asyncio.run(run())
+    assert bob[1] == 'bob'
+    assert nothing is None
+
+
+def test_queue_files_from_before_retries_are_migrated(tmp_path):
+    path = tmp_path / 'queue.db'
+    with sqlite3.connect(str(path)) as db:
+        db.executescript(
+            'CREATE TABLE memory_writes (id INTEGER PRIMARY KEY AUTOINCREMENT, shard INTEGER NOT NULL, '
+            'user_id TEXT NOT NULL, conversation_id TEXT NOT NULL, messages TEXT NOT NULL);'
+        )
+        db.execute(
+            "INSERT INTO memory_writes (shard, user_id, conversation_id, messages) VALUES (0, 'alice', 'c1', ?)",
+            ('[{"role": "user", "content": "old"}]',),
+        )
+    memory = _FakeMemory()
+
+    async def run():
+        queue = _queue(memory, path)
+        queue.start()
+        await asyncio.sleep(0.2)
+        await queue.close()
+
+    asyncio.run(run())
+    assert memory.calls == [('alice', 1)]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.pipelines.parse_pool import ParsePool, ParseTimeout, _Task
+
+
+def _hang() -> None:
+    time.sleep(3600)
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+async def _pages(pool: ParsePool, path: str, consumer_delay: float = 0.0) -> list[str]:
+    pages = []
+    async for text in pool.iter_segments(path, 'application/pdf'):
+        pages.append(text)
+        await asyncio.sleep(consumer_delay)
+    return pages
+
+
+@pytest.fixture
+def parse_pool():
+    pool = ParsePool(max_workers=2, timeout_seconds=3.0, pdf_pages_per_task=2)
+    yield pool
+    pool.close()
+
+
+def test_consumer_time_does_not_count_against_the_timeout(parse_pool: ParsePool, tmp_path, write_pdf) -> None:
+    path = str(tmp_path / 'doc.pdf')
+    write_pdf(path, pages=12, lines_per_page=5)
+
+    # 12 pages x 0.4s of embedding/uploading is well past the 3s parse timeout
+    pages = asyncio.run(_pages(parse_pool, path, consumer_delay=0.4))
+
+    assert len(pages) == 12
+    assert parse_pool.metrics['timeouts'] == 0
+
+
+def test_timeout_kills_running_workers(parse_pool: ParsePool, tmp_path, write_pdf) -> None:
+    parse_pool.timeout_seconds = 1.0
+    processes = []
+
+    async def main() -> None:
+        task = parse_pool._submit(_Task(_hang, ()))
+        await asyncio.sleep(0.5)
+        processes.extend(parse_pool._executor._processes.values())
+        with pytest.raises(ParseTimeout):
+            await parse_pool._await(task, [parse_pool.timeout_seconds], 'hang')
+
+    asyncio.run(main())
+    assert processes
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
+    assert parse_pool.metrics == {'timeouts': 1, 'rebuilds': 1, 'resubmitted': 0}
+
+    # The rebuilt pool keeps serving documents
+    path = str(tmp_path / 'doc.pdf')
+    write_pdf(path, pages=3, lines_per_page=5)
+    parse_pool.timeout_seconds = 30.0
+    assert len(asyncio.run(_pages(parse_pool, path))) == 3
+
+
+def test_broken_pool_is_rebuilt(parse_pool: ParsePool, tmp_path, write_pdf) -> None:
+    async def main() -> None:
+        task = parse_pool._submit(_Task(_crash, ()))
+        with pytest.raises(BrokenProcessPool):
+            await parse_pool._await(task, [30.0], 'crash')
+
+    asyncio.run(main())
+    # Resubmitted once onto a fresh pool, which it broke again
+    assert parse_pool.metrics['resubmitted'] == 1
+    assert parse_pool.metrics['rebuilds'] == 2
+
+    path = str(tmp_path / 'doc.pdf')
+    write_pdf(path, pages=3, lines_per_page=5)
+    assert len(asyncio.run(_pages(parse_pool, path))) == 3
+
+
+def test_timeout_of_one_document_does_not_fail_another(parse_pool: ParsePool, tmp_path, write_pdf) -> None:
+    path = str(tmp_path / 'doc.pdf')
+    write_pdf(path, pages=12, lines_per_page=5)
+    parse_pool.timeout_seconds = 30.0
+
+    async def hung(budget: float) -> None:
+        with pytest.raises(ParseTimeout):
+            await parse_pool._await(parse_pool._submit(_Task(_hang, ())), [budget], 'hung')
+
+    async def main() -> list[str]:
+        # Two hung documents occupy both workers, so the healthy document's page
+        # ranges are queued, then lost to two kills in a row
+        hangs = [asyncio.create_task(hung(1.0)), asyncio.create_task(hung(2.0))]
+        await asyncio.sleep(0.2)
+        pages = await _pages(parse_pool, path)
+        await asyncio.gather(*hangs)
+        return pages
+
+    pages = asyncio.run(main())
+
+    assert len(pages) == 12
+    assert parse_pool.metrics['timeouts'] == 2
+    assert parse_pool.metrics['resubmitted'] >= 2
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import psycopg2
+
+from app.tools.pg_pool import PgPool, PreparedStatement
+
+_BACKEND_PID = PreparedStatement('test_backend_pid', 'SELECT pg_backend_pid() AS pid, $1::int AS n', 1)
+
+
+def test_connections_are_kept_up_to_max_size(pg_pool: PgPool) -> None:
+    async def main() -> set:
+        rows = await asyncio.gather(*(pg_pool.fetch(_BACKEND_PID, [i]) for i in range(200)))
+        return {r[0]['pid'] for r in rows}
+
+    pids = asyncio.run(main())
+    assert len(pids) <= pg_pool.max_size
+    stats = pg_pool.stats
+    assert stats['open'] == stats['idle'] <= pg_pool.max_size
+    # A second wave reuses the idle connections instead of reconnecting
+    assert asyncio.run(main()) <= pids
+
+
+def test_prepared_statements_belong_to_their_connection(pg_pool: PgPool) -> None:
+    async def fetch() -> int:
+        return (await pg_pool.fetch(_BACKEND_PID, [1]))[0]['pid']
+
+    first = asyncio.run(fetch())
+    # Kill every pooled connection; replacements must prepare again
+    for conn in list(pg_pool._idle):
+        conn.close()
+    pg_pool.health_check_interval_seconds = 0
+    second = asyncio.run(fetch())
+    assert second != first
+    assert asyncio.run(fetch()) == second
+
+
+def test_waiters_get_released_connections(pg_pool: PgPool) -> None:
+    pool = PgPool(min_size=1, max_size=1)
+    try:
+        conn = pool._acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool._acquire()))
+        waiter.start()
+        waiter.join(0.2)
+        assert waiter.is_alive()
+        pool._release(conn)
+        waiter.join(2)
+        assert got == [conn]
+        pool._release(conn)
+    finally:
+        pool.close()
+
+
+def test_construction_never_connects() -> None:
+    pool = PgPool(min_size=1, max_size=2)
+    pool._conn_params = {**pool._conn_params, 'port': 1, 'connect_timeout': 1}
+    try:
+        try:
+            asyncio.run(pool.fetch(_BACKEND_PID, [1]))
+        except psycopg2.OperationalError:
+            pass
+        else:  # pragma: no cover
+            raise AssertionError('expected a connection error')
+        # The failed connect gave its slot back
+        assert pool.stats['open'] == 0
+    finally:
+        pool.close()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from app.observability.redis_events import RedisRunEventBus  # noqa: E402
+
+
+def _bus(server, **kwargs) -> RedisRunEventBus:
+    client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    return RedisRunEventBus(client=client, block_ms=50, **kwargs)
+
+
+async def _collect(bus: RedisRunEventBus, run_id: str) -> list[str]:
+    return [message.event.event async for message in bus.subscribe(run_id)]
+
+
+def test_late_subscriber_on_another_worker_gets_replay():
+    server = fakeredis.FakeServer()
+
+    async def run():
+        producer, consumer = _bus(server), _bus(server)
+        await producer.emit('run', 'started')
+        await producer.emit('run', 'text_token', {'text': 'hi'})
+        await producer.emit('run', 'completed', {'finalAnswer': 'hi'})
+        events = await asyncio.wait_for(_collect(consumer, 'run'), 2)
+        await producer.aclose()
+        await consumer.aclose()
+        return events
+
+    assert asyncio.run(run()) == ['started', 'text_token', 'completed']
+
+
+def test_live_events_fan_out_to_every_subscriber():
+    server = fakeredis.FakeServer()
+
+    async def run():
+        producer = _bus(server)
+        consumers = [_bus(server), _bus(server)]
+        tasks = [asyncio.create_task(_collect(c, 'run')) for c in consumers]
+        await asyncio.sleep(0.1)
+        for event in ('started', 'step', 'completed'):
+            await producer.emit('run', event)
+            await asyncio.sleep(0.01)
+        results = await asyncio.wait_for(asyncio.gather(*tasks), 2)
+        for bus in (producer, *consumers):
+            await bus.aclose()
+        return results
+
+    first, second = asyncio.run(run())
+    assert first == second == ['started', 'step', 'completed']
+
+
+def test_messages_keep_the_wire_encoding_and_stream_expires():
+    server = fakeredis.FakeServer()
+
+    async def run():
+        bus = _bus(server, idle_ttl_seconds=60)
+        await bus.emit('run', 'completed', {'answer': 42})
+        messages = [m async for m in bus.subscribe('run')]
+        ttl = await bus._redis.ttl(bus._key('run'))
+        await bus.aclose()
+        return messages, ttl
+
+    messages, ttl = asyncio.run(run())
+    assert messages[0].event.payload == {'answer': 42}
+    assert '"answer":42' in messages[0].encoded
+    assert 0 < ttl <= 60
+
+
+def test_idle_subscription_ends_after_ttl():
+    server = fakeredis.FakeServer()
+
+    async def run():
+        bus = _bus(server, idle_ttl_seconds=0.1)
+        events = await asyncio.wait_for(_collect(bus, 'silent'), 2)
+        await bus.aclose()
+        return events
+
+    assert asyncio.run(run()) == []
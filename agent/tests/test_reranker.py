@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from app.pipelines.document_processor import DocumentProcessor
+from app.tools.reranker import _merge_text, collapse_adjacent, mmr_rerank
+
+
+def _chunk(chunk_id: str, similarity: float, embedding: list[float], fused_score: float | None = None) -> dict:
+    return {
+        'id': chunk_id,
+        'documentId': chunk_id,
+        'chunkIndex': 0,
+        'content': chunk_id,
+        'tokenCount': 10,
+        'similarity': similarity,
+        'embedding': embedding,
+        **({'fusedScore': fused_score} if fused_score is not None else {}),
+    }
+
+
+def test_hybrid_results_are_ranked_by_fused_score() -> None:
+    # The exact-identifier match is ranked first by full-text search but is a weak cosine match
+    results = [
+        _chunk('keyword', 0.2, [1.0, 0.0, 0.0], fused_score=1 / 61 + 1 / 63),
+        _chunk('dense', 0.8, [0.0, 1.0, 0.0], fused_score=1 / 62),
+        _chunk('tail', 0.5, [0.0, 0.0, 1.0], fused_score=1 / 70),
+    ]
+
+    ranked = mmr_rerank(results, token_budget=20)
+
+    assert [r['id'] for r in ranked] == ['keyword', 'dense']
+    assert 'embedding' not in ranked[0]
+
+
+def test_dense_results_fall_back_to_similarity() -> None:
+    results = [
+        _chunk('weak', 0.2, [1.0, 0.0]),
+        _chunk('strong', 0.8, [0.0, 1.0]),
+    ]
+
+    assert [r['id'] for r in mmr_rerank(results, token_budget=10)] == ['strong']
+
+
+def _piece(document_id: str, index: int, content: str, similarity: float = 0.5) -> dict:
+    return {
+        'id': f'{document_id}-{index}',
+        'documentId': document_id,
+        'chunkIndex': index,
+        'content': content,
+        'tokenCount': len(content.split()),
+        'similarity': similarity,
+        'embedding': None,
+    }
+
+
+def test_consecutive_chunks_of_a_document_are_merged() -> None:
+    results = [
+        _piece('a', 3, 'third', 0.4),
+        _piece('b', 1, 'other document'),
+        _piece('a', 1, 'first', 0.6),
+        _piece('a', 2, 'second', 0.9),
+        _piece('a', 5, 'fifth'),
+    ]
+
+    passages = collapse_adjacent(results)
+
+    assert [(p['documentId'], p['chunkIndexes']) for p in passages] == [('a', [1, 2, 3]), ('a', [5]), ('b', [1])]
+    merged = passages[0]
+    # No overlap between the fragments: joined on a newline
+    assert merged['content'] == 'first\nsecond\nthird'
+    assert merged['similarity'] == 0.9
+    assert merged['tokenCount'] == 3
+
+
+def test_splitter_overlap_is_not_duplicated() -> None:
+    splitter = DocumentProcessor(minio_client=None, embedding_client=None, api_client=None).splitter
+    text = ' '.join(f'Sentence {i} describes roadmap item ENG-{i}.' for i in range(400))
+    chunks = splitter.split_text(text)
+    assert len(chunks) > 3 and chunks[1][:40] in chunks[0]  # the 150-char overlap
+
+    passages = collapse_adjacent([_piece('a', i, chunk) for i, chunk in enumerate(chunks)])
+
+    assert len(passages) == 1
+    assert passages[0]['content'] == text
+    assert passages[0]['tokenCount'] == len(text.split())
+    # Overlaps shorter than 20 characters are not trusted
+    assert _merge_text('ends with abc', 'abc starts') == 'ends with abc\nabc starts'
+
+
+def test_passages_are_trimmed_to_the_token_budget() -> None:
+    results = [
+        _piece('a', 0, 'word ' * 60, 0.9),
+        _piece('b', 0, 'word ' * 50, 0.8),
+        _piece('c', 0, 'word ' * 30, 0.7),
+        _piece('d', 0, 'word ' * 10, 0.6),
+    ]
+
+    ranked = mmr_rerank(results, token_budget=100)
+
+    # b no longer fits after a; smaller, less relevant passages still do
+    assert [r['documentId'] for r in ranked] == ['a', 'c', 'd']
+    assert sum(r['tokenCount'] for r in ranked) <= 100
+    # The best passage is kept even when it alone exceeds the budget
+    assert [r['documentId'] for r in mmr_rerank(results, token_budget=20)] == ['a']
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.observability import RunEventBus
+
+
+async def _collect(bus: RunEventBus, run_id: str) -> list[str]:
+    return [message.event.event async for message in bus.subscribe(run_id)]
+
+
+def test_late_subscriber_is_replayed_buffered_events():
+    async def run():
+        bus = RunEventBus()
+        await bus.emit('run', 'started')
+        await bus.emit('run', 'text_token', {'text': 'hi'})
+        await bus.emit('run', 'completed')
+        events = await _collect(bus, 'run')
+        await bus.aclose()
+        return events
+
+    assert asyncio.run(run()) == ['started', 'text_token', 'completed']
+
+
+def test_every_subscriber_sees_every_event():
+    async def run():
+        bus = RunEventBus()
+        first = asyncio.create_task(_collect(bus, 'run'))
+        second = asyncio.create_task(_collect(bus, 'run'))
+        await asyncio.sleep(0)
+        for event in ('started', 'step', 'completed'):
+            await bus.emit('run', event)
+        results = await asyncio.gather(first, second)
+        await bus.aclose()
+        return results
+
+    first, second = asyncio.run(run())
+    assert first == second == ['started', 'step', 'completed']
+
+
+def test_capacity_eviction_never_drops_watched_runs():
+    async def run():
+        bus = RunEventBus(max_buffered_events=3, sweep_interval_seconds=3600)
+        watcher = asyncio.create_task(_collect(bus, 'watched'))
+        await asyncio.sleep(0)
+        for _ in range(4):
+            await bus.emit('watched', 'step')
+        for i in range(10):
+            await bus.emit(f'unwatched-{i}', 'step')
+        assert 'watched' in bus._runs
+        await bus.emit('watched', 'completed')
+        events = await asyncio.wait_for(watcher, 1)
+        await bus.aclose()
+        return events
+
+    assert asyncio.run(run()) == ['step'] * 4 + ['completed']
+
+
+def test_idle_runs_are_reclaimed_without_new_emits():
+    async def run():
+        bus = RunEventBus(idle_ttl_seconds=0.05, sweep_interval_seconds=0.02)
+        await bus.emit('run', 'started')
+        assert bus.stats['runs'] == 1
+        await asyncio.sleep(0.2)
+        stats = bus.stats
+        await bus.aclose()
+        return stats
+
+    assert asyncio.run(run()) == {'runs': 0, 'bufferedEvents': 0}
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.observability.telemetry import RunTelemetryWriter
+
+
+class _SlowApi:
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.batches: list[tuple[str, int]] = []
+
+    async def create_telemetry_batch(self, run_id, events, tool_calls, auth_token=None):
+        await asyncio.sleep(self.delay)
+        self.batches.append((run_id, len(events) + len(tool_calls)))
+
+
+def test_final_flush_survives_caller_cancellation():
+    api = _SlowApi()
+
+    async def run() -> RunTelemetryWriter:
+        writer = RunTelemetryWriter(api)
+        writer.record_event('run-1', 'completed', {})
+        writer.record_tool_call('run-1', 'search', {}, {}, 1.0)
+        # Simulates stream.py cancelling the graph task while persist is flushing
+        task = asyncio.create_task(writer.flush('run-1'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+    assert api.batches == [('run-1', 2)]
+    assert writer.metrics['flushed'] == 2
+    assert writer.metrics['cancelled'] == 0
+
+
+def test_records_lost_to_cancelled_send_are_counted():
+    api = _SlowApi(delay=10)
+
+    async def run() -> RunTelemetryWriter:
+        writer = RunTelemetryWriter(api)
+        writer.record_event('run-1', 'completed', {})
+        asyncio.create_task(writer.flush('run-1'))
+        await asyncio.sleep(0.01)
+        for send in list(writer._inflight):
+            send.cancel()
+        await asyncio.sleep(0.01)
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.metrics['cancelled'] == 1
+    assert writer.metrics['flushed'] == 0
+
+
+def test_failed_flush_is_counted():
+    class _FailingApi:
+        async def create_telemetry_batch(self, *args, **kwargs):
+            raise RuntimeError('api down')
+
+    async def run() -> RunTelemetryWriter:
+        writer = RunTelemetryWriter(_FailingApi())
+        writer.record_event('run-1', 'started', {})
+        await writer.close()
+        return writer
+
+    assert asyncio.run(run()).metrics['failed'] == 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.graph.budget import ToolBudget
+from app.graph.nodes.common import get_tool_budget
+
+
+def _state(max_calls=None):
+    run_config = {'maxToolCalls': max_calls} if max_calls is not None else {}
+    return {
+        'runId': 'run',
+        'metadata': {'runConfig': run_config},
+        'toolBudget': ToolBudget.from_run_config(run_config),
+    }
+
+
+async def _acquire(state) -> bool:
+    await asyncio.sleep(0)
+    return get_tool_budget(state).try_acquire()
+
+
+def test_parallel_branches_share_one_budget():
+    state = _state(max_calls=10)
+
+    async def run():
+        return await asyncio.gather(*(_acquire(state) for _ in range(100)))
+
+    granted = asyncio.run(run())
+    assert sum(granted) == 10
+    assert state['toolBudget'].remaining == 0
+
+
+def test_runs_do_not_share_budgets():
+    first, second = _state(max_calls=1), _state(max_calls=1)
+
+    async def run():
+        return [await _acquire(first), await _acquire(first), await _acquire(second)]
+
+    assert asyncio.run(run()) == [True, False, True]
+
+
+def test_state_without_a_budget_is_rejected():
+    state = {'runId': 'run', 'metadata': {'runConfig': {'maxToolCalls': 2}}, 'toolCallCount': 1}
+
+    with pytest.raises(RuntimeError, match='toolBudget'):
+        get_tool_budget(state)
+    assert 'toolBudget' not in state
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.config import get_settings
+from app.tools.pg_pool import PgPool
+from app.tools.vector_cache import ProjectVectorCache, _ProjectIndex
+
+DIMS = get_settings().ollama_embed_dims
+PROJECT = 'cached'
+
+
+def _add_document(pool: PgPool, document_id: str, chunks: int = 3) -> None:
+    def _insert(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute('INSERT INTO document (id, "projectId", title) VALUES (%s, %s, %s)',
+                        (document_id, PROJECT, document_id))
+            cur.execute(
+                'INSERT INTO document_chunk ("documentId", "chunkIndex", content, embedding, "tokenCount") '
+                'SELECT %s, g, %s || g, ARRAY(SELECT random() FROM generate_series(1, %s) WHERE g >= 0), 10 '
+                'FROM generate_series(0, %s - 1) g',
+                (document_id, f'{document_id} chunk ', DIMS, chunks),
+            )
+
+    pool._call(_insert)
+
+
+def _delete_document(pool: PgPool, document_id: str) -> None:
+    pool._call(lambda conn: conn.cursor().execute('DELETE FROM document WHERE id = %s', (document_id,)))
+
+
+def _documents(cache: ProjectVectorCache) -> set[str] | None:
+    results = cache.search(PROJECT, [random.random() for _ in range(DIMS)], 100, -1.0)
+    return None if results is None else {r['documentId'] for r in results}
+
+
+async def _settle(cache: ProjectVectorCache) -> None:
+    while cache._loading:
+        await asyncio.gather(*cache._loading.values())
+
+
+def test_changes_from_other_workers_are_picked_up(retrieval_pool: PgPool) -> None:
+    _add_document(retrieval_pool, 'a')
+    _add_document(retrieval_pool, 'b')
+    cache = ProjectVectorCache(retrieval_pool, min_hits=1, revalidate_seconds=0.2)
+
+    async def main() -> None:
+        assert _documents(cache) is None
+        await _settle(cache)
+        assert _documents(cache) == {'a', 'b'}
+
+        # Another worker (or the API) deletes one document and ingests another
+        _delete_document(retrieval_pool, 'a')
+        _add_document(retrieval_pool, 'c')
+        assert _documents(cache) == {'a', 'b'}  # within the staleness bound
+        await asyncio.sleep(0.3)
+        assert _documents(cache) is None  # past it: Postgres answers while checking
+        await _settle(cache)
+        assert _documents(cache) == {'b', 'c'}
+        assert cache.metrics['invalidations'] == 1
+
+        # Unchanged projects are confirmed without a reload
+        await asyncio.sleep(0.3)
+        assert _documents(cache) is None
+        await _settle(cache)
+        assert _documents(cache) == {'b', 'c'}
+        assert cache.metrics['loads'] == 2
+
+    asyncio.run(main())
+
+
+def test_own_removals_and_refreshes_do_not_reload(retrieval_pool: PgPool) -> None:
+    _add_document(retrieval_pool, 'a')
+    _add_document(retrieval_pool, 'b')
+    cache = ProjectVectorCache(retrieval_pool, min_hits=1, revalidate_seconds=0.2)
+
+    async def main() -> None:
+        _documents(cache)
+        await _settle(cache)
+
+        _delete_document(retrieval_pool, 'a')
+        await cache.remove_document(PROJECT, 'a')
+        assert _documents(cache) == {'b'}
+        _add_document(retrieval_pool, 'c')
+        await cache.refresh_document(PROJECT, 'c')
+        assert _documents(cache) == {'b', 'c'}
+
+        await asyncio.sleep(0.3)
+        _documents(cache)
+        await _settle(cache)
+        assert _documents(cache) == {'b', 'c'}
+        assert cache.metrics['loads'] == 1
+        assert cache.metrics['invalidations'] == 0
+
+    asyncio.run(main())
+
+
+def _rows(rng: np.random.Generator, document_id: str, chunks: int, dims: int) -> list[dict]:
+    return [
+        {
+            'id': f'{document_id}-{i}', 'documentId': document_id, 'chunkIndex': i,
+            'content': f'{document_id} chunk {i}', 'tokenCount': 10, 'embedding': rng.standard_normal(dims).tolist(),
+            'documentTitle': document_id, 'mimeType': 'text/plain', 'createdAt': datetime(2026, 1, 1),
+            'sourceType': 'upload',
+        }
+        for i in range(chunks)
+    ]
+
+
+def _brute_force(index: _ProjectIndex, query: np.ndarray, limit: int) -> list[str]:
+    sims = np.where(index.alive, index.matrix @ query, -np.inf)
+    return [index.rows[i]['id'] for i in np.argsort(-sims)[:min(limit, index.size)]]
+
+
+def test_hnsw_index_ranks_resizes_and_compacts() -> None:
+    pytest.importorskip('hnswlib')
+    dims = 16
+    rng = np.random.default_rng(0)
+    index = _ProjectIndex(_rows(rng, 'a', 30, dims), dims, hnsw_threshold=20)
+    assert index.hnsw is not None
+    capacity = index.hnsw.get_max_elements()
+
+    # Growing past the graph's capacity resizes it instead of rebuilding
+    graph = index.hnsw
+    for name in ('b', 'c', 'd'):
+        index.append(_rows(rng, name, 30, dims))
+    assert index.hnsw is graph and index.hnsw.get_max_elements() > capacity
+    assert index.hnsw.get_current_count() == 120
+
+    # Same ranking as brute force, inner-product distance turned back into cosine similarity
+    query = index.matrix[42]
+    results = index.search(query, 10, -1.0)
+    assert [r['id'] for r in results] == _brute_force(index, query, 10)
+    assert results[0]['id'] == 'b-12' and results[0]['similarity'] == pytest.approx(1.0, abs=1e-5)
+    assert all(a['similarity'] >= b['similarity'] for a, b in zip(results, results[1:]))
+    positions = {row['id']: i for i, row in enumerate(index.rows)}
+    expected = [float(index.matrix[positions[r['id']]] @ query) for r in results]
+    assert [r['similarity'] for r in results] == pytest.approx(expected, abs=1e-5)
+
+    # Removed chunks are tombstoned in the graph
+    index.remove_document('b')
+    assert index.hnsw is graph
+    results = index.search(query, 120, -1.0)
+    assert len(results) == 90 and all(r['documentId'] != 'b' for r in results)
+    assert [r['id'] for r in results[:10]] == _brute_force(index, query, 10)
+
+    # Past 25% tombstones the rows are compacted and the graph rebuilt without them
+    index.remove_document('c')
+    assert index.hnsw is not graph
+    assert len(index.rows) == index.size == index.hnsw.get_current_count() == 60
+    query = index.matrix[0]
+    results = index.search(query, 60, -1.0)
+    assert {r['documentId'] for r in results} == {'a', 'd'}
+    assert [r['id'] for r in results[:10]] == _brute_force(index, query, 10)
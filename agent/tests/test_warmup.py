@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.tools.warmup import BackendWarmer
+
+
+class _Backend:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def warm_up(self) -> None:
+        self.calls += 1
+
+
+def test_keep_alive_pings_until_stopped() -> None:
+    llm, embedding = _Backend(), _Backend()
+
+    async def run() -> None:
+        warmer = BackendWarmer(llm, embedding, keep_alive_interval_seconds=0.05)
+        warmer.start()
+        await asyncio.sleep(0.28)
+        assert warmer.ready
+        # One warm-up, then a ping per interval; the LLM is never pinged
+        assert 3 <= embedding.calls <= 6
+        assert llm.calls == 1
+
+        task = warmer._task
+        await warmer.stop()
+        assert task.cancelled() and warmer._task is None
+        pings = embedding.calls
+        await asyncio.sleep(0.15)
+        assert embedding.calls == pings
+
+    asyncio.run(run())
+
+
+def test_no_keep_alive_without_an_embedding_backend() -> None:
+    async def run() -> BackendWarmer:
+        warmer = BackendWarmer(_Backend(), None, keep_alive_interval_seconds=0.01)
+        warmer.start()
+        await asyncio.sleep(0.05)
+        return warmer
+
+    warmer = asyncio.run(run())
+    assert warmer.ready and warmer._task.done()
+    assert set(warmer.timings_ms) == {'llm'}
@@ -7,6 +7,7 @@ import { CreateAgentRunDto } from './dto/create-agent-run.dto';
 import { CreateAgentEventDto } from './dto/create-agent-event.dto';
 import { CreateToolCallDto } from './dto/create-tool-call.dto';
 import { CompleteAgentRunDto } from './dto/complete-agent-run.dto';
+import { BulkCreateTelemetryDto } from './dto/bulk-create-telemetry.dto';
 
 @Controller('agent-runs')
 @UseGuards(AuthGuard)
@@ -65,6 +66,15 @@ export class AgentRunsController {
     return this.agentRunsService.addToolCall(user.id, runId, payload);
   }
 
+  @Post(':runId/telemetry/bulk')
+  async createTelemetryBatch(
+    @CurrentUser() user: { id: string },
+    @Param('runId') runId: string,
+    @Body() payload: BulkCreateTelemetryDto,
+  ) {
+    return this.agentRunsService.addTelemetryBatch(user.id, runId, payload);
+  }
+
   @Post(':runId/complete')
   async completeRun(
     @CurrentUser() user: { id: string },
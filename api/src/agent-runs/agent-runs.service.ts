@@ -10,6 +10,7 @@ import { CreateAgentRunDto } from './dto/create-agent-run.dto';
 import { CreateAgentEventDto } from './dto/create-agent-event.dto';
 import { CreateToolCallDto } from './dto/create-tool-call.dto';
 import { CompleteAgentRunDto } from './dto/complete-agent-run.dto';
+import { BulkCreateTelemetryDto } from './dto/bulk-create-telemetry.dto';
 
 @Injectable()
 export class AgentRunsService {
@@ -92,6 +93,33 @@ export class AgentRunsService {
     return this.toolCallRepository.save(toolCall);
   }
 
+  async addTelemetryBatch(userId: string, runId: string, payload: BulkCreateTelemetryDto) {
+    await this.assertRunOwnership(userId, runId);
+    const events = (payload.events ?? []).map((event) =>
+      this.eventRepository.create({
+        runId,
+        type: event.type,
+        payloadJson: event.payload,
+      }),
+    );
+    const toolCalls = (payload.toolCalls ?? []).map((toolCall) =>
+      this.toolCallRepository.create({
+        runId,
+        toolName: toolCall.toolName,
+        requestJson: toolCall.requestJson,
+        responseJson: toolCall.responseJson,
+        latencyMs: toolCall.latencyMs,
+      }),
+    );
+    if (events.length) {
+      await this.eventRepository.save(events);
+    }
+    if (toolCalls.length) {
+      await this.toolCallRepository.save(toolCalls);
+    }
+    return { events: events.length, toolCalls: toolCalls.length };
+  }
+
   async completeRun(userId: string, runId: string, payload: CompleteAgentRunDto) {
     const run = await this.assertRunOwnership(userId, runId);
 
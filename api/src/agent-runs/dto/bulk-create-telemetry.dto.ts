@@ -0,0 +1,18 @@
+import { IsArray, IsOptional, ValidateNested } from 'class-validator';
+import { Type } from 'class-transformer';
+import { CreateAgentEventDto } from './create-agent-event.dto';
+import { CreateToolCallDto } from './create-tool-call.dto';
+
+export class BulkCreateTelemetryDto {
+  @IsOptional()
+  @IsArray()
+  @ValidateNested({ each: true })
+  @Type(() => CreateAgentEventDto)
+  events?: CreateAgentEventDto[];
+
+  @IsOptional()
+  @IsArray()
+  @ValidateNested({ each: true })
+  @Type(() => CreateToolCallDto)
+  toolCalls?: CreateToolCallDto[];
+}
@@ -11,11 +11,13 @@ import {
   ParseFilePipe,
   MaxFileSizeValidator,
   Patch,
+  Query,
 } from '@nestjs/common';
 import { FileInterceptor } from '@nestjs/platform-express';
 import { DocumentsService } from './documents.service';
 import { CreateDocumentDto } from './dto/create-document.dto';
 import { BulkCreateChunksDto } from './dto/bulk-create-chunks.dto';
+import { SyncChunksDto } from './dto/sync-chunks.dto';
 import { UpdateDocumentStatusDto } from './dto/update-document-status.dto';
 import { ImportNotionDocumentDto } from './dto/import-notion-document.dto';
 import { ImportGoogleDocumentDto } from './dto/import-google-document.dto';
@@ -97,8 +99,9 @@ export class DocumentsController {
   reprocess(
     @Param('id') id: string,
     @CurrentUser() user: { id: string },
+    @Query('full') full?: string,
   ) {
-    return this.documentsService.reprocess(id, user.id);
+    return this.documentsService.reprocess(id, user.id, full === 'true');
   }
 
   @Post('documents/:id/status')
@@ -133,4 +136,17 @@ export class DocumentsController {
   ) {
     return this.documentsService.bulkCreateChunks(id, dto.chunks);
   }
+
+  @Get('documents/:id/chunks/hashes')
+  findChunkHashes(@Param('id') id: string) {
+    return this.documentsService.findChunkHashes(id);
+  }
+
+  @Post('documents/:id/chunks/sync')
+  syncChunks(
+    @Param('id') id: string,
+    @Body() dto: SyncChunksDto,
+  ) {
+    return this.documentsService.syncChunks(id, dto.reindex, dto.deleteIds, dto.discard);
+  }
 }
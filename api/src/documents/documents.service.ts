@@ -1,6 +1,6 @@
 import { BadRequestException, Injectable, NotFoundException } from '@nestjs/common';
 import { InjectRepository } from '@nestjs/typeorm';
-import { Repository } from 'typeorm';
+import { In, Repository } from 'typeorm';
 import { ConfigService } from '@nestjs/config';
 import { Document, DocumentStatus } from './entities/document.entity';
 import { DocumentChunk } from './entities/document-chunk.entity';
@@ -63,10 +63,13 @@ export class DocumentsService {
   }
 
   async findAllByProject(projectId: string): Promise<Document[]> {
-    return this.documentRepo.find({
-      where: { projectId },
-      order: { createdAt: 'DESC' },
-    });
+    // Meeting transcripts are stored as documents for retrieval but listed under meetings
+    return this.documentRepo
+      .createQueryBuilder('doc')
+      .where('doc.projectId = :projectId', { projectId })
+      .andWhere("COALESCE(doc.metadata->>'sourceType', '') <> 'meeting'")
+      .orderBy('doc.createdAt', 'DESC')
+      .getMany();
   }
 
   async findOne(id: string): Promise<Document> {
@@ -78,11 +81,60 @@ export class DocumentsService {
   async findChunks(documentId: string): Promise<DocumentChunk[]> {
     await this.findOne(documentId);
     return this.chunkRepo.find({
-      where: { documentId },
+      where: { documentId, pending: false },
       order: { chunkIndex: 'ASC' },
     });
   }
 
+  /** Stored chunk ids, positions and content hashes, without content or embeddings. */
+  async findChunkHashes(
+    documentId: string,
+  ): Promise<{ chunks: Array<{ id: string; chunkIndex: number; contentHash: string | null }> }> {
+    await this.findOne(documentId);
+    const rows = await this.chunkRepo
+      .createQueryBuilder('chunk')
+      .select('chunk.id', 'id')
+      .addSelect('chunk.chunkIndex', 'chunkIndex')
+      .addSelect("chunk.metadata->>'contentHash'", 'contentHash')
+      .where('chunk.documentId = :documentId', { documentId })
+      .andWhere('chunk.pending = false')
+      .orderBy('chunk.chunkIndex', 'ASC')
+      .getRawMany();
+    return { chunks: rows };
+  }
+
+  /**
+   * Finish an incremental re-ingest atomically: move unchanged chunks, drop
+   * stale ones and publish the pending ones, or with `discard` drop only the
+   * pending chunks of a failed run.
+   */
+  async syncChunks(
+    documentId: string,
+    reindex: Array<{ id: string; chunkIndex: number }>,
+    deleteIds: string[],
+    discard = false,
+  ): Promise<{ reindexed: number; deleted: number; published: number }> {
+    await this.findOne(documentId);
+    return this.chunkRepo.manager.transaction(async (manager) => {
+      const repo = manager.getRepository(DocumentChunk);
+      if (discard) {
+        const result = await repo.delete({ documentId, pending: true });
+        return { reindexed: 0, deleted: result.affected || 0, published: 0 };
+      }
+      let deleted = 0;
+      if (deleteIds.length) {
+        const result = await repo.delete({ documentId, pending: false, id: In(deleteIds) });
+        deleted = result.affected || 0;
+      }
+      for (const { id, chunkIndex } of reindex) {
+        await repo.update({ documentId, id }, { chunkIndex });
+      }
+      // Readers see the old version or the new one, never both
+      const published = await repo.update({ documentId, pending: true }, { pending: false });
+      return { reindexed: reindex.length, deleted, published: published.affected || 0 };
+    });
+  }
+
   async remove(id: string): Promise<void> {
     const doc = await this.findOne(id);
     if (!doc.s3Key.startsWith('external://')) {
@@ -90,6 +142,11 @@ export class DocumentsService {
     }
     await this.chunkRepo.delete({ documentId: id });
     await this.documentRepo.remove(doc);
+
+    // Other agent workers notice on their next version check
+    this.notifyRemoved(id, doc.projectId).catch((err) => {
+      console.error(`[DocumentsService] Failed to notify agent of removal of ${id}:`, err);
+    });
   }
 
   async updateStatus(
@@ -116,45 +173,73 @@ export class DocumentsService {
   async bulkCreateChunks(
     documentId: string,
     chunks: Array<{
+      id?: string;
       chunkIndex: number;
       content: string;
       embedding?: number[];
+      embeddingB64?: string;
       tokenCount?: number;
       metadata?: Record<string, unknown>;
+      pending?: boolean;
     }>,
   ): Promise<number> {
     const entities = chunks.map((c) =>
       this.chunkRepo.create({
+        id: c.id,
         documentId,
         chunkIndex: c.chunkIndex,
         content: c.content,
-        embedding: c.embedding,
+        embedding: c.embeddingB64 ? decodeFloat32(c.embeddingB64) : c.embedding,
         tokenCount: c.tokenCount || 0,
         metadata: c.metadata,
+        pending: c.pending || false,
       }),
     );
-    await this.chunkRepo.save(entities);
+    // The agent retries failed uploads with the same chunk ids: chunks that
+    // already landed are skipped instead of stored twice
+    await this.chunkRepo
+      .createQueryBuilder()
+      .insert()
+      .into(DocumentChunk)
+      .values(entities)
+      .orIgnore()
+      .execute();
     return entities.length;
   }
 
-  async reprocess(id: string, userId: string): Promise<Document> {
+  /**
+   * Re-ingest a document. By default the agent diffs chunk content hashes
+   * against the stored chunks and only embeds what changed; `full` deletes
+   * every chunk first and rebuilds from scratch.
+   */
+  async reprocess(id: string, userId: string, full = false): Promise<Document> {
     const doc = await this.findOne(id);
     if (doc.s3Key.startsWith('external://')) {
-      return this.reprocessExternalDocument(doc, userId);
+      return this.reprocessExternalDocument(doc, userId, full);
     }
-    await this.chunkRepo.delete({ documentId: id });
+    if (doc.s3Key.startsWith('meetings://')) {
+      throw new BadRequestException('Meeting transcripts are reprocessed from the meeting.');
+    }
+    if (full) {
+      await this.chunkRepo.delete({ documentId: id });
+      doc.chunkCount = 0;
+    }
+    // Incremental runs keep serving the published chunks until the sync
     doc.status = DocumentStatus.PROCESSING;
     doc.processingError = null;
-    doc.chunkCount = 0;
     const saved = await this.documentRepo.save(doc);
-    this.triggerProcessing(saved).catch((err) => {
+    this.triggerProcessing(saved, !full).catch((err) => {
       console.error(`[DocumentsService] Failed to trigger reprocessing for ${id}:`, err);
       this.markDocumentFailed(saved.id, err).catch(() => undefined);
     });
     return saved;
   }
 
-  private async reprocessExternalDocument(doc: Document, userId: string): Promise<Document> {
+  private async reprocessExternalDocument(
+    doc: Document,
+    userId: string,
+    full: boolean,
+  ): Promise<Document> {
     const metadata = (doc.metadata || {}) as Record<string, unknown>;
     const rawSourceType = String(metadata.sourceType || '').trim().toLowerCase();
     const provider =
@@ -184,10 +269,12 @@ export class DocumentsService {
       throw new BadRequestException('The selected source has no extractable text');
     }
 
-    await this.chunkRepo.delete({ documentId: doc.id });
+    if (full) {
+      await this.chunkRepo.delete({ documentId: doc.id });
+      doc.chunkCount = 0;
+    }
     doc.status = DocumentStatus.PROCESSING;
     doc.processingError = null;
-    doc.chunkCount = 0;
     doc.fileSize = Buffer.byteLength(text, 'utf-8');
     if (payload.title) {
       doc.title = payload.title;
@@ -200,7 +287,7 @@ export class DocumentsService {
     };
     const saved = await this.documentRepo.save(doc);
 
-    this.triggerTextProcessing(saved, text).catch((err) => {
+    this.triggerTextProcessing(saved, text, !full).catch((err) => {
       console.error(`[DocumentsService] Failed to reprocess external document ${saved.id}:`, err);
       this.markDocumentFailed(saved.id, err).catch(() => undefined);
     });
@@ -292,7 +379,7 @@ export class DocumentsService {
     return saved;
   }
 
-  private async triggerProcessing(doc: Document): Promise<void> {
+  private async triggerProcessing(doc: Document, incremental = false): Promise<void> {
     const url = `${this.agentBaseUrl}/agent/process-document`;
     const response = await fetch(url, {
       method: 'POST',
@@ -302,6 +389,7 @@ export class DocumentsService {
         s3Key: doc.s3Key,
         mimeType: doc.mimeType,
         projectId: doc.projectId,
+        incremental,
       }),
     });
     if (!response.ok) {
@@ -309,7 +397,23 @@ export class DocumentsService {
     }
   }
 
-  private async triggerTextProcessing(doc: Document, text: string): Promise<void> {
+  private async notifyRemoved(documentId: string, projectId: string): Promise<void> {
+    const url = `${this.agentBaseUrl}/agent/remove-document`;
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ documentId, projectId }),
+    });
+    if (!response.ok) {
+      throw new Error(`Agent returned ${response.status}`);
+    }
+  }
+
+  private async triggerTextProcessing(
+    doc: Document,
+    text: string,
+    incremental = false,
+  ): Promise<void> {
     const url = `${this.agentBaseUrl}/agent/process-document-text`;
     const response = await fetch(url, {
       method: 'POST',
@@ -318,6 +422,7 @@ export class DocumentsService {
         documentId: doc.id,
         projectId: doc.projectId,
         text,
+        incremental,
       }),
     });
     if (!response.ok) {
@@ -357,3 +462,13 @@ export class DocumentsService {
     }
   }
 }
+
+/** Decode a base64 little-endian float32 buffer into a number array. */
+function decodeFloat32(data: string): number[] {
+  const buf = Buffer.from(data, 'base64');
+  const values = new Array<number>(buf.length / 4);
+  for (let i = 0; i < values.length; i++) {
+    values[i] = buf.readFloatLE(i * 4);
+  }
+  return values;
+}
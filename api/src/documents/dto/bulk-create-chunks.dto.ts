@@ -1,7 +1,12 @@
-import { IsArray, IsInt, IsNumber, IsOptional, IsString, ValidateNested } from 'class-validator';
+import { IsArray, IsBase64, IsBoolean, IsInt, IsNumber, IsOptional, IsString, IsUUID, ValidateNested } from 'class-validator';
 import { Type } from 'class-transformer';
 
 export class ChunkDto {
+  /** Assigned by the uploader so a retried upload is recognised and skipped. */
+  @IsOptional()
+  @IsUUID()
+  id?: string;
+
   @IsInt()
   chunkIndex: number;
 
@@ -13,12 +18,22 @@ export class ChunkDto {
   @IsNumber({}, { each: true })
   embedding?: number[];
 
+  /** Little-endian float32 buffer, base64-encoded; preferred over `embedding`. */
+  @IsOptional()
+  @IsBase64()
+  embeddingB64?: string;
+
   @IsOptional()
   @IsInt()
   tokenCount?: number;
 
   @IsOptional()
   metadata?: Record<string, unknown>;
+
+  /** Hidden from retrieval until the run's /chunks/sync publishes it. */
+  @IsOptional()
+  @IsBoolean()
+  pending?: boolean;
 }
 
 export class BulkCreateChunksDto {
@@ -0,0 +1,34 @@
+import { ArrayUnique, IsArray, IsBoolean, IsInt, IsOptional, IsUUID, ValidateNested } from 'class-validator';
+import { Type } from 'class-transformer';
+
+export class ChunkIndexDto {
+  @IsUUID()
+  id: string;
+
+  @IsInt()
+  chunkIndex: number;
+}
+
+/**
+ * Finishes an incremental re-ingestion in one transaction: moves and deletes
+ * stored chunks and publishes the run's pending chunks, or with `discard`
+ * drops the pending chunks and leaves the stored ones as they were.
+ */
+export class SyncChunksDto {
+  /** Unchanged chunks whose position in the document moved. */
+  @IsArray()
+  @ValidateNested({ each: true })
+  @Type(() => ChunkIndexDto)
+  reindex: ChunkIndexDto[];
+
+  /** Chunks whose content no longer appears in the document. */
+  @IsArray()
+  @ArrayUnique()
+  @IsUUID('all', { each: true })
+  deleteIds: string[];
+
+  /** The run failed (or is starting over): drop its pending chunks only. */
+  @IsOptional()
+  @IsBoolean()
+  discard?: boolean;
+}
@@ -3,12 +3,19 @@ import {
   PrimaryGeneratedColumn,
   Column,
   CreateDateColumn,
+  Index,
   ManyToOne,
   JoinColumn,
 } from 'typeorm';
 import { Document } from './document.entity';
 
 @Entity()
+// ANN and full-text indexes, created and tuned by the agent service; declared
+// here so schema sync leaves them alone
+@Index('document_chunk_embedding_ann', { synchronize: false })
+@Index('document_chunk_content_fts', { synchronize: false })
+// Chunks by document; also lets filtered retrieval rank a small project exactly
+@Index(['documentId', 'chunkIndex'])
 export class DocumentChunk {
   @PrimaryGeneratedColumn('uuid')
   id: string;
@@ -31,6 +38,10 @@ export class DocumentChunk {
   @Column({ type: 'jsonb', nullable: true })
   metadata: Record<string, unknown>;
 
+  /** Uploaded by an incremental re-ingest still in progress; hidden until /chunks/sync. */
+  @Column({ default: false })
+  pending: boolean;
+
   @CreateDateColumn()
   createdAt: Date;
 
@@ -2,6 +2,7 @@ import { Module } from '@nestjs/common';
 import { TypeOrmModule } from '@nestjs/typeorm';
 import { Meeting } from './entities/meeting.entity';
 import { MeetingInsight } from './entities/meeting-insight.entity';
+import { Document } from '../documents/entities/document.entity';
 import { MeetingsController } from './meetings.controller';
 import { MeetingsService } from './meetings.service';
 import { GatewayModule } from '../gateway/gateway.module';
@@ -9,7 +10,7 @@ import { ActivityModule } from '../activity/activity.module';
 
 @Module({
   imports: [
-    TypeOrmModule.forFeature([Meeting, MeetingInsight]),
+    TypeOrmModule.forFeature([Meeting, MeetingInsight, Document]),
     GatewayModule,
     ActivityModule,
   ],
@@ -4,10 +4,13 @@ import { Repository } from 'typeorm';
 import { ConfigService } from '@nestjs/config';
 import { Meeting, MeetingStatus } from './entities/meeting.entity';
 import { MeetingInsight } from './entities/meeting-insight.entity';
+import { Document, DocumentStatus } from '../documents/entities/document.entity';
 import { EventsGateway } from '../gateway/events.gateway';
 import { ActivityService } from '../activity/activity.service';
 import { CreateMeetingInsightDto } from './dto/create-meeting-insight.dto';
 
+const transcriptKey = (meetingId: string) => `meetings://${meetingId}`;
+
 @Injectable()
 export class MeetingsService {
   private agentBaseUrl: string;
@@ -17,6 +20,8 @@ export class MeetingsService {
     private readonly meetingRepo: Repository<Meeting>,
     @InjectRepository(MeetingInsight)
     private readonly insightRepo: Repository<MeetingInsight>,
+    @InjectRepository(Document)
+    private readonly documentRepo: Repository<Document>,
     private readonly eventsGateway: EventsGateway,
     private readonly activityService: ActivityService,
     private readonly configService: ConfigService,
@@ -85,6 +90,8 @@ export class MeetingsService {
   async remove(id: string): Promise<void> {
     const meeting = await this.findOne(id);
     await this.insightRepo.delete({ meetingId: id });
+    // Transcript chunks go with their document (ON DELETE CASCADE)
+    await this.documentRepo.delete({ s3Key: transcriptKey(id) });
     await this.meetingRepo.remove(meeting);
   }
 
@@ -183,7 +190,33 @@ export class MeetingsService {
     return saved;
   }
 
+  /**
+   * The document holding a meeting's transcript chunks, so meetings are
+   * retrievable like any other source (metadata.sourceType = 'meeting').
+   * Reused across reprocessing; the agent re-embeds only changed chunks.
+   */
+  private async ensureTranscriptDocument(meeting: Meeting): Promise<Document> {
+    const s3Key = transcriptKey(meeting.id);
+    let doc = await this.documentRepo.findOne({ where: { s3Key } });
+    if (!doc) {
+      doc = this.documentRepo.create({
+        projectId: meeting.projectId,
+        uploadedById: meeting.createdById,
+        originalFilename: `meeting-${meeting.id}.txt`,
+        mimeType: 'text/plain',
+        s3Key,
+        metadata: { sourceType: 'meeting', meetingId: meeting.id },
+      });
+    }
+    doc.title = `Meeting: ${meeting.title}`;
+    doc.fileSize = Buffer.byteLength(meeting.rawTranscript, 'utf-8');
+    doc.status = DocumentStatus.PROCESSING;
+    doc.processingError = null;
+    return this.documentRepo.save(doc);
+  }
+
   private async triggerProcessing(meeting: Meeting): Promise<void> {
+    const transcriptDoc = await this.ensureTranscriptDocument(meeting);
     const url = `${this.agentBaseUrl}/agent/process-meeting`;
     const response = await fetch(url, {
       method: 'POST',
@@ -195,6 +228,7 @@ export class MeetingsService {
         rawTranscript: meeting.rawTranscript,
         meetingDate: meeting.meetingDate?.toISOString(),
         source: meeting.source,
+        documentId: transcriptDoc.id,
       }),
     });
     if (!response.ok) {